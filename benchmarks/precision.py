@@ -0,0 +1,65 @@
+"""
+Compare the throughput of double- and single-precision simulations on random circuits, and the largest
+deviation of their probabilities.
+
+    python benchmarks/precision.py --min-wires 10 --max-wires 24 --depth 20
+"""
+import argparse
+import time
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+
+
+def random_tape(rng, num_wires, depth):
+    ops = []
+    for _ in range(depth):
+        for wire in range(num_wires):
+            gate = rng.choice([qml.RX, qml.RY, qml.RZ])
+            ops.append(gate(rng.uniform(0, 2 * np.pi), wires=wire))
+        for wire in range(int(rng.integers(2)), num_wires - 1, 2):
+            ops.append(qml.CNOT([wire, wire + 1]))
+    return QuantumScript(ops, [qml.probs()])
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-wires", type=int, default=10)
+    parser.add_argument("--max-wires", type=int, default=22)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'wires':>6} {'double (s)':>11} {'single (s)':>11} {'speedup':>8} {'max deviation':>14}")
+    for num_wires in range(args.min_wires, args.max_wires + 1, 2):
+        tape = random_tape(rng, num_wires, args.depth)
+        wire_map = {wire: wire + 1 for wire in range(num_wires)}
+        results = {}
+        for precision in ("double", "single"):
+            results[precision] = timed(
+                lambda: PennylaneConverter(
+                    tape, wires=num_wires, wire_map=wire_map, precision=precision
+                ).simulate(),
+                args.repeat,
+            )
+        (double_time, double), (single_time, single) = results["double"], results["single"]
+        deviation = np.max(np.abs(double - single))
+        print(
+            f"{num_wires:>6} {double_time:>11.4f} {single_time:>11.4f} "
+            f"{double_time / single_time:>8.2f} {deviation:>14.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the stabilizer simulator with the state-vector path on random Clifford circuits.
+
+    python benchmarks/stabilizer.py --max-state-vector-wires 20 --max-wires 1000
+
+The state-vector path is only timed up to ``--max-state-vector-wires``, after which it runs out of memory.
+"""
+import argparse
+import time
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+from pennylane_snowflurry.stabilizer import simulate_tableau
+
+
+def random_clifford_tape(rng, num_wires, depth, shots):
+    ops = []
+    for _ in range(depth):
+        for wire in range(num_wires):
+            ops.append(rng.choice([qml.Hadamard, qml.S, qml.PauliX])(wires=wire))
+        for wire in range(int(rng.integers(2)), num_wires - 1, 2):
+            ops.append(qml.CNOT([wire, wire + 1]))
+    # S is decomposed by the device, as done here
+    ops = [qml.PhaseShift(np.pi / 2, wires=op.wires) if op.name == "S" else op for op in ops]
+    return QuantumScript(
+        ops, [qml.counts(), qml.expval(qml.PauliZ(0) @ qml.PauliZ(num_wires - 1))], shots=shots
+    )
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-wires", type=int, default=1000)
+    parser.add_argument("--max-state-vector-wires", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--shots", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'wires':>6} {'tableau (s)':>12} {'state vector (s)':>17}")
+    num_wires = 4
+    while num_wires <= args.max_wires:
+        tape = random_clifford_tape(rng, num_wires, args.depth, args.shots)
+        wire_map = {wire: wire + 1 for wire in range(num_wires)}
+        tableau_time = timed(lambda: simulate_tableau(tape, wire_map, num_wires), args.repeat)
+        state_vector_time = float("nan")
+        if num_wires <= args.max_state_vector_wires:
+            state_vector_time = timed(
+                lambda: PennylaneConverter(tape, wires=num_wires, wire_map=wire_map).simulate(),
+                args.repeat,
+            )
+        print(f"{num_wires:>6} {tableau_time:>12.4f} {state_vector_time:>17.4f}")
+        num_wires *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,5 @@ JuliaEnv().update()
 
 from .pennylane_converter import PennylaneConverter
 from .snowflurry_device import SnowflurryQubitDevice
+from .result_store import ResultStore
+from .debugging import snapshots
@@ -0,0 +1,136 @@
+"""
+Contains the :class:`CircuitTemplate` used by the device to convert families of tapes that only differ by
+their parameters, such as the shifted tapes of a parameter-shift gradient, in a single Julia call.
+"""
+import numpy as np
+import pennylane as qml
+from pennylane_snowflurry.pennylane_converter import Snowflurry, SNOWFLURRY_OPERATION_MAP
+
+
+class CircuitTemplate:
+    """
+    A Julia function building the Snowflurry circuit of a tape structure for any parameters.
+
+    A parameter-shift gradient executes ``2 * P`` tapes with the same gates on the same wires, which the
+    converter would otherwise convert one instruction at a time, with one ``seval`` per gate. The template
+    is compiled once per structure: its gates are generated from ``SNOWFLURRY_OPERATION_MAP`` with the
+    parameters replaced by ``p[k]``, and it builds the circuits of a whole family of tapes in one Julia
+    loop, taking a matrix with the parameters of one tape per row. The states of the circuits can be
+    simulated in the same loop.
+
+    Args:
+        tape (QuantumTape): A tape of the family.
+        wire_map (dict): The 1-based Julia index of each wire label.
+        qubit_count (int): The number of qubits of the circuits.
+    """
+
+    def __init__(self, tape, wire_map, qubit_count):
+        self.qubit_count = qubit_count
+        self.gates = []
+        index = 1
+        for op in tape.operations:
+            placeholders = [f"p[{index + i}]" for i in range(len(op.parameters))]
+            index += len(op.parameters)
+            wires = [wire_map[wire] for wire in op.wires]
+            self.gates.append(
+                (SNOWFLURRY_OPERATION_MAP[op.name], placeholders, wires)
+            )
+        self.num_params = index - 1
+        self.source = self._source()
+        self._builder = None
+
+    @staticmethod
+    def key(tape, wire_map):
+        """
+        Get the structure of a tape, shared by the tapes a template can build.
+
+        Args:
+            tape (QuantumTape): The tape.
+            wire_map (dict): The 1-based Julia index of each wire label.
+
+        Returns:
+            Optional[tuple]: The name, wires and number of parameters of each operation, or None if the tape
+                cannot be built by a template (state preparations, unsupported operations, non-real
+                parameters).
+        """
+        structure = []
+        for op in tape.operations:
+            gate = SNOWFLURRY_OPERATION_MAP.get(op.name)
+            if gate is None or gate == NotImplementedError:
+                return None
+            if isinstance(op, qml.operation.StatePrepBase):
+                return None
+            if any(np.ndim(p) != 0 or np.iscomplexobj(p) for p in op.parameters):
+                return None
+            structure.append((op.name, tuple(wire_map[wire] for wire in op.wires), len(op.parameters)))
+        return tuple(structure)
+
+    def _source(self):
+        pushes = "\n".join(
+            f"        push!(c, {gate.format(*placeholders, *wires)})"
+            for gate, placeholders, wires in self.gates
+        )
+        return f"""
+function (params, with_states)
+    circuits = Vector{{QuantumCircuit}}(undef, size(params, 1))
+    for i in 1:size(params, 1)
+        p = params[i, :]
+        c = QuantumCircuit(qubit_count={self.qubit_count})
+{pushes}
+        circuits[i] = c
+    end
+    states = with_states ? [simulate(c) for c in circuits] : nothing
+    return circuits, states
+end
+"""
+
+    @staticmethod
+    def parameters(tape):
+        """
+        Get the parameters of a tape, in the order of the placeholders of the template.
+        """
+        return [float(qml.math.unwrap(p)) for op in tape.operations for p in op.parameters]
+
+    def instructions(self, parameters):
+        """
+        Get the instructions of the circuit built for some parameters, as pushed by the converter.
+
+        Args:
+            parameters (Sequence[float]): The parameters of the tape.
+
+        Returns:
+            list[str]: The Snowflurry instructions.
+        """
+        instructions = []
+        index = 0
+        for gate, placeholders, wires in self.gates:
+            values = parameters[index : index + len(placeholders)]
+            index += len(placeholders)
+            instructions.append(gate.format(*values, *wires))
+        return instructions
+
+    def build(self, tapes, with_states=False):
+        """
+        Build the circuits of a family of tapes in a single Julia call.
+
+        Args:
+            tapes (Sequence[QuantumTape]): Tapes sharing the structure of the template.
+            with_states (bool): Whether to also simulate the circuits.
+
+        Returns:
+            list[tuple]: For each tape, the Julia circuit, its instructions and its state vector (None
+                without ``with_states``).
+        """
+        if self._builder is None:
+            self._builder = Snowflurry.seval(self.source)
+        parameters = [self.parameters(tape) for tape in tapes]
+        matrix = np.array(parameters, dtype=float).reshape(len(tapes), self.num_params)
+        circuits, states = self._builder(matrix, with_states)
+        return [
+            (
+                circuits[i],
+                self.instructions(parameters[i]),
+                np.array(states[i].data, dtype=complex) if with_states else None,
+            )
+            for i in range(len(tapes))
+        ]
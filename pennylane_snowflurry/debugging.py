@@ -0,0 +1,58 @@
+"""
+Contains :func:`snapshots`, which retrieves the ``qml.Snapshot`` results of a QNode running on the
+Snowflurry device.
+
+PennyLane's ``qml.snapshots`` only attaches its debugger to PennyLane's own simulators with the new device
+API, so the device provides an equivalent debugging context.
+"""
+
+
+class SnapshotDebugger:
+    """
+    A debugging context in which the device saves the states (or measurements) of ``qml.Snapshot``
+    operations.
+
+    Args:
+        dev (SnowflurryQubitDevice): The device to attach the debugger to.
+    """
+
+    def __init__(self, dev):
+        self.snapshots = {}
+        self.active = False
+        self.device = dev
+        dev._debugger = self
+
+    def __enter__(self):
+        self.active = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.active = False
+        self.device._debugger = None
+
+
+def snapshots(qnode):
+    """
+    Create a function that retrieves the snapshots of a QNode, like ``qml.snapshots``.
+
+    Args:
+        qnode (QNode): A QNode running on the Snowflurry device.
+
+    Returns:
+        Callable: A function with the signature of the QNode, which executes it and returns a dictionary
+            of the snapshots, keyed by their tag or their position, with the results of the QNode under
+            ``"execution_results"``.
+
+    Example:
+        >>> pennylane_snowflurry.snapshots(circuit)()
+        {0: array([1.+0.j, 0.+0.j]), 'after_h': array([0.70710678+0.j, 0.70710678+0.j]),
+        'execution_results': 0.0}
+    """
+
+    def get_snapshots(*args, **kwargs):
+        with SnapshotDebugger(qnode.device) as debugger:
+            results = qnode(*args, **kwargs)
+        debugger.snapshots["execution_results"] = results
+        return debugger.snapshots
+
+    return get_snapshots
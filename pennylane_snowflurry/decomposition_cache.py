@@ -0,0 +1,221 @@
+"""
+Contains the :class:`DecompositionCache` used by the device to decompose operations during preprocessing.
+"""
+import time
+import numpy as np
+import pennylane as qml
+from pennylane.transforms.core import transform
+from pennylane.wires import Wires
+
+
+class DecompositionCache:
+    """
+    Memoizes the results of the stopping condition and the decompositions of unsupported operations.
+
+    The same templates (AQFT, Grover, ...) are decomposed for every tape of every optimizer iteration, while
+    their decomposition only depends on their type, hyperparameters and number of wires. Decompositions are
+    stored with the wires of the decomposed operations as positions in the wires of the template, and with
+    the parameters of the decomposed operations as references to the parameters of the template, so that
+    a cached decomposition is instantiated on other wires and with new (possibly trainable) parameters.
+    Operations whose decomposition computes new parameters from theirs (e.g. ``RY(theta / 2)``), or depends
+    on their parameters without passing them on (e.g. ``BasisState``), are only cached when they have no
+    parameters.
+
+    Args:
+        stopping_condition (Callable[[Operator], bool]): Whether an operation is supported by the device.
+
+    Attributes:
+        hits (int): The number of decompositions served from the cache.
+        misses (int): The number of decompositions computed.
+        preprocess_time (float): The time spent in :func:`cached_decompose`, in seconds.
+    """
+
+    def __init__(self, stopping_condition):
+        self._stopping_condition = stopping_condition
+        self._supported = {}
+        self._expansions = {}
+        self.hits = 0
+        self.misses = 0
+        self.preprocess_time = 0.0
+        self._reported = (0, 0, 0.0)
+
+    def stopping_condition(self, op) -> bool:
+        """
+        Memoized stopping condition. Its result only depends on the type and the name of the operation.
+        """
+        key = (type(op), op.name)
+        if key not in self._supported:
+            self._supported[key] = self._stopping_condition(op)
+        return self._supported[key]
+
+    def key(self, op):
+        """
+        Get the cache key of an operation.
+
+        Args:
+            op (Operator): The operation.
+
+        Returns:
+            Optional[tuple]: The type, hyperparameters and number of wires of the operation, or None if its
+                hyperparameters cannot be hashed.
+        """
+        try:
+            hyperparameters = tuple(
+                (name, _hashable(value, op.wires))
+                for name, value in sorted(op.hyperparameters.items())
+            )
+        except TypeError:
+            return None
+        return (type(op), op.name, len(op.wires), op.num_params, hyperparameters)
+
+    def expand(self, op):
+        """
+        Decompose an operation until every operation is supported by the device.
+
+        Args:
+            op (Operator): The operation.
+
+        Returns:
+            list[Operator]: The supported operations.
+
+        Raises:
+            DeviceError: If an unsupported operation has no decomposition.
+        """
+        if self.stopping_condition(op):
+            return [op]
+
+        key = self.key(op)
+        if key is not None and key in self._expansions:
+            self.hits += 1
+            return self._instantiate(self._expansions[key], op)
+
+        if not op.has_decomposition:
+            raise qml.DeviceError(
+                f"Operator {op} not supported on snowflurry.qubit and does not provide a decomposition."
+            )
+        self.misses += 1
+        expansion = [leaf for sub_op in op.decomposition() for leaf in self.expand(sub_op)]
+        if key is not None:
+            template = self._template(op, expansion)
+            if template is not None:
+                self._expansions[key] = template
+        return expansion
+
+    def _template(self, op, expansion):
+        """
+        Express the decomposition of an operation in terms of its wires and parameters.
+
+        Returns:
+            Optional[list]: For each decomposed operation, the operation, the positions of its wires in the
+                wires of ``op`` and the index of each of its parameters in the parameters of ``op`` (None for
+                a constant), or None if the decomposition cannot be reused.
+        """
+        template = []
+        for leaf in expansion:
+            if any(wire not in op.wires for wire in leaf.wires):
+                return None
+            sources = []
+            for parameter in leaf.data:
+                index = next(
+                    (i for i, data in enumerate(op.data) if data is parameter), None
+                )
+                if index is None and op.num_params > 0:
+                    return None
+                sources.append(index)
+            positions = [op.wires.index(wire) for wire in leaf.wires]
+            template.append((leaf, positions, sources))
+        # a parameter that no decomposed operation uses may have chosen the decomposed operations
+        used = {source for _, _, sources in template for source in sources}
+        if any(index not in used for index in range(len(op.data))):
+            return None
+        return template
+
+    def _instantiate(self, template, op):
+        expansion = []
+        for leaf, positions, sources in template:
+            wire_map = {leaf.wires[i]: op.wires[p] for i, p in enumerate(positions)}
+            new_op = leaf.map_wires(wire_map)
+            if any(source is not None for source in sources):
+                parameters = [
+                    op.data[source] if source is not None else data
+                    for source, data in zip(sources, leaf.data)
+                ]
+                new_op = qml.ops.functions.bind_new_parameters(new_op, parameters)
+            expansion.append(new_op)
+        return expansion
+
+    def pop_statistics(self) -> dict:
+        """
+        Get the statistics accumulated since the last call, to be reported to the tracker.
+
+        Returns:
+            dict: The number of cache hits and misses and the preprocessing time.
+        """
+        hits, misses, preprocess_time = self._reported
+        statistics = {
+            "decomposition_cache_hits": self.hits - hits,
+            "decomposition_cache_misses": self.misses - misses,
+            "preprocess_time": self.preprocess_time - preprocess_time,
+        }
+        self._reported = (self.hits, self.misses, self.preprocess_time)
+        return statistics
+
+
+def _hashable(value, wires):
+    """
+    Convert a hyperparameter to a hashable value in which the wires of the operation are replaced by their
+    positions. Raises a TypeError if the hyperparameter cannot be hashed.
+    """
+    if isinstance(value, Wires):
+        return ("wires",) + tuple(
+            ("position", wires.index(w)) if w in wires else ("label", w) for w in value
+        )
+    if isinstance(value, np.ndarray):
+        return ("array", value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item, wires) for item in value)
+    if isinstance(value, dict):
+        return tuple((k, _hashable(v, wires)) for k, v in sorted(value.items()))
+    if isinstance(value, qml.operation.Operator):
+        raise TypeError("Operators in hyperparameters are not cached.")
+    hash(value)
+    return value
+
+
+@transform
+def cached_decompose(tape, cache):
+    """
+    Decompose the operations of a tape that are not supported by the device, using a decomposition cache.
+
+    An initial state preparation is left untouched, as done by PennyLane's ``decompose`` transform.
+
+    Args:
+        tape (QuantumTape): The tape to decompose.
+        cache (DecompositionCache): The decomposition cache of the device.
+
+    Returns:
+        tuple[Sequence[QuantumTape], Callable]: The decomposed tape and the post-processing function.
+
+    Raises:
+        DeviceError: If the decomposition enters an infinite loop and raises a ``RecursionError``.
+    """
+    start = time.perf_counter()
+    operations = []
+    try:
+        for i, op in enumerate(tape.operations):
+            if i == 0 and isinstance(op, qml.operation.StatePrepBase):
+                operations.append(op)
+            else:
+                operations.extend(cache.expand(op))
+    except RecursionError as error:
+        raise qml.DeviceError(
+            "Reached recursion limit trying to decompose operations. "
+            "Operator decomposition may have entered an infinite loop."
+        ) from error
+    new_tape = type(tape)(operations, tape.measurements, shots=tape.shots)
+    cache.preprocess_time += time.perf_counter() - start
+
+    def null_postprocessing(results):
+        return results[0]
+
+    return (new_tape,), null_postprocessing
@@ -0,0 +1,228 @@
+"""
+Contains the executors used by the device to run batches of circuits in other processes, on one node with a
+process pool or on several nodes with MPI.
+
+Circuits are sent to the workers in the compact format of :mod:`~.serialization` and every worker keeps
+its Julia runtime warm between batches: pools are created on first use and reused by later executions.
+Results are gathered in the order of the batch.
+
+The MPI executor uses ``mpi4py.futures``, which is an optional dependency. On a single machine, start the
+program with one process for the device and the others as workers:
+
+    mpirun -n 4 python -m mpi4py.futures my_script.py
+
+Inside a SLURM allocation, the number of workers defaults to the number of tasks of the allocation minus
+the task running the device (see :func:`slurm_allocation`).
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import abc
+import multiprocessing
+import os
+import threading
+import numpy as np
+from pennylane_snowflurry.serialization import deserialize_tape, serialize_tape
+
+# Result stores opened by a worker, by path
+_worker_stores = {}
+
+# A memory-mapped result returned by a worker, sent as the path of its file
+MemmapFile = namedtuple("MemmapFile", ["path"])
+
+
+def slurm_allocation() -> dict:
+    """
+    Detect the SLURM allocation the process runs in.
+
+    Returns:
+        dict: The job id and the number of nodes, tasks and CPUs per task of the allocation, or an empty
+            dictionary outside of a SLURM job.
+    """
+    if "SLURM_JOB_ID" not in os.environ:
+        return {}
+    nodes = int(os.environ.get("SLURM_JOB_NUM_NODES", os.environ.get("SLURM_NNODES", 1)))
+    tasks = int(os.environ.get("SLURM_NTASKS", nodes))
+    return {
+        "job_id": os.environ["SLURM_JOB_ID"],
+        "nodes": nodes,
+        "tasks": tasks,
+        "cpus_per_task": int(os.environ.get("SLURM_CPUS_PER_TASK", 1)),
+    }
+
+
+def execute_record(record, options, seed=None):
+    """
+    Execute a serialized circuit. This is the function run by the workers.
+
+    Args:
+        record (dict): The serialized circuit.
+        options (dict): The keyword arguments of the converter (credentials, shot chunk size...), and the
+            path of the result store of the device, if any.
+        seed (Optional[np.random.SeedSequence]): The seed of the generator drawing the shots of the
+            circuit. The generator is seeded from the OS entropy without it.
+
+    Returns:
+        The result of the circuit.
+    """
+    from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+    from pennylane_snowflurry.result_store import ResultStore
+
+    options = dict(options)
+    store_path = options.pop("result_store", None)
+    replay = options.pop("replay", False)
+    result_store = None
+    if store_path is not None:
+        if store_path not in _worker_stores:
+            _worker_stores[store_path] = ResultStore(store_path, replay=replay)
+        result_store = _worker_stores[store_path]
+
+    wire_labels = record["wire_labels"]
+    result = PennylaneConverter(
+        deserialize_tape(record),
+        debugger=None,
+        interface=None,
+        wires=len(wire_labels),
+        result_store=result_store,
+        wire_map={label: i + 1 for i, label in enumerate(wire_labels)},
+        rng=np.random.default_rng(seed),
+        **options,
+    ).simulate()
+    return _detach_memmaps(result)
+
+
+def _detach_memmaps(result):
+    """
+    Replace the memory-mapped arrays of a result by the paths of their files, so that their data is not
+    copied back from the worker.
+    """
+    if isinstance(result, np.memmap):
+        return MemmapFile(result.filename)
+    if isinstance(result, tuple):
+        return tuple(_detach_memmaps(value) for value in result)
+    return result
+
+
+def _attach_memmaps(result):
+    """
+    Open the memory-mapped arrays of a result returned by a worker.
+    """
+    if isinstance(result, MemmapFile):
+        return np.load(result.path, mmap_mode="r+")
+    if isinstance(result, tuple):
+        return tuple(_attach_memmaps(value) for value in result)
+    return result
+
+
+class BatchExecutor(abc.ABC):
+    """
+    Runs the circuits of a batch in a pool of workers and gathers their results in order.
+
+    Subclasses create the pool with :meth:`create_pool`, which must return a ``concurrent.futures.Executor``.
+    The pool is created on first use and kept until :meth:`shutdown`.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def create_pool(self):
+        """Create the ``concurrent.futures.Executor`` running the workers."""
+
+    @property
+    def pool(self):
+        """The pool of workers, created on first use."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self.create_pool()
+            return self._pool
+
+    def map(self, circuits, options, registers=None, memory_budget=None, peaks=None, seeds=None):
+        """
+        Execute circuits in the workers.
+
+        Args:
+            circuits (Sequence[QuantumTape]): The circuits to execute.
+            options (dict): The options passed to :func:`execute_record`.
+            registers (Optional[Sequence[Sequence]]): The wire labels of the register of each circuit.
+                Defaults to the wires of each circuit.
+            memory_budget (Optional[MemoryBudget]): If given, circuits are only submitted while their
+                estimated peak memory fits in the budget next to the circuits already running.
+            peaks (Optional[Sequence[int]]): The estimated peak memory of each circuit.
+            seeds (Optional[Sequence[np.random.SeedSequence]]): The seed of the shots of each circuit, so
+                that seeded devices draw the same samples on every run.
+
+        Returns:
+            tuple: The results of the circuits, in order.
+        """
+        futures = []
+        try:
+            for i, circuit in enumerate(circuits):
+                wires = registers[i] if registers is not None else None
+                seed = seeds[i] if seeds is not None else None
+                record = serialize_tape(circuit, wires=wires)
+                if memory_budget is None:
+                    futures.append(self.pool.submit(execute_record, record, options, seed))
+                    continue
+                memory_budget.acquire(peaks[i])
+                future = self.pool.submit(execute_record, record, options, seed)
+                future.add_done_callback(
+                    lambda _, nbytes=peaks[i]: memory_budget.release(nbytes)
+                )
+                futures.append(future)
+            return tuple(_attach_memmaps(future.result()) for future in futures)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the workers."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+class ProcessPoolBatchExecutor(BatchExecutor):
+    """
+    Runs circuits in a pool of processes on the current node. Workers are spawned rather than forked, since
+    the Julia runtime of the device process cannot be forked.
+
+    Args:
+        max_workers (int): The number of processes.
+    """
+
+    def __init__(self, max_workers):
+        super().__init__()
+        self.max_workers = max_workers
+
+    def create_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+
+class MPIBatchExecutor(BatchExecutor):
+    """
+    Runs circuits on the ranks of an MPI job, possibly spread over several nodes, with ``mpi4py.futures``.
+
+    Args:
+        max_workers (Optional[int]): The number of worker ranks. Defaults to the tasks of the SLURM
+            allocation minus one, or to the size of the MPI universe chosen by ``mpi4py``.
+    """
+
+    def __init__(self, max_workers=None):
+        super().__init__()
+        if max_workers is None:
+            tasks = slurm_allocation().get("tasks", 0)
+            max_workers = tasks - 1 if tasks > 1 else None
+        self.max_workers = max_workers
+
+    def create_pool(self):
+        try:
+            from mpi4py.futures import MPIPoolExecutor
+        except ImportError as error:
+            raise ImportError(
+                "Distributed execution requires mpi4py. Install it with `pip install mpi4py`."
+            ) from error
+        return MPIPoolExecutor(max_workers=self.max_workers)
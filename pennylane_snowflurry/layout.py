@@ -0,0 +1,213 @@
+"""
+Contains the layout stage of QPU submissions, which places the logical qubits of a circuit on the physical
+qubits of the QPU so that few SWAP gates are needed to route its two-qubit gates.
+
+The coupling map of the QPU is read from a JSON description, so that layouts are selected offline. The
+maps shipped with the plugin are in the ``coupling_maps`` directory, and the connectivity of any QPU known
+to Snowflurry can be exported with :func:`export_coupling_map`.
+"""
+from collections import Counter, deque, namedtuple
+import itertools
+import json
+import os
+import numpy as np
+
+COUPLING_MAP_DIRECTORY = os.path.join(os.path.dirname(__file__), "coupling_maps")
+
+# CNOTs of the decomposition of a SWAP gate
+SWAP_CNOTS = 3
+
+Layout = namedtuple("Layout", ["mapping", "swaps", "trivial_swaps"])
+Layout.__doc__ = """The physical qubit of each logical qubit (both 1-based), with the estimated SWAPs needed to route the circuit on this layout and on the trivial layout."""
+
+
+class CouplingMap:
+    """
+    The pairs of physical qubits of a QPU on which two-qubit gates can be applied.
+
+    Args:
+        num_qubits (int): The number of physical qubits.
+        edges (Iterable[Sequence[int]]): The coupled pairs of qubits, numbered from 1.
+        name (str): The name of the QPU.
+    """
+
+    def __init__(self, num_qubits, edges, name=""):
+        self.num_qubits = num_qubits
+        self.name = name
+        self.neighbours = {qubit: set() for qubit in range(1, num_qubits + 1)}
+        for a, b in edges:
+            self.neighbours[a].add(b)
+            self.neighbours[b].add(a)
+        self.distances = self._distances()
+
+    @classmethod
+    def load(cls, name_or_path):
+        """
+        Load a coupling map from a JSON description.
+
+        Args:
+            name_or_path (str): The name of a map shipped with the plugin (e.g. ``"grid_6x4"``), or the path
+                of a JSON file with ``num_qubits`` and ``edges`` entries.
+
+        Returns:
+            CouplingMap: The coupling map.
+        """
+        path = name_or_path
+        if not os.path.exists(path):
+            path = os.path.join(COUPLING_MAP_DIRECTORY, f"{name_or_path}.json")
+        if not os.path.exists(path):
+            raise ValueError(f"No coupling map named {name_or_path!r} and no file at this path.")
+        with open(path) as file:
+            description = json.load(file)
+        return cls(description["num_qubits"], description["edges"], description.get("name", ""))
+
+    def _distances(self):
+        """
+        Compute the length of the shortest path between every pair of qubits, with a breadth-first search
+        from each qubit. Disconnected qubits are at a distance of ``num_qubits``.
+        """
+        distances = np.full((self.num_qubits + 1, self.num_qubits + 1), self.num_qubits, dtype=int)
+        for source in self.neighbours:
+            distances[source, source] = 0
+            queue = deque([source])
+            while queue:
+                qubit = queue.popleft()
+                for neighbour in self.neighbours[qubit]:
+                    if distances[source, neighbour] > distances[source, qubit] + 1:
+                        distances[source, neighbour] = distances[source, qubit] + 1
+                        queue.append(neighbour)
+        return distances
+
+
+def export_coupling_map(path, connectivity, name=""):
+    """
+    Write the coupling map of a Snowflurry connectivity to a JSON description.
+
+    Args:
+        path (str): The path of the JSON file.
+        connectivity (str): The Julia expression of the connectivity, e.g. ``"LatticeConnectivity(6, 4)"``
+            or ``"get_connectivity(AnyonYamaskaQPU)"``.
+        name (str): The name of the QPU.
+
+    Returns:
+        CouplingMap: The exported coupling map.
+    """
+    from pennylane_snowflurry.pennylane_converter import Snowflurry
+
+    adjacency = Snowflurry.seval(f"get_adjacency_list({connectivity})")
+    edges = sorted(
+        {tuple(sorted((int(a), int(b)))) for a, neighbours in adjacency.items() for b in neighbours}
+    )
+    description = {"name": name, "num_qubits": len(adjacency), "edges": [list(e) for e in edges]}
+    with open(path, "w") as file:
+        json.dump(description, file, indent=4)
+    return CouplingMap(len(adjacency), edges, name)
+
+
+def interactions(tape, wire_map):
+    """
+    Get the pairs of logical qubits acted on together by the gates of a tape, in order.
+
+    Args:
+        tape (QuantumTape): The tape.
+        wire_map (dict): The 1-based logical qubit of each wire label.
+
+    Returns:
+        list[tuple[int, int]]: A pair per two-qubit gate, and one per pair of wires of wider gates.
+    """
+    pairs = []
+    for op in tape.operations:
+        if len(op.wires) > 1:
+            pairs.extend(itertools.combinations([wire_map[wire] for wire in op.wires], 2))
+    return pairs
+
+
+def swap_count(mapping, pairs, coupling_map):
+    """
+    Estimate the SWAPs needed to route gates on a layout: each gate needs one SWAP per qubit between its
+    qubits on the shortest path of the coupling map.
+    """
+    distances = coupling_map.distances
+    return int(sum(max(distances[mapping[a], mapping[b]] - 1, 0) for a, b in pairs))
+
+
+class LayoutSelector:
+    """
+    Selects the layout of circuits on a QPU, caching the layout of each circuit structure.
+
+    Candidate layouts are grown from every physical qubit: the logical qubit interacting the most is placed
+    on it, then each next logical qubit, by decreasing interactions with the placed qubits, goes to the free
+    physical qubit nearest to its placed partners. The candidate needing the fewest SWAPs is kept, the
+    trivial layout (logical qubit ``i`` on physical qubit ``i``) winning ties.
+
+    Args:
+        coupling_map (CouplingMap): The coupling map of the QPU.
+    """
+
+    def __init__(self, coupling_map):
+        self.coupling_map = coupling_map
+        self._layouts = {}
+
+    def select(self, tape, wire_map):
+        """
+        Select the layout of a tape.
+
+        Args:
+            tape (QuantumTape): The tape.
+            wire_map (dict): The 1-based logical qubit of each wire label.
+
+        Returns:
+            Layout: The selected layout.
+
+        Raises:
+            ValueError: If the tape has more qubits than the QPU.
+        """
+        num_logical = len(wire_map)
+        if num_logical > self.coupling_map.num_qubits:
+            raise ValueError(
+                f"The circuit has {num_logical} qubits, but {self.coupling_map.name or 'the QPU'} only "
+                f"has {self.coupling_map.num_qubits}."
+            )
+        pairs = interactions(tape, wire_map)
+        key = (num_logical, tuple(pairs))
+        if key not in self._layouts:
+            self._layouts[key] = self._select(num_logical, pairs)
+        return self._layouts[key]
+
+    def _select(self, num_logical, pairs):
+        trivial = {qubit: qubit for qubit in range(1, num_logical + 1)}
+        trivial_swaps = swap_count(trivial, pairs, self.coupling_map)
+        best, best_swaps = trivial, trivial_swaps
+        if trivial_swaps > 0:
+            for seed in self.coupling_map.neighbours:
+                candidate = self._grow(seed, num_logical, pairs)
+                swaps = swap_count(candidate, pairs, self.coupling_map)
+                if swaps < best_swaps:
+                    best, best_swaps = candidate, swaps
+        return Layout(best, best_swaps, trivial_swaps)
+
+    def _grow(self, seed, num_logical, pairs):
+        weights = Counter(tuple(sorted(pair)) for pair in pairs)
+        partners = {qubit: Counter() for qubit in range(1, num_logical + 1)}
+        for (a, b), weight in weights.items():
+            partners[a][b] += weight
+            partners[b][a] += weight
+        distances = self.coupling_map.distances
+
+        unplaced = sorted(partners, key=lambda qubit: -sum(partners[qubit].values()))
+        mapping = {unplaced.pop(0): seed}
+        free = set(self.coupling_map.neighbours) - {seed}
+        while unplaced:
+            # the logical qubit interacting the most with the placed qubits
+            logical = max(
+                unplaced,
+                key=lambda qubit: sum(w for q, w in partners[qubit].items() if q in mapping),
+            )
+            unplaced.remove(logical)
+            placed = [(mapping[q], w) for q, w in partners[logical].items() if q in mapping]
+            mapping[logical] = min(
+                free,
+                key=lambda physical: (sum(w * distances[physical, p] for p, w in placed), physical),
+            )
+            free.remove(mapping[logical])
+        return mapping
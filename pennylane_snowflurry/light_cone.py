@@ -0,0 +1,69 @@
+"""
+Contains the light-cone pass that shrinks the register simulated for a tape to the wires its measurements
+depend on.
+"""
+import pennylane as qml
+from pennylane.measurements import CountsMP, DensityMatrixMP, SampleMP, StateMP
+from pennylane.tape import QuantumScript
+
+
+def measured_wires(measurements):
+    """
+    Get the wires the results of some measurement processes depend on.
+
+    Args:
+        measurements (Sequence[MeasurementProcess]): The measurement processes.
+
+    Returns:
+        Optional[set]: The wires, or None if a result depends on the whole register: states, measurements
+            on all wires, and counts and samples, whose outcomes have one bit per wire of the register.
+            Reduced density matrices only depend on their wires.
+    """
+    wires = set()
+    for mp in measurements:
+        if isinstance(mp, DensityMatrixMP) and len(mp.wires) > 0:
+            wires.update(mp.wires)
+            continue
+        if isinstance(mp, (StateMP, CountsMP, SampleMP)) or len(mp.wires) == 0:
+            return None
+        wires.update(mp.wires)
+    return wires
+
+
+def light_cone(tape, wires):
+    """
+    Remove the gates that cannot affect the measurements of a tape, and the wires left idle.
+
+    Walking the tape backwards from the measured wires, a gate is kept if it acts on a wire of the cone,
+    and its wires then join the cone. The other gates act on wires whose state is never measured
+    afterwards, so the reduced density matrix of the measured wires is the same without them.
+
+    Args:
+        tape (QuantumTape): The tape.
+        wires (Sequence): The wire labels of the device.
+
+    Returns:
+        Optional[Tuple[QuantumScript, list]]: The pruned tape and the labels of the wires left in the
+            register, in the order of the device wires, or None if the tape cannot be pruned (the
+            measurements depend on the whole register, or the tape holds snapshots or a state
+            preparation) or if nothing would be removed.
+    """
+    cone = measured_wires(tape.measurements)
+    if cone is None:
+        return None
+    if any(
+        isinstance(op, (qml.Snapshot, qml.operation.StatePrepBase)) for op in tape.operations
+    ):
+        return None
+
+    kept = []
+    for op in reversed(tape.operations):
+        if cone.intersection(op.wires):
+            kept.append(op)
+            cone.update(op.wires)
+    kept.reverse()
+
+    labels = [wire for wire in wires if wire in cone]
+    if len(labels) == len(wires) and len(kept) == len(tape.operations):
+        return None
+    return QuantumScript(kept, tape.measurements, shots=tape.shots), labels
@@ -3,4 +3,8 @@ from .counts import Counts
 from .sample import Sample
 from .probabilities import Probabilities
 from .state import State
+from .density_matrix import DensityMatrix, VnEntropy, Purity
 from .expectation_value import ExpectationValue
+from .planner import MeasurementPlanner
+from .variance import Variance
+from .counts_array import CountsArray
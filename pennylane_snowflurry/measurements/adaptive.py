@@ -0,0 +1,149 @@
+import numpy as np
+from .counts_array import pack_bits
+from .pauli_grouping import ShotEstimate, group_estimate, qwc_groups, sample_in_basis
+
+# Shots drawn by the first round of an adaptive estimate, per group of terms
+INITIAL_SHOTS = 100
+
+
+def neyman_allocation(deviations, shots):
+    """
+    Split shots across groups in proportion to the standard deviation of a single shot of each group,
+    which minimizes the variance of the sum of the group estimates.
+
+    Args:
+        deviations (Sequence[float]): The standard deviation of a single shot of each group.
+        shots (int): The number of shots to split.
+
+    Returns:
+        np.ndarray: The number of shots of each group, summing to ``shots``.
+    """
+    deviations = np.asarray(deviations, dtype=float)
+    if deviations.sum() > 0:
+        weights = deviations / deviations.sum()
+    else:
+        weights = np.full(len(deviations), 1.0 / len(deviations))
+    exact = weights * shots
+    allocation = np.floor(exact).astype(int)
+    # the remaining shots go to the largest fractional parts
+    remainder = shots - allocation.sum()
+    allocation[np.argsort(allocation - exact)[:remainder]] += 1
+    return allocation
+
+
+class AdaptiveSampler:
+    """
+    Samples the snowflurry circuit in measurement bases, accumulating counts over rounds.
+
+    Jobs sampling the same basis with the same number of shots are numbered, so that the result store keeps
+    each round instead of serving the first one again.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit.
+    """
+
+    def __init__(self, converter):
+        self.converter = converter
+        converter.remove_readouts()
+        self.base_length = len(converter.julia_instructions)
+        self.counts = {}
+        self.shots = 0
+        self._runs = {}
+
+    def sample(self, group, basis, shots):
+        """
+        Draw shots in the basis of a group and add them to the counts of the group.
+
+        Returns:
+            CountsArray: The counts of the group over all rounds.
+        """
+        run = self._runs.get((group, shots), 0)
+        self._runs[(group, shots)] = run + 1
+        counts = sample_in_basis(self.converter, basis, shots, run)
+        self.converter.truncate_instructions(self.base_length)
+        if group in self.counts:
+            counts = counts.merge(self.counts[group])
+        self.counts[group] = counts
+        self.shots += shots
+        return counts
+
+
+def adaptive_expval(converter, terms, constant, shots, target, initial_shots=INITIAL_SHOTS):
+    """
+    Estimate the expectation value of an observable decomposed into Pauli words, drawing shots until the
+    standard error of the estimate reaches a target.
+
+    Every qubit-wise-commuting group is first sampled with ``initial_shots`` shots. Each following round
+    draws as many shots as all previous rounds together, split across the groups in proportion to their
+    standard deviation (Neyman allocation), until the standard error is at most ``target`` or the budget
+    of ``shots`` is spent. A group whose outcomes are all equal is deemed exact after the first round.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit.
+        terms (list[tuple[float, dict]]): The terms of the observable, as returned by :func:`pauli_terms`.
+        constant (float): The coefficient of the identity.
+        shots (int): The budget of shots, over all groups.
+        target (float): The standard error at which to stop.
+        initial_shots (int): The shots of the first round, per group.
+
+    Returns:
+        ShotEstimate: The estimate of the expectation value, the variance of the estimate and the number
+            of shots drawn.
+    """
+    groups = qwc_groups(terms)
+    sampler = AdaptiveSampler(converter)
+
+    pilot = max(1, min(initial_shots, shots // len(groups)))
+    estimates = [
+        group_estimate(sampler.sample(g, basis, pilot), group_terms)
+        for g, (basis, group_terms) in enumerate(groups)
+    ]
+    while True:
+        variance = sum(estimate.variance for estimate in estimates)
+        remaining = shots - sampler.shots
+        if np.sqrt(variance) <= target or remaining <= 0:
+            break
+        deviations = [np.sqrt(estimate.variance * estimate.shots) for estimate in estimates]
+        allocation = neyman_allocation(deviations, min(sampler.shots, remaining))
+        for g, (basis, group_terms) in enumerate(groups):
+            if allocation[g] > 0:
+                counts = sampler.sample(g, basis, int(allocation[g]))
+                estimates[g] = group_estimate(counts, group_terms)
+
+    value = constant + sum(estimate.value for estimate in estimates)
+    return ShotEstimate(value, variance, sampler.shots)
+
+
+def adaptive_probabilities(converter, wires, shots, target, initial_shots=INITIAL_SHOTS):
+    """
+    Estimate the probabilities of the outcomes of some wires, drawing shots until the largest standard
+    error of the probabilities reaches a target.
+
+    The first round draws ``initial_shots`` shots, and each following round as many shots as all previous
+    rounds together, until the standard error is at most ``target`` or the budget of ``shots`` is spent.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit.
+        wires (Sequence[int]): The wires, indexed from 0.
+        shots (int): The budget of shots.
+        target (float): The standard error at which to stop.
+        initial_shots (int): The shots of the first round.
+
+    Returns:
+        ShotEstimate: The probabilities, the variance of each probability and the number of shots drawn.
+    """
+    basis = {wire: "Z" for wire in wires}
+    sampler = AdaptiveSampler(converter)
+    round_shots = min(initial_shots, shots)
+    while True:
+        counts = sampler.sample(0, basis, round_shots)
+        outcomes = pack_bits(counts.bits()[:, list(wires)])
+        probabilities = np.bincount(
+            outcomes, weights=counts.counts, minlength=2 ** len(wires)
+        ) / counts.shots
+        variances = probabilities * (1 - probabilities) / counts.shots
+        remaining = shots - sampler.shots
+        if np.sqrt(variances.max()) <= target or remaining <= 0:
+            break
+        round_shots = min(sampler.shots, remaining)
+    return ShotEstimate(probabilities, variances, sampler.shots)
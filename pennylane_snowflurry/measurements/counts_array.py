@@ -0,0 +1,191 @@
+import numpy as np
+
+# Widest outcomes packed into an int64
+MAX_PACKED_BITS = 63
+
+
+def pack_bits(bits):
+    """
+    Pack rows of bits into integers, with the first bit as the most significant bit.
+
+    Args:
+        bits (np.ndarray): An array of shape ``(shots, num_bits)`` with ``num_bits <= 63``.
+
+    Returns:
+        np.ndarray: The ``shots`` packed outcomes.
+
+    Raises:
+        ValueError: If the rows have more than 63 bits.
+    """
+    num_bits = bits.shape[1]
+    if num_bits > MAX_PACKED_BITS:
+        raise ValueError(
+            f"Outcomes of {num_bits} bits cannot be packed into integers of {MAX_PACKED_BITS} bits."
+        )
+    weights = np.left_shift(np.int64(1), np.arange(num_bits - 1, -1, -1, dtype=np.int64))
+    return bits.astype(np.int64) @ weights
+
+
+def unpack_bits(outcomes, num_bits):
+    """
+    Unpack integers into rows of bits, with the first bit as the most significant bit.
+
+    Args:
+        outcomes (np.ndarray): The packed outcomes.
+        num_bits (int): The number of bits per outcome.
+
+    Returns:
+        np.ndarray: An array of shape ``(len(outcomes), num_bits)``.
+    """
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(outcomes, dtype=np.int64)[:, None] >> shifts) & 1
+
+
+def bits_from_bitstrings(bitstrings):
+    """
+    Convert bitstrings of equal length to rows of bits without a Python loop over the bits.
+
+    Args:
+        bitstrings (Sequence[str]): The bitstrings.
+
+    Returns:
+        np.ndarray: An array of shape ``(len(bitstrings), length)`` of ``uint8``.
+    """
+    if len(bitstrings) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    buffer = np.frombuffer("".join(bitstrings).encode(), dtype=np.uint8)
+    return (buffer - ord("0")).reshape(len(bitstrings), -1)
+
+
+class CountsArray:
+    """
+    Array-backed counts of integer-encoded outcomes.
+
+    Outcomes are stored as packed integers (wire 0 is the most significant bit) in increasing order, next
+    to the number of times they were measured. Building, merging and projecting counts are vectorized
+    NumPy operations, and bitstring keys are only formatted by :meth:`to_dict`, for the distinct outcomes.
+
+    Args:
+        outcomes (np.ndarray): The distinct packed outcomes, in increasing order.
+        counts (np.ndarray): The number of times each outcome was measured.
+        num_bits (int): The number of bits of each outcome.
+    """
+
+    def __init__(self, outcomes, counts, num_bits):
+        self.outcomes = np.asarray(outcomes, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.num_bits = num_bits
+
+    @classmethod
+    def from_outcomes(cls, outcomes, num_bits):
+        """
+        Histogram packed outcomes, one per shot.
+        """
+        outcomes = np.asarray(outcomes, dtype=np.int64)
+        if num_bits <= 16:
+            counts = np.bincount(outcomes, minlength=0)
+            distinct = np.flatnonzero(counts)
+            return cls(distinct, counts[distinct], num_bits)
+        distinct, counts = np.unique(outcomes, return_counts=True)
+        return cls(distinct, counts, num_bits)
+
+    @classmethod
+    def from_dict(cls, counts, num_bits=None):
+        """
+        Build counts from a dictionary with bitstring keys, e.g. the results of a QPU job.
+        """
+        if len(counts) == 0:
+            return cls([], [], num_bits or 0)
+        bitstrings = [str(key) for key in counts.keys()]
+        bits = bits_from_bitstrings(bitstrings)
+        outcomes = pack_bits(bits)
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(bitstrings))
+        return cls.concatenate([cls(outcomes, values, bits.shape[1])])
+
+    @classmethod
+    def concatenate(cls, counts_arrays):
+        """
+        Merge counts measured over several batches or shot-vector partitions.
+        """
+        counts_arrays = list(counts_arrays)
+        num_bits = counts_arrays[0].num_bits if counts_arrays else 0
+        if len(counts_arrays) == 0:
+            return cls([], [], num_bits)
+        outcomes = np.concatenate([c.outcomes for c in counts_arrays])
+        counts = np.concatenate([c.counts for c in counts_arrays])
+        distinct, inverse = np.unique(outcomes, return_inverse=True)
+        return cls(distinct, np.bincount(inverse, weights=counts, minlength=len(distinct)), num_bits)
+
+    def merge(self, other):
+        """
+        Merge two counts.
+
+        Args:
+            other (CountsArray): The counts to add.
+
+        Returns:
+            CountsArray: The merged counts.
+        """
+        return CountsArray.concatenate([self, other])
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    @property
+    def shots(self) -> int:
+        """The total number of shots."""
+        return int(self.counts.sum())
+
+    def bits(self):
+        """
+        Get the bits of the distinct outcomes.
+
+        Returns:
+            np.ndarray: An array of shape ``(len(self.outcomes), num_bits)``.
+        """
+        return unpack_bits(self.outcomes, self.num_bits)
+
+    def project(self, bits):
+        """
+        Keep a subset of the bits of each outcome, the other bits being set to 0.
+
+        Args:
+            bits (Sequence[int]): The positions of the bits to keep, 0 being the most significant bit.
+
+        Returns:
+            CountsArray: The projected counts.
+        """
+        mask = 0
+        for bit in bits:
+            mask |= 1 << (self.num_bits - 1 - bit)
+        projected = self.outcomes & mask
+        distinct, inverse = np.unique(projected, return_inverse=True)
+        return CountsArray(
+            distinct, np.bincount(inverse, weights=self.counts, minlength=len(distinct)), self.num_bits
+        )
+
+    def to_dict(self, all_outcomes=False, bits=None):
+        """
+        Format the counts as a dictionary with bitstring keys.
+
+        Args:
+            all_outcomes (bool): Whether to include the outcomes that were never measured, with a count of 0.
+            bits (Optional[Sequence[int]]): With ``all_outcomes``, the positions of the bits that can take
+                any value, the other bits being 0. Defaults to all bits.
+
+        Returns:
+            dict[str, int]: The number of times each bitstring was measured.
+        """
+        outcomes, counts = self.outcomes, self.counts
+        if all_outcomes:
+            bits = list(range(self.num_bits)) if bits is None else sorted(bits)
+            positions = np.array([self.num_bits - 1 - bit for bit in bits], dtype=np.int64)
+            every = (unpack_bits(np.arange(2 ** len(bits)), len(bits)) << positions).sum(axis=1)
+            every = np.sort(every)
+            full = np.zeros(len(every), dtype=np.int64)
+            full[np.searchsorted(every, outcomes)] = counts
+            outcomes, counts = every, full
+        return {
+            format(int(outcome), f"0{self.num_bits}b"): int(count)
+            for outcome, count in zip(outcomes, counts)
+        }
@@ -0,0 +1,39 @@
+import numpy as np
+from .measurement_strategy import MeasurementStrategy
+from .marginal import reduced_density_matrix
+
+
+class DensityMatrix(MeasurementStrategy):
+
+    def __init__(self):
+        super().__init__()
+
+    def measure(self, converter, mp, shots):
+        # the other wires are traced out of the cached state, without building the full density matrix
+        return reduced_density_matrix(converter.get_state(), mp.wires.tolist(), converter.wires)
+
+
+class VnEntropy(MeasurementStrategy):
+
+    def __init__(self):
+        super().__init__()
+
+    def measure(self, converter, mp, shots):
+        rho = reduced_density_matrix(converter.get_state(), mp.wires.tolist(), converter.wires)
+        eigenvalues = np.linalg.eigvalsh(rho)
+        eigenvalues = eigenvalues[eigenvalues > 0]
+        entropy = -np.sum(eigenvalues * np.log(eigenvalues))
+        if mp.log_base is not None:
+            entropy /= np.log(mp.log_base)
+        return entropy
+
+
+class Purity(MeasurementStrategy):
+
+    def __init__(self):
+        super().__init__()
+
+    def measure(self, converter, mp, shots):
+        rho = reduced_density_matrix(converter.get_state(), mp.wires.tolist(), converter.wires)
+        # Tr(rho^2) is the sum of the squared moduli of the entries of the hermitian rho
+        return np.real(np.vdot(rho, rho))
@@ -1,6 +1,8 @@
 from .measurement_strategy import MeasurementStrategy
+from .pauli_grouping import pauli_terms, estimate_expval
+from .adaptive import adaptive_expval
+from .marginal import expval_and_variance
 import pennylane as qml
-from juliacall import convert
 import numpy as np
 
 
@@ -10,17 +12,29 @@ class ExpectationValue(MeasurementStrategy):
         super().__init__()
 
     def measure(self, converter, mp, shots):
-        # FIXME : this measurement does work when the number of qubits measured is not equal to the number of qubits
-        #  in the circuit
-        # Requires some processing to work with larger matrices
-        converter.remove_readouts()
-        self.Snowflurry.result_state = self.Snowflurry.simulate(self.Snowflurry.sf_circuit)
-        if mp.obs is not None and mp.obs.has_matrix:
-            print(mp.obs)
-            observable_matrix = qml.matrix(mp.obs)
-            print(observable_matrix)
-            expected_value = self.Snowflurry.expected_value(
-                self.Snowflurry.DenseOperator(convert(self.Snowflurry.Matrix, observable_matrix)),
-                self.Snowflurry.result_state
-            )
-            return np.real(expected_value)
+        if converter.shot_based and mp.obs is not None:
+            # with shots, observables with a Pauli decomposition are estimated by sampling one circuit
+            # per group of qubit-wise-commuting terms
+            try:
+                terms, constant = pauli_terms(mp.obs)
+            except ValueError:
+                terms = None
+            if terms is not None and converter.target_precision is not None:
+                # shots are drawn in rounds until the target precision is reached
+                estimate = adaptive_expval(
+                    converter, terms, constant, shots, converter.target_precision
+                )
+                converter.estimates[mp] = estimate
+                return estimate.value
+            if terms is not None:
+                estimate = estimate_expval(converter, terms, constant, shots)
+                converter.estimates[mp] = estimate
+                return estimate.value
+
+        # the observable is applied in NumPy to the cached state, which is shared with the other
+        # measurements of the circuit (and built with the circuits of its family), as a sparse matrix or
+        # on its own wires
+        expval, _ = expval_and_variance(
+            converter.get_state(), mp.obs, converter.wires, converter.sparse_cache
+        )
+        return expval
@@ -0,0 +1,256 @@
+import numpy as np
+import pennylane as qml
+from .pauli_grouping import pauli_terms
+
+# Y |0> = i |1> and Y |1> = -i |0>, Z |0> = |0> and Z |1> = -|1>
+PAULI_PHASES = {"Y": (-1j, 1j), "Z": (1, -1)}
+
+
+def probability_tensor(state, num_wires):
+    """
+    Compute the probabilities of the computational basis states as a tensor with one axis per wire.
+
+    Args:
+        state (np.ndarray): The state vector, with wire 0 as the most significant bit.
+        num_wires (int): The number of wires.
+
+    Returns:
+        np.ndarray: A tensor of shape ``(2,) * num_wires``.
+    """
+    return (np.abs(state) ** 2).reshape((2,) * num_wires)
+
+
+def marginal_probabilities(probabilities, wires):
+    """
+    Marginalize a probability tensor on a subset of wires, in any order.
+
+    Args:
+        probabilities (np.ndarray): A tensor of shape ``(2,) * num_wires``.
+        wires (Sequence[int]): The wires to keep, in the order of the result. All wires are kept, in
+            order, if empty.
+
+    Returns:
+        np.ndarray: The flat probabilities of the ``2 ** len(wires)`` basis states of the kept wires.
+    """
+    wires = list(wires)
+    if len(wires) == 0:
+        return probabilities.reshape(-1)
+    traced = tuple(axis for axis in range(probabilities.ndim) if axis not in wires)
+    marginal = probabilities.sum(axis=traced) if traced else probabilities
+    # after the sum, the axes of the kept wires are in increasing order
+    kept = sorted(wires)
+    marginal = np.transpose(marginal, [kept.index(wire) for wire in wires])
+    return marginal.reshape(-1)
+
+
+def reduced_density_matrix(state, wires, num_wires):
+    """
+    Compute the density matrix of a subset of wires by tracing the other wires out of a state vector.
+
+    The traced wires are contracted with a single tensor product of the state with its conjugate, so that
+    only the ``4 ** len(wires)`` entries of the result are built.
+
+    Args:
+        state (np.ndarray): The state vector, with wire 0 as the most significant bit.
+        wires (Sequence[int]): The wires to keep, in the order of the result.
+        num_wires (int): The number of wires.
+
+    Returns:
+        np.ndarray: The density matrix, of shape ``(2 ** len(wires), 2 ** len(wires))``.
+    """
+    wires = list(wires)
+    tensor = state.reshape((2,) * num_wires)
+    traced = [axis for axis in range(num_wires) if axis not in wires]
+    rho = np.tensordot(tensor, tensor.conj(), axes=(traced, traced))
+    # after the contraction, the axes of the kept wires are in increasing order, for the ket then the bra
+    kept = sorted(wires)
+    order = [kept.index(wire) for wire in wires]
+    rho = np.transpose(rho, order + [len(wires) + axis for axis in order])
+    return rho.reshape(2 ** len(wires), 2 ** len(wires))
+
+
+def apply_pauli_word(state, word):
+    """
+    Apply a Pauli word to a state tensor.
+
+    Args:
+        state (np.ndarray): A state tensor of shape ``(2,) * num_wires``.
+        word (dict): The Pauli word, as ``{wire: "X" | "Y" | "Z"}``.
+
+    Returns:
+        np.ndarray: The state tensor ``P |state>``.
+    """
+    result = state
+    for wire, pauli in word.items():
+        if pauli in ("X", "Y"):
+            result = np.flip(result, axis=wire)
+        if pauli in ("Y", "Z"):
+            # phases of the |0> and |1> components once the bit is flipped (Y) or not (Z)
+            phases = np.array(PAULI_PHASES[pauli], dtype=np.result_type(state, np.complex64))
+            shape = [2 if axis == wire else 1 for axis in range(state.ndim)]
+            result = result * phases.reshape(shape)
+    return result
+
+
+def pauli_eigvals(terms, constant, wires):
+    """
+    Compute the eigenvalues of an observable made of Z words, on the basis states of its wires.
+
+    Args:
+        terms (list[tuple[float, dict]]): The terms of the observable, which only contain Z.
+        constant (float): The coefficient of the identity.
+        wires (Sequence[int]): The wires of the observable, in the order of the basis states.
+
+    Returns:
+        np.ndarray: The ``2 ** len(wires)`` eigenvalues.
+    """
+    wires = list(wires)
+    indices = np.arange(2 ** len(wires))
+    bits = (indices[:, None] >> np.arange(len(wires) - 1, -1, -1)) & 1
+    eigvals = np.full(len(indices), constant, dtype=float)
+    for coeff, word in terms:
+        parity = np.bitwise_xor.reduce(bits[:, [wires.index(w) for w in word]], axis=1)
+        eigvals += coeff * (1.0 - 2.0 * parity)
+    return eigvals
+
+
+def apply_operator(tensor, obs, sparse_cache=None):
+    """
+    Apply an observable without a Pauli decomposition to a state tensor, following its structure.
+
+    Sums, products and scalar products are applied operand by operand. Sparse Hamiltonians are applied
+    with a sparse matrix-vector product, and other observables with their matrix on their own wires, so
+    that no dense matrix of the whole register is built.
+
+    Args:
+        tensor (np.ndarray): A state tensor of shape ``(2,) * num_wires``.
+        obs (Observable): The observable, on wires indexed from 0.
+        sparse_cache (Optional[SparseObservableCache]): The cache of the sparse matrices of the device.
+
+    Returns:
+        np.ndarray: The state tensor ``obs |state>``, of the dtype of ``tensor``.
+    """
+    if isinstance(obs, qml.ops.SProd):
+        return obs.scalar * apply_operator(tensor, obs.base, sparse_cache)
+    if isinstance(obs, qml.ops.Sum):
+        return sum(apply_operator(tensor, op, sparse_cache) for op in obs.operands)
+    if isinstance(obs, qml.ops.Prod):
+        for op in reversed(obs.operands):
+            tensor = apply_operator(tensor, op, sparse_cache)
+        return tensor
+    if isinstance(obs, qml.SparseHamiltonian):
+        num_wires = tensor.ndim
+        if sparse_cache is not None:
+            matrix = sparse_cache.get(obs, num_wires)
+        else:
+            matrix = obs.sparse_matrix(wire_order=range(num_wires))
+        return (matrix @ tensor.reshape(-1)).astype(tensor.dtype, copy=False).reshape(tensor.shape)
+
+    return apply_matrix(tensor, qml.matrix(obs), obs.wires.tolist())
+
+
+def apply_matrix(tensor, matrix, wires):
+    """
+    Apply the matrix of an operator on some wires to a state tensor.
+
+    Args:
+        tensor (np.ndarray): A state tensor of shape ``(2,) * num_wires``.
+        matrix (np.ndarray): The ``2 ** len(wires)`` square matrix of the operator.
+        wires (Sequence[int]): The wires of the operator, in the order of the matrix.
+
+    Returns:
+        np.ndarray: The state tensor ``matrix |state>``, of the dtype of ``tensor``.
+    """
+    wires = list(wires)
+    # the matrix is cast to the precision of the state
+    matrix = np.asarray(matrix).astype(tensor.dtype, copy=False)
+    if len(wires) == 0:
+        return matrix[0, 0] * tensor
+    matrix = matrix.reshape((2,) * (2 * len(wires)))
+    result = np.tensordot(matrix, tensor, axes=(list(range(len(wires), 2 * len(wires))), wires))
+    # the axes of the wires of the operator come first after the contraction
+    return np.moveaxis(result, list(range(len(wires))), wires)
+
+
+def apply_observable(state, obs, num_wires, sparse_cache=None):
+    """
+    Apply an observable to a state vector.
+
+    Observables with a Pauli decomposition are applied word by word, and the others with
+    :func:`apply_operator`, without building their matrix on the whole register.
+
+    Args:
+        state (np.ndarray): The state vector.
+        obs (Observable): The observable.
+        num_wires (int): The number of wires.
+        sparse_cache (Optional[SparseObservableCache]): The cache of the sparse matrices of the device.
+
+    Returns:
+        np.ndarray: The state vector ``obs |state>``, of the dtype of ``state``.
+    """
+    tensor = state.reshape((2,) * num_wires)
+    try:
+        terms, constant = pauli_terms(obs)
+    except ValueError:
+        return apply_operator(tensor, obs, sparse_cache).reshape(-1)
+
+    result = constant * tensor
+    for coeff, word in terms:
+        result = result + coeff * apply_pauli_word(tensor, word)
+    return result.reshape(-1)
+
+
+def diagonal_eigvals(obs):
+    """
+    Get the eigenvalues of an observable that is diagonal in the computational basis.
+
+    Args:
+        obs (Observable): The observable.
+
+    Returns:
+        Optional[np.ndarray]: The eigenvalues on the basis states of the wires of the observable, or None if
+            the observable is not diagonal in the computational basis.
+    """
+    try:
+        terms, constant = pauli_terms(obs)
+    except ValueError:
+        terms = None
+    if terms is not None:
+        if all(pauli == "Z" for _, word in terms for pauli in word.values()):
+            return pauli_eigvals(terms, constant, obs.wires.tolist())
+        return None
+
+    try:
+        if len(obs.diagonalizing_gates()) == 0:
+            return np.real(qml.eigvals(obs))
+    except qml.operation.DiagGatesUndefinedError:
+        pass
+    return None
+
+
+def expval_and_variance(state, obs, num_wires, sparse_cache=None):
+    """
+    Compute the expectation value and the variance of an observable on a state vector.
+
+    Observables that are diagonal in the computational basis only use the probability tensor of the state.
+
+    Args:
+        state (np.ndarray): The state vector.
+        obs (Observable): The observable.
+        num_wires (int): The number of wires.
+        sparse_cache (Optional[SparseObservableCache]): The cache of the sparse matrices of the device.
+
+    Returns:
+        Tuple[float, float]: The expectation value and the variance.
+    """
+    eigvals = diagonal_eigvals(obs)
+    if eigvals is not None:
+        probabilities = marginal_probabilities(
+            probability_tensor(state, num_wires), obs.wires.tolist()
+        )
+        expval = np.dot(probabilities, eigvals)
+        return expval, np.dot(probabilities, eigvals**2) - expval**2
+
+    applied = apply_observable(state, obs, num_wires, sparse_cache)
+    expval = np.real(np.vdot(state, applied))
+    return expval, np.real(np.vdot(applied, applied)) - expval**2
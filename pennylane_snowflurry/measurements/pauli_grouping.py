@@ -0,0 +1,205 @@
+from collections import namedtuple
+import numpy as np
+import pennylane as qml
+from .counts_array import CountsArray, pack_bits
+
+ShotEstimate = namedtuple("ShotEstimate", ["value", "variance", "shots"])
+ShotEstimate.__doc__ = """The estimate of an expectation value from shots, with the variance of the estimate."""
+
+# Snowflurry instructions rotating the measurement basis of a wire onto the computational basis.
+# Y is measured by applying S^dagger then H.
+BASIS_ROTATIONS = {
+    "X": ["hadamard({0})"],
+    "Y": ["phase_shift({0},-1.5707963267948966)", "hadamard({0})"],
+    "Z": [],
+}
+
+
+def pauli_terms(obs):
+    """
+    Decompose an observable into Pauli words.
+
+    Args:
+        obs (Observable): The observable, e.g. a Hamiltonian, a Sum or a tensor product of Paulis.
+
+    Returns:
+        Tuple[list[tuple[float, dict]], float]: The terms as ``(coefficient, {wire: "X" | "Y" | "Z"})``
+            pairs, and the coefficient of the identity.
+
+    Raises:
+        ValueError: If the observable has no Pauli decomposition.
+    """
+    return sentence_terms(qml.pauli.pauli_sentence(obs))
+
+
+def squared_terms(obs):
+    """
+    Decompose the square of an observable into Pauli words, so that its second moment is estimated as an
+    expectation value.
+
+    Args:
+        obs (Observable): The observable.
+
+    Returns:
+        Tuple[list[tuple[float, dict]], float]: The terms of the square, as returned by :func:`pauli_terms`.
+
+    Raises:
+        ValueError: If the observable has no Pauli decomposition.
+    """
+    sentence = qml.pauli.pauli_sentence(obs)
+    square = sentence @ sentence
+    # products of anticommuting words cancel
+    square.simplify()
+    return sentence_terms(square)
+
+
+def sentence_terms(sentence):
+    """
+    Split a ``PauliSentence`` into its Pauli words and the coefficient of the identity.
+    """
+    terms = []
+    constant = 0.0
+    for word, coeff in sentence.items():
+        coeff = float(np.real(qml.math.unwrap(coeff)))
+        if len(word) == 0:
+            constant += coeff
+        else:
+            terms.append((coeff, dict(word)))
+    return terms, constant
+
+
+def qwc_groups(terms):
+    """
+    Partition Pauli words into qubit-wise-commuting groups.
+
+    Terms are placed greedily, by decreasing coefficient magnitude, in the first group in which they act
+    with the same Pauli as every other term on their shared wires.
+
+    Args:
+        terms (list[tuple[float, dict]]): The terms as returned by :func:`pauli_terms`.
+
+    Returns:
+        list[tuple[dict, list]]: The groups, as pairs of the measurement basis of the group
+            (``{wire: "X" | "Y" | "Z"}``) and the terms of the group.
+    """
+    groups = []
+    for coeff, word in sorted(terms, key=lambda term: -abs(term[0])):
+        for basis, group_terms in groups:
+            if all(basis.get(wire, pauli) == pauli for wire, pauli in word.items()):
+                basis.update(word)
+                group_terms.append((coeff, word))
+                break
+        else:
+            groups.append((dict(word), [(coeff, word)]))
+    return groups
+
+
+def group_estimate(counts, group_terms):
+    """
+    Estimate the expectation value of a group of qubit-wise-commuting terms from the counts measured in
+    the basis of the group.
+
+    Args:
+        counts (CountsArray): The counts measured after the basis rotations of the group.
+        group_terms (list[tuple[float, dict]]): The terms of the group.
+
+    Returns:
+        ShotEstimate: The estimate of the sum of the terms of the group.
+    """
+    weights = counts.counts.astype(float)
+    shots = counts.shots
+    bits = counts.bits()
+
+    values = np.zeros(len(weights))
+    for coeff, word in group_terms:
+        parity = np.bitwise_xor.reduce(bits[:, list(word.keys())], axis=1)
+        values += coeff * (1.0 - 2.0 * parity)
+
+    mean = np.dot(weights, values) / shots
+    variance = np.dot(weights, (values - mean) ** 2) / max(shots - 1, 1)
+    return ShotEstimate(mean, variance / shots, shots)
+
+
+def basis_rotations(basis):
+    """
+    Get the Snowflurry instructions rotating a measurement basis onto the computational basis.
+
+    Args:
+        basis (dict): The measurement basis, as ``{wire: "X" | "Y" | "Z"}`` with wires indexed from 0.
+
+    Returns:
+        list[str]: The Snowflurry instructions.
+    """
+    return [
+        rotation.format(wire + 1)
+        for wire, pauli in sorted(basis.items())
+        for rotation in BASIS_ROTATIONS[pauli]
+    ]
+
+
+def counts_from_blocks(blocks):
+    """
+    Histogram blocks of bits, as yielded by ``PennylaneConverter.iter_simulated_shots``.
+
+    Returns:
+        CountsArray: The counts of all blocks.
+    """
+    counts = None
+    for bits in blocks:
+        block_counts = CountsArray.from_outcomes(pack_bits(bits), bits.shape[1])
+        counts = block_counts if counts is None else block_counts.merge(counts)
+    return counts
+
+
+def sample_in_basis(converter, basis, shots, run=0):
+    """
+    Sample the snowflurry circuit after rotating the wires of a measurement basis onto the computational
+    basis, with the simulator or with the QPU.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit, without readouts.
+        basis (dict): The measurement basis, as ``{wire: "X" | "Y" | "Z"}`` with wires indexed from 0.
+        shots (int): The number of shots.
+        run (int): The index of the job among the jobs sampling this basis with as many shots.
+
+    Returns:
+        CountsArray: The number of times each outcome was measured.
+    """
+    for instruction in basis_rotations(basis):
+        converter.push_instruction(instruction)
+    for wire in sorted(basis):
+        converter.push_instruction(f"readout({wire + 1}, {wire + 1})")
+
+    if converter.use_qpu:
+        return CountsArray.from_dict(converter.run_job(shots, run))
+    return counts_from_blocks(converter.iter_simulated_shots(shots))
+
+
+def estimate_expval(converter, terms, constant, shots):
+    """
+    Estimate the expectation value of an observable decomposed into Pauli words from shots.
+
+    The terms of the observable are partitioned into qubit-wise-commuting groups, and a single circuit is
+    sampled per group, with the basis rotations of the group appended before the readouts.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit.
+        terms (list[tuple[float, dict]]): The terms of the observable, as returned by :func:`pauli_terms`.
+        constant (float): The coefficient of the identity.
+        shots (int): The number of shots per group.
+
+    Returns:
+        ShotEstimate: The estimate of the expectation value and the variance of the estimate.
+    """
+    value, variance = constant, 0.0
+
+    converter.remove_readouts()
+    base_length = len(converter.julia_instructions)
+    for basis, group_terms in qwc_groups(terms):
+        counts = sample_in_basis(converter, basis, shots)
+        estimate = group_estimate(counts, group_terms)
+        value += estimate.value
+        variance += estimate.variance
+        converter.truncate_instructions(base_length)
+
+    return ShotEstimate(value, variance, shots)
@@ -0,0 +1,197 @@
+import numpy as np
+from pennylane.measurements import CountsMP, SampleMP
+from .counts_array import CountsArray, pack_bits, unpack_bits
+
+# Widest samples whose decimal format fits in an int64 (``10 ** 19 > 2 ** 63``)
+MAX_DECIMAL_BITS = 19
+
+
+class MeasurementPlanner:
+    """
+    Plans the readouts of a circuit so that all its shot-based measurements share a single sample set.
+
+    Without a plan, each counts or sample measurement applies its own readouts and calls
+    ``Snowflurry.simulate_shots`` (or submits a job to the QPU), so a circuit returning ``qml.counts()``
+    and ``qml.sample()`` pays for its shots twice. The planner reads out the union of the wires required
+    by the shot-based measurements, draws the shots once, and projects the shared sample set on the
+    wires of each measurement.
+
+    Shots are drawn in blocks of ``converter.shot_chunk_size`` shots and every measurement is computed in a
+    single pass over the blocks: counts are accumulated as the blocks arrive and samples are written into a
+    preallocated integer array, so the bitstrings of at most one block are held in memory at a time.
+    Outcomes are packed into integers and histogrammed with NumPy; bitstring keys are only formatted for
+    the distinct outcomes, once all blocks are counted.
+
+    Args:
+        converter (PennylaneConverter): The converter holding the snowflurry circuit.
+        measurements (Sequence[MeasurementProcess]): The measurement processes of the circuit.
+        shots (int): The number of shots.
+    """
+
+    def __init__(self, converter, measurements, shots):
+        self.converter = converter
+        self.shots = shots
+        self.measurements = [
+            mp for mp in measurements if isinstance(mp, (CountsMP, SampleMP))
+        ]
+        wires = set()
+        for mp in self.measurements:
+            wires.update(self.readout_wires(mp))
+        self.wires = sorted(wires)
+        self._results = None
+
+    def readout_wires(self, mp):
+        """
+        Get the wires a measurement process needs to read out.
+
+        Args:
+            mp (MeasurementProcess): The measurement process.
+
+        Returns:
+            list[int]: The wires to read out. All wires are read out when no observable is given.
+        """
+        if mp.obs is None:
+            return list(range(self.converter.wires))
+        # Pauli rotations are only applied for expectation values with shots (see estimate_expval)
+        return [mp.obs.wires[0]]
+
+    def covers(self, mp, shots) -> bool:
+        """
+        Check if the measurement process was planned with the given number of shots.
+        """
+        return shots == self.shots and any(mp is planned for planned in self.measurements)
+
+    def iter_outcomes(self):
+        """
+        Apply the planned readouts and draw the shots, either with the simulator or with the QPU.
+
+        Yields:
+            Tuple[np.ndarray, int]: Blocks of at most ``converter.shot_chunk_size`` packed outcomes (see
+                :class:`CountsArray`), one per shot, with the number of bits of the outcomes.
+        """
+        converter = self.converter
+        converter.remove_readouts()
+        for wire in self.wires:
+            converter.push_instruction(f"readout({wire + 1}, {wire + 1})")
+
+        if not converter.use_qpu:
+            for bits in converter.iter_simulated_shots(self.shots):
+                yield pack_bits(bits), bits.shape[1]
+            return
+
+        counts = CountsArray.from_dict(converter.run_job(self.shots))
+        # the outcome of shot i is the first outcome whose cumulative count exceeds i
+        cumulative = np.cumsum(counts.counts)
+        chunk_size = converter.shot_chunk_size or self.shots
+        for start in range(0, counts.shots, chunk_size):
+            shots = np.arange(start, min(start + chunk_size, counts.shots))
+            yield counts.outcomes[np.searchsorted(cumulative, shots, side="right")], counts.num_bits
+
+    def mask(self, mp, num_bits):
+        """
+        Get the mask keeping the bits read out by a measurement process in packed outcomes.
+
+        Bits of the wires that are not read out by the measurement process are set to 0, as they would
+        be if the measurement had been performed on its own.
+
+        Args:
+            mp (MeasurementProcess): The measurement process.
+            num_bits (int): The number of bits of the outcomes.
+
+        Returns:
+            int: The mask.
+        """
+        mask = 0
+        for wire in self.readout_wires(mp):
+            mask |= 1 << (num_bits - 1 - wire)
+        return mask
+
+    def collect(self):
+        """
+        Draw the shared sample set and compute the result of every planned measurement in one pass.
+
+        Returns:
+            dict[int, Union[dict, np.ndarray]]: The counts or samples of each measurement process, keyed
+                by the id of the measurement process.
+        """
+        counts = {
+            id(mp): CountsArray([], [], self.converter.wires)
+            for mp in self.measurements
+            if isinstance(mp, CountsMP)
+        }
+        samples = {id(mp): None for mp in self.measurements if isinstance(mp, SampleMP)}
+
+        offset = 0
+        for outcomes, num_bits in self.iter_outcomes():
+            dtype = np.int64 if num_bits <= MAX_DECIMAL_BITS else object
+            for key, sample in samples.items():
+                if sample is None:
+                    samples[key] = np.empty(self.shots, dtype=dtype)
+            for mp in self.measurements:
+                projected = outcomes & self.mask(mp, num_bits)
+                if id(mp) in counts:
+                    block_counts = CountsArray.from_outcomes(projected, num_bits)
+                    counts[id(mp)] = block_counts.merge(counts[id(mp)])
+                else:
+                    samples[id(mp)][offset : offset + len(outcomes)] = decimal_bitstrings(
+                        projected, num_bits
+                    )
+            offset += len(outcomes)
+
+        results = dict(samples)
+        for mp in self.measurements:
+            if id(mp) in counts:
+                results[id(mp)] = counts[id(mp)].to_dict(
+                    all_outcomes=mp.all_outcomes, bits=self.readout_wires(mp)
+                )
+        return results
+
+    def result_for(self, mp):
+        """
+        Get the result of a planned measurement process, drawing the shots on first access.
+
+        Args:
+            mp (MeasurementProcess): The measurement process.
+
+        Returns:
+            Union[dict[str, int], np.ndarray]: The counts of a counts measurement, or the samples of a
+                sample measurement.
+        """
+        if self._results is None:
+            self._results = self.collect()
+        return self._results[id(mp)]
+
+
+def decimal_bitstrings(outcomes, num_bits):
+    """
+    Convert packed outcomes to the integers whose decimal digits are the bits of the outcomes, which is
+    how samples are returned (e.g. ``"101"`` is returned as ``101``). Beyond ``MAX_DECIMAL_BITS`` bits, the
+    integers do not fit in an int64 and are returned as Python integers in an object array.
+
+    Args:
+        outcomes (np.ndarray): The packed outcomes.
+        num_bits (int): The number of bits of the outcomes.
+
+    Returns:
+        np.ndarray: The samples.
+    """
+    return decimal_rows(unpack_bits(outcomes, num_bits))
+
+
+def decimal_rows(bits):
+    """
+    Convert rows of bits to the integers whose decimal digits are the bits of the rows, as
+    :func:`decimal_bitstrings` does for packed outcomes.
+
+    Args:
+        bits (np.ndarray): The bits, of shape ``(shots, num_bits)``.
+
+    Returns:
+        np.ndarray: The samples.
+    """
+    num_bits = bits.shape[1]
+    if num_bits > MAX_DECIMAL_BITS:
+        digits = np.array([10**power for power in range(num_bits - 1, -1, -1)], dtype=object)
+        return bits.astype(object) @ digits
+    digits = np.power(10, np.arange(num_bits - 1, -1, -1, dtype=np.int64))
+    return bits.astype(np.int64, copy=False) @ digits
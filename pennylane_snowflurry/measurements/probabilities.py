@@ -1,5 +1,6 @@
 from .measurement_strategy import MeasurementStrategy
-from juliacall import convert
+from .marginal import probability_tensor, marginal_probabilities
+from .adaptive import adaptive_probabilities
 
 
 class Probabilities(MeasurementStrategy):
@@ -8,12 +9,13 @@ class Probabilities(MeasurementStrategy):
         super().__init__()
 
     def measure(self, converter, mp, shots):
-        converter.remove_readouts()
-        wires_list = mp.wires.tolist()
-        if len(wires_list) == 0:
-            return self.Snowflurry.get_measurement_probabilities(self.Snowflurry.sf_circuit)
-        else:
-            return self.Snowflurry.get_measurement_probabilities(
-                self.Snowflurry.sf_circuit,
-                convert(self.Snowflurry.Vector, [i + 1 for i in wires_list])
-            )
\ No newline at end of file
+        if converter.shot_based and converter.target_precision is not None:
+            # shots are drawn in rounds until the target precision is reached
+            wires = mp.wires.tolist() or list(range(converter.wires))
+            estimate = adaptive_probabilities(converter, wires, shots, converter.target_precision)
+            converter.estimates[mp] = estimate
+            return estimate.value
+
+        # the probabilities are marginalized from the cached state rather than computed again by Snowflurry
+        probabilities = probability_tensor(converter.get_state(), converter.wires)
+        return marginal_probabilities(probabilities, mp.wires.tolist())
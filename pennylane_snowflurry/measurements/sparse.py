@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+# Sparse matrices kept by a cache, the least recently used being evicted first
+SPARSE_CACHE_SIZE = 16
+
+
+class SparseObservableCache:
+    """
+    The CSR matrices of sparse observables (``qml.SparseHamiltonian``) on the whole register, kept across
+    the executions of a device.
+
+    Expanding the matrix of an observable to the register costs a pass over its entries, which repeated
+    evaluations of the same observable (e.g. in an optimization loop) would otherwise pay every time.
+
+    Args:
+        max_size (int): The number of matrices kept.
+    """
+
+    def __init__(self, max_size=SPARSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._matrices = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obs, num_wires):
+        """
+        Get the CSR matrix of an observable on a register, building it on the first call.
+
+        Args:
+            obs (Observable): The observable, on wires indexed from 0.
+            num_wires (int): The number of wires of the register.
+
+        Returns:
+            scipy.sparse.csr_matrix: The ``2 ** num_wires`` square matrix.
+        """
+        key = (matrix_digest(obs.sparse_matrix()), tuple(obs.wires), num_wires)
+        if key in self._matrices:
+            self.hits += 1
+            self._matrices.move_to_end(key)
+            return self._matrices[key]
+        self.misses += 1
+        matrix = obs.sparse_matrix(wire_order=range(num_wires)).tocsr()
+        self._matrices[key] = matrix
+        if len(self._matrices) > self.max_size:
+            self._matrices.popitem(last=False)
+        return matrix
+
+
+def matrix_digest(matrix):
+    """
+    Get a digest of the entries of a sparse matrix. The hash of a ``qml.SparseHamiltonian`` is built from
+    the truncated string of its matrix, so matrices with the same number of entries can share it.
+
+    Args:
+        matrix (scipy.sparse.spmatrix): The matrix.
+
+    Returns:
+        str: The digest of the shape, indices and values of the CSR form of the matrix.
+    """
+    matrix = matrix.tocsr()
+    digest = hashlib.sha256(np.asarray(matrix.shape, dtype=np.int64).tobytes())
+    for array in (matrix.indptr, matrix.indices, matrix.data):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
@@ -1,7 +1,5 @@
 from .measurement_strategy import MeasurementStrategy
 
-import numpy as np
-
 
 class State(MeasurementStrategy):
 
@@ -9,8 +7,8 @@ class State(MeasurementStrategy):
         super().__init__()
 
     def measure(self, converter, mp, shots):
-        converter.remove_readouts()
-        self.Snowflurry.result_state = self.Snowflurry.simulate(self.Snowflurry.sf_circuit)
-        # Convert the final state from pyjulia to a NumPy array
-        final_state_np = np.array([element for element in self.Snowflurry.result_state])
-        return final_state_np
+        if converter.state_directory is not None:
+            # the state is written to a file instead of being copied in memory
+            return converter.write_state(converter.state_path())
+        final_state_np = converter.get_state()
+        return final_state_np.copy()
@@ -0,0 +1,44 @@
+from .measurement_strategy import MeasurementStrategy
+from .marginal import expval_and_variance
+from .pauli_grouping import (
+    estimate_expval,
+    group_estimate,
+    pauli_terms,
+    qwc_groups,
+    sample_in_basis,
+    squared_terms,
+)
+
+
+class Variance(MeasurementStrategy):
+
+    def __init__(self):
+        super().__init__()
+
+    def measure(self, converter, mp, shots):
+        if converter.shot_based:
+            try:
+                terms, constant = pauli_terms(mp.obs)
+            except ValueError:
+                terms = None
+            groups = qwc_groups(terms) if terms is not None else []
+            if len(groups) == 1:
+                # all the terms are read out by a single circuit, so the variance is estimated from the
+                # values of the observable on each shot
+                converter.remove_readouts()
+                base_length = len(converter.julia_instructions)
+                basis, group_terms = groups[0]
+                estimate = group_estimate(sample_in_basis(converter, basis, shots), group_terms)
+                converter.truncate_instructions(base_length)
+                return estimate.variance * estimate.shots
+            if groups:
+                # the terms are read out by several circuits, so the variance is estimated as
+                # <H^2> - <H>^2, both sampled per group of qubit-wise-commuting terms
+                expval = estimate_expval(converter, terms, constant, shots).value
+                square = estimate_expval(converter, *squared_terms(mp.obs), shots).value
+                return max(square - expval**2, 0.0)
+
+        _, variance = expval_and_variance(
+            converter.get_state(), mp.obs, converter.wires, converter.sparse_cache
+        )
+        return variance
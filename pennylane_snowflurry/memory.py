@@ -0,0 +1,264 @@
+"""
+Contains the memory preflight of executions and the :class:`MemoryBudget` used to admit them.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+import math
+import re
+import threading
+from pennylane.measurements import (
+    CountsMP,
+    DensityMatrixMP,
+    ExpectationMP,
+    ProbabilityMP,
+    SampleMP,
+    StateMP,
+    VarianceMP,
+)
+from pennylane_snowflurry.measurements.planner import MAX_DECIMAL_BITS
+
+MemoryEstimate = namedtuple(
+    "MemoryEstimate", ["state", "probabilities", "transfer", "samples", "peak"]
+)
+MemoryEstimate.__doc__ = """Estimated memory of an execution, in bytes, by kind of buffer, with their sum as the peak."""
+
+UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 10**3,
+    "MB": 10**6,
+    "GB": 10**9,
+    "TB": 10**12,
+    "KIB": 2**10,
+    "MIB": 2**20,
+    "GIB": 2**30,
+    "TIB": 2**40,
+}
+
+# Bytes held per shot of a block sampled in NumPy, besides its bits: the uniform draw, the sampled outcome,
+# the outcome packed and projected by the planner, and its decimal sample.
+SHOT_OVERHEAD_BYTES = 40
+
+# Bytes held per bit of a shot of a block: the int64 bits unpacked from the outcome, next to their uint8
+# copy, once when the block is sampled and once when its samples are converted to decimal.
+SHOT_BIT_BYTES = 9
+
+
+def sample_bytes(num_bits) -> tuple:
+    """
+    Get the memory of a sample in the decimal format of :func:`~.planner.decimal_bitstrings`.
+
+    Up to ``MAX_DECIMAL_BITS`` bits, a sample is an int64. Beyond, it is a Python integer of about
+    ``num_bits * log2(10)`` bits referenced from an object array, and the bits of its block are also held as
+    references while they are converted.
+
+    Args:
+        num_bits (int): The number of bits of the samples.
+
+    Returns:
+        tuple[int, int]: The bytes per sample, and the bytes per shot of the block being converted.
+    """
+    if num_bits <= MAX_DECIMAL_BITS:
+        return 8, 0
+    # the header of a Python integer, and its 30-bit digits
+    integer = 24 + 4 * math.ceil(num_bits * math.log2(10) / 30)
+    return 8 + integer, 8 * num_bits
+
+
+def parse_memory(value) -> int:
+    """
+    Parse a memory size.
+
+    Args:
+        value (Union[int, str]): A number of bytes, or a string such as ``"512MiB"`` or ``"8 GB"``.
+
+    Returns:
+        int: The number of bytes.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([A-Za-z]*)\s*", str(value))
+    if match is None or match.group(2).upper() not in UNITS:
+        raise ValueError(f"Cannot parse memory size {value!r}.")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def estimate_peak_memory(
+    measurements,
+    num_wires,
+    shots=None,
+    shot_chunk_size=None,
+    use_qpu=False,
+    amplitude_bytes=16,
+    memmap_states=False,
+) -> MemoryEstimate:
+    """
+    Estimate the peak memory of an execution from its measurements.
+
+    The estimate counts the Julia state vector built by ``Snowflurry.simulate``, its NumPy copy and the
+    copy returned by ``qml.state()``, the probability tensor used by probabilities, variances and
+    sampling, the state vector an observable is applied to for its expectation value, the buffers of one
+    block of shots and the samples returned (see :func:`sample_bytes`). Observables are applied locally with their sparse matrices, whose size is not
+    counted. Buffers are assumed to be alive at the same time.
+
+    Args:
+        measurements (Sequence[MeasurementProcess]): The measurement processes of the tape.
+        num_wires (int): The number of wires of the simulated register.
+        shots (Optional[int]): The number of shots.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are drawn.
+        use_qpu (bool): Whether shot-based measurements are sent to the QPU instead of the simulator.
+        amplitude_bytes (int): The size of an amplitude.
+        memmap_states (bool): Whether ``qml.state()`` is written to a memory-mapped file from the Julia
+            buffer, in which case it holds no copy of the state in memory.
+
+    Returns:
+        MemoryEstimate: The estimate.
+    """
+    dimension = 2**num_wires
+    shot_based = [mp for mp in measurements if isinstance(mp, (CountsMP, SampleMP))]
+    sampled_expvals = [
+        mp
+        for mp in measurements
+        if isinstance(mp, (ExpectationMP, VarianceMP)) and (shots is not None or use_qpu)
+    ]
+    sampled = {id(mp) for mp in shot_based + sampled_expvals}
+    state_based = [mp for mp in measurements if id(mp) not in sampled]
+
+    simulated = bool(state_based) or (not use_qpu and bool(shot_based or sampled_expvals))
+    state = amplitude_bytes * dimension if simulated else 0
+    # the NumPy copy of the state cached by the converter
+    copied = [
+        mp
+        for mp in state_based
+        if not (memmap_states and isinstance(mp, StateMP) and not isinstance(mp, DensityMatrixMP))
+    ]
+    if copied:
+        state += amplitude_bytes * dimension
+
+    probabilities = 0
+    if any(isinstance(mp, (ProbabilityMP, VarianceMP, ExpectationMP)) for mp in state_based):
+        probabilities += 8 * dimension
+    if not use_qpu and (shot_based or sampled_expvals):
+        # shots are sampled from the probabilities of the cached state
+        probabilities += 8 * dimension
+
+    transfer = 0
+    for mp in state_based:
+        if isinstance(mp, DensityMatrixMP):
+            # the reduced density matrix of the wires of the measurement
+            transfer += amplitude_bytes * 4 ** len(mp.wires)
+        elif isinstance(mp, StateMP) and not memmap_states:
+            transfer += amplitude_bytes * dimension
+        elif isinstance(mp, (ExpectationMP, VarianceMP)):
+            # the observable applied to the state
+            transfer += amplitude_bytes * dimension
+
+    samples = 0
+    if shots is not None and (shot_based or sampled_expvals):
+        block = min(shots, shot_chunk_size or shots)
+        samples += block * (SHOT_BIT_BYTES * num_wires + SHOT_OVERHEAD_BYTES)
+        sample_mps = sum(isinstance(mp, SampleMP) for mp in shot_based)
+        if sample_mps:
+            per_sample, per_converted = sample_bytes(num_wires)
+            samples += sample_mps * shots * per_sample + block * per_converted
+
+    return MemoryEstimate(
+        state, probabilities, transfer, samples, state + probabilities + transfer + samples
+    )
+
+
+def estimate_tableau_memory(num_wires, shots=None, shot_chunk_size=None) -> MemoryEstimate:
+    """
+    Estimate the peak memory of an execution with the stabilizer simulator.
+
+    The estimate counts the tableau, the copy collapsed to find an outcome and the directions of the
+    outcomes, and the buffers of one block of shots.
+
+    Args:
+        num_wires (int): The number of wires of the simulated register.
+        shots (Optional[int]): The number of shots.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are drawn.
+
+    Returns:
+        MemoryEstimate: The estimate.
+    """
+    # X and Z bits of 2n rows, for the tableau and its collapsed copy, and the n directions
+    state = 2 * (2 * 2 * num_wires * num_wires) + num_wires * num_wires
+    samples = 0
+    if shots is not None:
+        block = min(shots, shot_chunk_size or shots)
+        # random coefficients, float32 product and bits
+        samples = block * (num_wires + 4 * num_wires + 8 * num_wires + num_wires)
+    return MemoryEstimate(state, 0, 0, samples, state + samples)
+
+
+class MemoryBudget:
+    """
+    A memory budget shared by the executions of a device.
+
+    Executions reserve their estimated peak memory before running and release it afterwards. An execution
+    whose estimate exceeds the whole budget is refused; an execution that does not fit next to the
+    executions already running waits until enough memory is released, so that executions running in
+    parallel are throttled by the same budget.
+
+    Args:
+        limit (Union[int, str]): The budget, in bytes or as a string such as ``"16GiB"``.
+    """
+
+    def __init__(self, limit):
+        self.limit = parse_memory(limit)
+        self.reserved = 0
+        self._condition = threading.Condition()
+
+    def check(self, nbytes, description="The execution"):
+        """
+        Refuse an execution whose estimated peak memory exceeds the budget.
+
+        Raises:
+            MemoryError: If ``nbytes`` exceeds the budget.
+        """
+        if nbytes > self.limit:
+            raise MemoryError(
+                f"{description} needs an estimated {nbytes} bytes, which exceeds the memory budget of "
+                f"{self.limit} bytes."
+            )
+
+    def acquire(self, nbytes):
+        """
+        Reserve memory, waiting until it is available.
+
+        Args:
+            nbytes (int): The estimated peak memory of the execution.
+
+        Raises:
+            MemoryError: If ``nbytes`` exceeds the budget.
+        """
+        self.check(nbytes)
+        with self._condition:
+            self._condition.wait_for(lambda: self.reserved + nbytes <= self.limit)
+            self.reserved += nbytes
+
+    def release(self, nbytes):
+        """
+        Release memory reserved with :meth:`acquire`.
+        """
+        with self._condition:
+            self.reserved -= nbytes
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        """
+        Reserve memory for the duration of an execution, waiting until it is available.
+
+        Args:
+            nbytes (int): The estimated peak memory of the execution.
+
+        Raises:
+            MemoryError: If ``nbytes`` exceeds the budget.
+        """
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
@@ -11,9 +11,16 @@ from pennylane.measurements import (
     ExpectationMP,
     CountsMP,
     StateMP,
+    DensityMatrixMP,
+    VarianceMP,
+    VnEntropyMP,
+    PurityMP,
 )
+import os
+import tempfile
 import time
 import re
+import numpy as np
 from pennylane.typing import TensorLike
 from typing import Callable, Type
 from pennylane.ops import Sum, Hamiltonian
@@ -24,8 +31,14 @@ from pennylane_snowflurry.measurements import (
     Counts,
     Probabilities,
     ExpectationValue,
-    State
+    State,
+    DensityMatrix,
+    VnEntropy,
+    Purity,
+    Variance,
+    MeasurementPlanner,
 )
+from pennylane_snowflurry.measurements.counts_array import unpack_bits
 
 # Dictionary mapping PennyLane operations to Snowflurry operations
 # The available Snowflurry operations are listed here:
@@ -60,16 +73,84 @@ SNOWFLURRY_OPERATION_MAP = {
 }
 
 
+# Julia element type and NumPy dtype of the amplitudes, by precision. In single precision, the ket is evolved
+# and transferred as ComplexF32 (complex64): every gate rounds the amplitudes to about 6e-8 relative error,
+# so the error of the state grows at most linearly with the number of gates, and probabilities and
+# expectation values stay within about 1e-6 of double precision for circuits of up to a few hundred gates.
+PRECISIONS = {
+    "double": ("ComplexF64", np.complex128),
+    "single": ("ComplexF32", np.complex64),
+}
+
+# Amplitudes copied at a time when a state is written to a memory-mapped file
+STATE_CHUNK_SIZE = 2**20
+
+
 """
 if host, user, access_token are left blank, the code will be ran on the simulator
 if host, user, access_token are filled, the code will be sent to Anyon's API
 """
 
+def default_wire_map(wires):
+    """
+    Map wire labels to the 1-based qubit indices used by Snowflurry.
+
+    Integer labels are kept in place (wire 0 is qubit 1), any other labels are numbered in order.
+
+    Args:
+        wires (Iterable): The wire labels.
+
+    Returns:
+        dict: The 1-based Julia index of each wire label.
+    """
+    wires = list(wires)
+    if all(isinstance(wire, int) and wire >= 0 for wire in wires):
+        return {wire: wire + 1 for wire in wires}
+    return {wire: i + 1 for i, wire in enumerate(wires)}
+
+
 ##########################################
 # Defining namespace for Snowflurry      #
 ##########################################
 Snowflurry = newmodule("Snowflurry")
 Snowflurry.seval("using Snowflurry")
+# Evolves the initial ket through the gates of a circuit, copying the ket after the first cuts[k]
+# instructions for every k, so that the states at all snapshots cost a single simulation. The amplitudes of
+# the ket are of type T, in which every gate writes its result in place. Readouts are skipped.
+Snowflurry.seval(
+    """
+    function simulate_with_snapshots(circuit, cuts, T=ComplexF64)
+        ket = Ket(vcat(T[1], zeros(T, 2^circuit.qubit_count - 1)))
+        snapshots = Ket[]
+        previous = 0
+        for cut in cuts
+            for instruction in circuit.instructions[previous+1:cut]
+                instruction isa Readout || apply_instruction!(ket, instruction)
+            end
+            push!(snapshots, deepcopy(ket))
+            previous = cut
+        end
+        for instruction in circuit.instructions[previous+1:end]
+            instruction isa Readout || apply_instruction!(ket, instruction)
+        end
+        return snapshots, ket
+    end
+    """
+)
+# Moves the instructions of a circuit from its logical qubits to the physical qubits of a layout, keeping
+# the destination bits of the readouts, so that results are still indexed by logical qubit.
+Snowflurry.seval(
+    """
+    function place_circuit(circuit, logical, physical, qubit_count)
+        mapping = Dict{Int,Int}(zip(logical, physical))
+        placed = QuantumCircuit(qubit_count=qubit_count, bit_count=get_num_bits(circuit))
+        for instruction in circuit.instructions
+            push!(placed, move_instruction(instruction, mapping))
+        end
+        return placed
+    end
+    """
+)
 
 
 class PennylaneConverter:
@@ -103,7 +184,17 @@ class PennylaneConverter:
         access_token="",
         project_id="",
         realm="",
-        wires=None
+        wires=None,
+        result_store=None,
+        shot_chunk_size=None,
+        wire_map=None,
+        target_precision=None,
+        precision="double",
+        rng=None,
+        state_directory=None,
+        layout=None,
+        physical_qubits=None,
+        sparse_cache=None,
     ):
 
         # Instance attributes related to PennyLane
@@ -111,9 +202,37 @@ class PennylaneConverter:
         self.debugger = debugger
         self.interface = interface
         self.wires = wires
+        self.shot_chunk_size = shot_chunk_size
+        # standard error at which adaptive estimates stop drawing shots (see measurements.adaptive)
+        self.target_precision = target_precision
+        # 1-based Julia index of each wire label, computed once per device
+        if wire_map is None:
+            wire_map = default_wire_map(pennylane_circuit.wires)
+        self.wire_map = wire_map
+        self.wire_indices = {label: index - 1 for label, index in wire_map.items()}
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Unknown precision {precision!r}, expected one of {', '.join(PRECISIONS)}."
+            )
+        # floating-point precision of the simulated amplitudes (see PRECISIONS)
+        self.precision = precision
+        self.element_type, self.dtype = PRECISIONS[precision]
+        # directory in which qml.state() results are written as memory-mapped files, if any
+        self.state_directory = state_directory
+        # physical qubit of each logical qubit (both 1-based) on the QPU, and the qubit count of the QPU
+        self.layout = layout
+        self.physical_qubits = physical_qubits
+        # sparse matrices of the observables, shared by the converters of a device
+        self.sparse_cache = sparse_cache
+        # generator of the shots, which are sampled in NumPy from the state vector in every precision
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         # Instance attributes related to Snowflurry
         self.snowflurry_py_circuit = None
+        # Instructions pushed to sf_circuit, in order. They identify the job in the result store.
+        self.julia_instructions = []
+        self.result_store = result_store
+        self.target = f"{host}/{realm}/{project_id}"
         if (
             len(host) != 0
             and len(user) != 0
@@ -128,13 +247,54 @@ class PennylaneConverter:
             Snowflurry.currentClient = None
 
         self.measurementStrategy = None
+        self.planner = None
+        # estimates (with their variance) of the expectation values computed from shots
+        self.estimates = {}
+        # final state of the circuit, simulated at most once, and the number of gates it was simulated with
+        self._state = None
+        self._state_gates = 0
+        # final state of the circuit in Julia, before its copy to NumPy
+        self._ket = None
+        # number of instructions before each qml.Snapshot, with the snapshot, and the states at those points
+        self.snapshot_points = []
+        self.snapshot_states = []
+        self._strategies = {}
+
+    def simulate(self, prebuilt=None):
+        """
+        Convert the circuit and compute its measurements.
 
-    def simulate(self):
-        self.snowflurry_py_circuit = self.convert_circuit(
-            self.pennylane_circuit
-        )
+        Args:
+            prebuilt (Optional[tuple]): The Julia circuit, instructions and (optional) state of the tape,
+                already built by a :class:`~.CircuitTemplate`, in which case the tape is not converted.
+        """
+        if prebuilt is None:
+            self.snowflurry_py_circuit = self.convert_circuit(
+                self.pennylane_circuit
+            )
+        else:
+            self.snowflurry_py_circuit = self.load_circuit(*prebuilt)
         return self.measure_final_state()
 
+    def load_circuit(self, circuit, instructions, state=None):
+        """
+        Use a Snowflurry circuit built beforehand instead of converting the PennyLane circuit.
+
+        Args:
+            circuit: The Julia ``QuantumCircuit`` of the tape.
+            instructions (list[str]): The instructions of the circuit.
+            state (Optional[np.ndarray]): The final state of the circuit, if already simulated.
+
+        Returns:
+            The Julia ``QuantumCircuit``, stored into Snowflurry.sf_circuit.
+        """
+        Snowflurry.sf_circuit = circuit
+        self.julia_instructions = list(instructions)
+        self._ket = None
+        self._state = state if state is None else state.astype(self.dtype, copy=False)
+        self._state_gates = self.gate_count()
+        return Snowflurry.sf_circuit
+
     def convert_circuit(
         self, pennylane_circuit: QuantumTape,
     ):
@@ -152,6 +312,10 @@ class PennylaneConverter:
 
         wires_nb = self.wires  # default number of wires in the circuit
         Snowflurry.sf_circuit = Snowflurry.QuantumCircuit(qubit_count=wires_nb)
+        self.julia_instructions = []
+        self._state = None
+        self._ket = None
+        self.snapshot_points = []
 
         prep = None
         if len(pennylane_circuit) > 0 and isinstance(
@@ -161,16 +325,19 @@ class PennylaneConverter:
 
         # Add gates to Snowflurry circuit
         for op in pennylane_circuit.operations[bool(prep):]:
-            if op.name in SNOWFLURRY_OPERATION_MAP:
+            if isinstance(op, qml.Snapshot):
+                self.snapshot_points.append((len(self.julia_instructions), op))
+            elif op.name in SNOWFLURRY_OPERATION_MAP:
                 if SNOWFLURRY_OPERATION_MAP[op.name] == NotImplementedError:
                     print(f"{op.name} is not implemented yet, skipping...")
                     continue
-                parameters = op.parameters + [i + 1 for i in op.wires.tolist()]
+                parameters = op.parameters + [self.wire_map[wire] for wire in op.wires]
                 gate = SNOWFLURRY_OPERATION_MAP[op.name].format(*parameters)
-                Snowflurry.seval(f"push!(sf_circuit,{gate})")
+                self.push_instruction(gate)
             else:
                 print(f"{op.name} is not supported by this device. skipping...")
 
+        self._state_gates = self.gate_count()
         return Snowflurry.sf_circuit
 
     def apply_readouts(self, obs):
@@ -184,11 +351,11 @@ class PennylaneConverter:
 
         if obs is None:  # if no observable is given, we apply readouts to all wires
             for wire in range(self.wires):
-                Snowflurry.seval(f"push!(sf_circuit, readout({wire + 1}, {wire + 1}))")
+                self.push_instruction(f"readout({wire + 1}, {wire + 1})")
 
         else:
             # if an observable is given, we apply readouts to the wires mentioned in the observable,
-            # TODO : could add Pauli rotations to get the correct observable
+            # Pauli rotations are only applied for expectation values with shots (see estimate_expval)
             self.apply_single_readout(obs.wires[0])
 
     def get_circuit_as_dictionary(self):
@@ -293,6 +460,7 @@ class PennylaneConverter:
         # contructing a new QuantumCircuit with that vector.
         while self.has_readout():
             Snowflurry.seval("pop!(sf_circuit)")
+            self.julia_instructions.pop()
 
     def apply_single_readout(self, wire):
         """
@@ -311,7 +479,261 @@ class PennylaneConverter:
 
         # if no readout is applied to the wire, we apply one while taking into account that
         # the wire number is 1-indexed in Julia
-        Snowflurry.seval(f"push!(sf_circuit, readout({wire+1}, {wire+1}))")
+        self.push_instruction(f"readout({wire+1}, {wire+1})")
+
+    def push_instruction(self, instruction):
+        """
+        Push an instruction at the end of the snowflurry circuit and keep track of it.
+
+        Args:
+            instruction (str): The Snowflurry instruction to push, e.g. ``"hadamard(1)"``.
+        """
+        Snowflurry.seval(f"push!(sf_circuit,{instruction})")
+        self.julia_instructions.append(instruction)
+
+    def gate_count(self) -> int:
+        """
+        Count the instructions of the snowflurry circuit that are not readouts.
+        """
+        return sum(not instruction.startswith("readout") for instruction in self.julia_instructions)
+
+    def truncate_instructions(self, length):
+        """
+        Pop instructions from the end of the snowflurry circuit until it has the given length.
+
+        Args:
+            length (int): The number of instructions to keep.
+        """
+        while len(self.julia_instructions) > length:
+            Snowflurry.seval("pop!(sf_circuit)")
+            self.julia_instructions.pop()
+
+    @property
+    def shot_based(self) -> bool:
+        """
+        Whether expectation values are estimated from shots rather than computed exactly.
+        """
+        return self.use_qpu or self.pennylane_circuit.shots.total_shots is not None
+
+    @property
+    def use_qpu(self) -> bool:
+        """
+        Whether shot-based measurements are served by the QPU (or replayed from the result store)
+        instead of the simulator.
+        """
+        if Snowflurry.currentClient is not None:
+            return True
+        return self.result_store is not None and self.result_store.replay
+
+    def simulate_state(self):
+        """
+        Simulate the final state of the snowflurry circuit in Julia, without copying it to NumPy.
+
+        The circuit is simulated on the first call only, and the states of the snapshots are copied to
+        NumPy on the way.
+
+        Returns:
+            The Julia ``Ket``, also stored into Snowflurry.result_state.
+        """
+        if self._ket is None:
+            self.remove_readouts()
+            if self.snapshot_points or self.precision != "double":
+                cuts = np.array([cut for cut, _ in self.snapshot_points], dtype=np.int64)
+                snapshots, Snowflurry.result_state = Snowflurry.simulate_with_snapshots(
+                    Snowflurry.sf_circuit, cuts, Snowflurry.seval(self.element_type)
+                )
+                self.snapshot_states = [
+                    np.array(snapshot.data, dtype=self.dtype) for snapshot in snapshots
+                ]
+            else:
+                Snowflurry.result_state = Snowflurry.simulate(Snowflurry.sf_circuit)
+            self._ket = Snowflurry.result_state
+            self._state_gates = self.gate_count()
+        return self._ket
+
+    def get_state(self):
+        """
+        Get the final state of the snowflurry circuit.
+
+        The circuit is simulated on the first call only, so every measurement computed from the state
+        (state, probabilities, variances) shares a single simulation.
+
+        Returns:
+            np.ndarray: The state vector, with wire 0 as the most significant bit, of the dtype of the
+                precision of the converter.
+        """
+        if self._state is None:
+            # Convert the final state from pyjulia to a NumPy array
+            self._state = np.array(self.simulate_state().data, dtype=self.dtype)
+        return self._state
+
+    def state_path(self) -> str:
+        """
+        Create a new file to which the final state is written, named after the hash of the circuit with a
+        unique suffix, so that the files of earlier results, which may still be mapped, are never rewritten.
+        """
+        prefix = f"state-{self.pennylane_circuit.hash & 0xFFFFFFFFFFFFFFFF:016x}-"
+        descriptor, path = tempfile.mkstemp(suffix=".npy", prefix=prefix, dir=self.state_directory)
+        os.close(descriptor)
+        return path
+
+    def write_state(self, path, chunk_size=STATE_CHUNK_SIZE):
+        """
+        Write the final state to a memory-mapped ``.npy`` file, in chunks.
+
+        Unless the state was already copied to NumPy by another measurement, the chunks are read straight
+        from the buffer of the Julia ket, so that no other copy of the state is held in memory.
+
+        Args:
+            path (str): The path of the file.
+            chunk_size (int): The number of amplitudes copied at a time.
+
+        Returns:
+            np.memmap: The state vector, backed by the file.
+        """
+        if self._state is not None:
+            source = self._state
+        else:
+            # a view of the Julia buffer, which is not copied
+            source = np.asarray(self.simulate_state().data)
+        output = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=(len(source),))
+        for start in range(0, len(source), chunk_size):
+            output[start : start + chunk_size] = source[start : start + chunk_size]
+        output.flush()
+        return output
+
+    def record_snapshots(self):
+        """
+        Save the state (or the measurement) of every ``qml.Snapshot`` of the circuit in the debugger, as
+        done by ``default.qubit``. All the snapshots are taken during the simulation of the final state.
+        """
+        self.get_state()
+        for (_, op), state in zip(self.snapshot_points, self.snapshot_states):
+            measurement = op.hyperparameters["measurement"]
+            if measurement is None:
+                snapshot = state.copy()
+            else:
+                snapshot = qml.devices.qubit.measure(
+                    measurement.map_wires(self.wire_indices),
+                    state.reshape((2,) * self.wires),
+                )
+            if op.tag:
+                self.debugger.snapshots[op.tag] = snapshot
+            else:
+                self.debugger.snapshots[len(self.debugger.snapshots)] = snapshot
+
+    def iter_simulated_shots(self, shots):
+        """
+        Sample the snowflurry circuit with the simulator in blocks of at most ``shot_chunk_size`` shots,
+        so that the shots of a single block are held in memory at a time. The circuit is simulated once
+        and every block is sampled from its state (see :meth:`sample_state`).
+
+        Args:
+            shots (int): The total number of shots
+
+        Yields:
+            np.ndarray: The bits measured in each block, as an array of shape ``(block_size, num_bits)``.
+        """
+        yield from self.sample_state(shots)
+
+    def sample_state(self, shots):
+        """
+        Sample the snowflurry circuit from its state vector, in blocks of at most ``shot_chunk_size`` shots.
+
+        ``Snowflurry.simulate_shots`` simulates the whole circuit on every call, and always in double
+        precision, so the state is simulated once in the precision of the converter and the blocks are
+        sampled from it in NumPy. The final state is reused when no gate (e.g. a basis rotation) was pushed
+        since it was simulated, and kept for the other measurements when it is simulated here.
+
+        Args:
+            shots (int): The total number of shots
+
+        Yields:
+            np.ndarray: The bits measured in each block, as an array of shape ``(block_size, wires)``.
+        """
+        if self._state is not None and self.gate_count() == self._state_gates:
+            state = self._state
+        else:
+            _, ket = Snowflurry.simulate_with_snapshots(
+                Snowflurry.sf_circuit, np.zeros(0, dtype=np.int64), Snowflurry.seval(self.element_type)
+            )
+            state = np.array(ket.data, dtype=self.dtype)
+            if self._state is None and self.gate_count() == self._state_gates:
+                # no basis rotation was pushed, so this is the final state of the circuit
+                self._state = state
+        # the cumulative distribution is summed in double precision, so that its last entries stay exact
+        cumulative = np.cumsum(np.abs(state) ** 2, dtype=np.float64)
+        cumulative /= cumulative[-1]
+        num_bits = int(np.log2(len(state)))
+        chunk_size = self.shot_chunk_size or shots
+        remaining = shots
+        while remaining > 0:
+            block_size = min(chunk_size, remaining)
+            outcomes = np.searchsorted(cumulative, self.rng.random(block_size), side="right")
+            outcomes = np.minimum(outcomes, len(state) - 1)
+            yield unpack_bits(outcomes, num_bits).astype(np.uint8)
+            remaining -= block_size
+
+    def get_planner(self, mp, shots):
+        """
+        Get the planner sharing samples between the shot-based measurements of the circuit.
+
+        Args:
+            mp (MeasurementProcess): The measurement process to perform
+            shots (int): The number of shots
+
+        Returns:
+            MeasurementPlanner: The planner of the circuit if it covers the measurement process, or a
+                new planner for this measurement process alone.
+        """
+        if self.planner is None or not self.planner.covers(mp, shots):
+            return MeasurementPlanner(self, [mp], shots)
+        return self.planner
+
+    def run_job(self, shots, run=0):
+        """
+        Run the snowflurry circuit on the QPU.
+
+        When a result store is attached, it is consulted before submitting the job and the results of
+        the job are saved in it. With a layout, the circuit is moved to its physical qubits before being
+        transpiled, and stored under its logical instructions.
+
+        Args:
+            shots (int): The number of shots
+            run (int): The index of the job among the jobs of the same circuit and number of shots, so that
+                repeated jobs are stored separately (see :meth:`ResultStore.key`).
+
+        Returns:
+            dict[str, int]: The number of times each bitstring was measured.
+
+        Raises:
+            LookupError: If the result store is in replay mode and the job is not in the store.
+        """
+        key = None
+        if self.result_store is not None:
+            key = self.result_store.key(self.julia_instructions, shots, self.target, run)
+            result = self.result_store.get(key)
+            if result is not None:
+                return result
+            if self.result_store.replay:
+                raise LookupError(
+                    f"No result in {self.result_store.path} for this circuit with {shots} shots on {self.target}."
+                )
+
+        qpu = Snowflurry.AnyonYamaskaQPU(
+            Snowflurry.currentClient, Snowflurry.seval("project_id")
+        )
+        circuit = Snowflurry.sf_circuit
+        if self.layout is not None:
+            logical = np.array(list(self.layout), dtype=np.int64)
+            physical = np.array(list(self.layout.values()), dtype=np.int64)
+            circuit = Snowflurry.place_circuit(circuit, logical, physical, self.physical_qubits)
+        shots_results, time = Snowflurry.transpile_and_run_job(qpu, circuit, shots)
+        result = {str(outcome): int(count) for outcome, count in shots_results.items()}
+
+        if self.result_store is not None:
+            self.result_store.put(key, result, shots, self.target)
+        return result
 
     def measure_final_state(self):
         """
@@ -326,19 +748,28 @@ class PennylaneConverter:
         # it can return ShotCopies with .shot_vector
         # the case with ShotCopies is not handled as of now
 
-        circuit = self.pennylane_circuit.map_to_standard_wires()
-        shots = circuit.shots.total_shots
+        # only the measurement processes are mapped to 0-based wire indices, the tape is never copied
+        measurements = [
+            mp.map_wires(self.wire_indices) for mp in self.pennylane_circuit.measurements
+        ]
+        shots = self.pennylane_circuit.shots.total_shots
         if shots is None:
             shots = 1
 
-        if len(circuit.measurements) == 1:
+        if self.snapshot_points and self.debugger is not None and self.debugger.active:
+            self.record_snapshots()
+
+        # shot-based measurements share a single sample set
+        self.planner = MeasurementPlanner(self, measurements, shots)
+
+        if len(measurements) == 1:
             results = self.measure(
-                circuit.measurements[0], shots
+                measurements[0], shots
             )
         else:
             results = tuple(
                 self.measure(mp, shots)
-                for mp in circuit.measurements
+                for mp in measurements
             )
 
         # Snowflurry.print(Snowflurry.sf_circuit) # uncomment to print the circuit while debugging
@@ -357,11 +788,14 @@ class PennylaneConverter:
             result: The measurement result TODO : type needs to be unified
 
         Currently supported measurements :
-            - counts(works with Snowflurry.simulate_shots)
-            - sample(works with Snowflurry.simulate_shots)
-            - probs(works with Snowflurry.get_measurement_probabilities)
-            - expval(works with Snowflurry.simulate and Snowflurry.expected_value)
+            - counts(works with shots sampled from the state)
+            - sample(works with shots sampled from the state)
+            - probs(works with the state cached by get_state)
+            - expval(works with the state cached by get_state, or with shots per group of terms)
             - state(works with Snowflurry.simulate and Snowflurry.result_state)
+            - var(works with the state cached by get_state)
+            - density_matrix, vn_entropy, purity(work with the state cached by get_state, reduced to
+              their wires)
 
         """
         self.measurementStrategy = self.get_strategy(mp)
@@ -372,6 +806,8 @@ class PennylaneConverter:
         """
         Get the strategy to use for the measurement process.
 
+        Strategies are stateless, so a single instance of each strategy is kept per converter.
+
         Args:
             mp (MeasurementProcess): The measurement process to perform
 
@@ -379,14 +815,27 @@ class PennylaneConverter:
             MeasurementStrategy: The strategy to use for the measurement process
         """
         if isinstance(mp, CountsMP):
-            return Counts()
+            strategy = Counts
         elif isinstance(mp, SampleMP):
-            return Sample()
+            strategy = Sample
         elif isinstance(mp, ProbabilityMP):
-            return Probabilities()
+            strategy = Probabilities
         elif isinstance(mp, ExpectationMP):
-            return ExpectationValue()
+            strategy = ExpectationValue
+        elif isinstance(mp, VarianceMP):
+            strategy = Variance
+        elif isinstance(mp, DensityMatrixMP):
+            # a subclass of StateMP
+            strategy = DensityMatrix
         elif isinstance(mp, StateMP):
-            return State()
+            strategy = State
+        elif isinstance(mp, VnEntropyMP):
+            strategy = VnEntropy
+        elif isinstance(mp, PurityMP):
+            strategy = Purity
         else:
             raise ValueError(f"Measurement process {mp} is not supported by this device.")
+
+        if strategy not in self._strategies:
+            self._strategies[strategy] = strategy()
+        return self._strategies[strategy]
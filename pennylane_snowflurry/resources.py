@@ -0,0 +1,47 @@
+"""
+Contains :func:`count_resources`, which counts the resources of a tape for ``qml.Tracker`` in a single pass
+over its operations.
+"""
+from collections import defaultdict
+from pennylane.resource import Resources
+
+
+def count_resources(tape) -> Resources:
+    """
+    Count the gates by type and by size, the depth, the wires and the shots of a tape.
+
+    ``tape.specs["resources"]`` builds the graph of the tape to find its depth, which is noticeable on large
+    batches. Here, the depth is the largest layer reached when each gate is placed on the layer after the
+    last gate on its wires. An operation without wires, such as ``qml.Snapshot``, acts as a full-width layer
+    that every later gate is placed after.
+
+    Args:
+        tape (QuantumTape): The tape.
+
+    Returns:
+        Resources: The same record as ``tape.specs["resources"]``.
+    """
+    gate_types = defaultdict(int)
+    gate_sizes = defaultdict(int)
+    layers = {}
+    depth = 0
+    floor = 0
+    for op in tape.operations:
+        gate_types[op.name] += 1
+        gate_sizes[len(op.wires)] += 1
+        if len(op.wires) == 0:
+            depth += 1
+            floor = depth
+            continue
+        layer = 1 + max(floor, *(layers.get(wire, 0) for wire in op.wires))
+        for wire in op.wires:
+            layers[wire] = layer
+        depth = max(depth, layer)
+    return Resources(
+        num_wires=len(tape.wires),
+        num_gates=len(tape.operations),
+        gate_types=gate_types,
+        gate_sizes=gate_sizes,
+        depth=depth,
+        shots=tape.shots,
+    )
@@ -0,0 +1,121 @@
+"""
+Contains the :class:`ResultStore` used to persist the results returned by the QPU.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+
+class ResultStore:
+    """
+    A persistent, content-addressed store for the results returned by Anyon's QPU.
+
+    Results are saved in a SQLite database and are keyed by a hash of the instructions sent to Snowflurry
+    (gates with their parameters and wires, then readouts), the number of shots and the target QPU. Since
+    hardware runs are the most expensive part of a workflow, the converter consults the store before
+    submitting a job, so a crashed notebook or a failed job array can be restarted without paying twice.
+
+    In replay mode, no job is ever submitted: results are served from the store, which allows analysis and
+    regression testing to run offline. Results read once are kept in memory, so replaying them again is
+    as fast as a dictionary lookup.
+
+    Args:
+        path (str): Path to the SQLite database. It is created if it does not exist. ``":memory:"`` keeps
+            the store in RAM for the lifetime of the object.
+        replay (bool): If True, the store is the only source of results and a missing entry is an error.
+
+    Example:
+        >>> store = ResultStore("results.sqlite")
+        >>> dev = qml.device("snowflurry.qubit", wires=2, shots=100, result_store=store, host=...)
+        >>> replay_dev = qml.device("snowflurry.qubit", wires=2, shots=100,
+        ...                         result_store=ResultStore("results.sqlite", replay=True))
+    """
+
+    def __init__(self, path=":memory:", replay=False):
+        self.path = path
+        self.replay = replay
+        self._cache = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, target TEXT, shots INTEGER, counts TEXT, created REAL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def key(instructions, shots, target, run=0) -> str:
+        """
+        Compute the content address of a job.
+
+        Args:
+            instructions (list[str]): The Snowflurry instructions of the circuit, in order, as pushed by
+                the converter (e.g. ``"rotation_x(1,0.5)"``, ``"readout(1, 1)"``).
+            shots (int): The number of shots.
+            target (str): An identifier of the QPU the job is sent to.
+            run (int): The index of the job among the jobs submitting the same circuit with the same number
+                of shots within one execution, e.g. the rounds of an adaptive estimate.
+
+        Returns:
+            str: The SHA-256 digest identifying the job.
+        """
+        job = {"instructions": list(instructions), "shots": int(shots), "target": target}
+        if run:
+            job["run"] = int(run)
+        payload = json.dumps(job)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Get the counts stored for a job.
+
+        Args:
+            key (str): The content address of the job.
+
+        Returns:
+            Optional[dict[str, int]]: The counts of the job, or None if the job is not in the store.
+        """
+        if key in self._cache:
+            return dict(self._cache[key])
+        row = self._connection.execute(
+            "SELECT counts FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._cache[key] = json.loads(row[0])
+        return dict(self._cache[key])
+
+    def put(self, key, counts, shots, target):
+        """
+        Save the counts of a job. An existing entry with the same key is replaced.
+
+        Args:
+            key (str): The content address of the job.
+            counts (dict[str, int]): The counts returned by the QPU.
+            shots (int): The number of shots.
+            target (str): An identifier of the QPU the job was sent to.
+        """
+        counts = {str(outcome): int(count) for outcome, count in counts.items()}
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (key, target, int(shots), json.dumps(counts), time.time()),
+        )
+        self._connection.commit()
+        self._cache[key] = counts
+
+    def __contains__(self, key):
+        if key in self._cache:
+            return True
+        row = self._connection.execute(
+            "SELECT 1 FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        self._connection.close()
@@ -0,0 +1,328 @@
+"""
+Contains a compact, versioned serialization of PennyLane tapes converted by the plugin.
+
+A serialized circuit is a columnar JSON document: gate names, gate wires and gate parameters are stored
+in parallel lists, and wires are stored as indices into the list of wire labels of the tape. Unlike the
+Julia ``QuantumCircuit`` held by the converter, it can be pickled, written to files and sent to other
+processes, and it round-trips both to PennyLane tapes and to Snowflurry circuits.
+
+Batches of circuits are written as JSON Lines, one circuit per line, so that they can be read back one
+circuit at a time. Files whose name ends with ``.gz`` are compressed.
+
+Example:
+    >>> record = serialize_tape(tape)
+    >>> write_circuits("batch.jsonl.gz", tapes)
+    >>> for record in read_circuits("batch.jsonl.gz"):
+    ...     tape = deserialize_tape(record)
+"""
+import gzip
+import json
+import numpy as np
+import pennylane as qml
+from pennylane.measurements import (
+    CountsMP,
+    DensityMatrixMP,
+    ExpectationMP,
+    ProbabilityMP,
+    PurityMP,
+    SampleMP,
+    StateMP,
+    VarianceMP,
+    VnEntropyMP,
+)
+from pennylane.tape import QuantumScript
+
+FORMAT_NAME = "snowflurry-circuit"
+FORMAT_VERSION = 1
+
+# Measurement processes that can be serialized, with the function building them back
+MEASUREMENT_TYPES = {
+    "expval": (ExpectationMP, qml.expval),
+    "var": (VarianceMP, qml.var),
+    "probs": (ProbabilityMP, qml.probs),
+    "counts": (CountsMP, qml.counts),
+    "sample": (SampleMP, qml.sample),
+    "state": (StateMP, qml.state),
+    "density_matrix": (DensityMatrixMP, qml.density_matrix),
+    "vn_entropy": (VnEntropyMP, qml.vn_entropy),
+    "purity": (PurityMP, qml.purity),
+}
+
+
+def _encode_parameter(parameter):
+    parameter = qml.math.unwrap(parameter)
+    if np.ndim(parameter) == 0 and not np.iscomplexobj(parameter):
+        return float(parameter)
+    array = np.asarray(parameter)
+    encoded = {"shape": list(array.shape), "real": np.real(array).ravel().tolist()}
+    if np.iscomplexobj(array):
+        encoded["imag"] = np.imag(array).ravel().tolist()
+    return encoded
+
+
+def _decode_parameter(encoded):
+    if not isinstance(encoded, dict):
+        return encoded
+    array = np.array(encoded["real"], dtype=float)
+    if "imag" in encoded:
+        array = array + 1j * np.array(encoded["imag"], dtype=float)
+    return array.reshape(encoded["shape"])
+
+
+def _encode_observable(obs, wire_index):
+    if obs is None:
+        return None
+    if type(obs).__name__ in ("PauliX", "PauliY", "PauliZ", "Identity", "Hadamard", "Hermitian", "Projector"):
+        return {
+            "name": obs.name,
+            "wires": [wire_index[wire] for wire in obs.wires],
+            "params": [_encode_parameter(p) for p in obs.parameters],
+        }
+    try:
+        sentence = qml.pauli.pauli_sentence(obs)
+    except ValueError as error:
+        raise ValueError(f"Observable {obs} cannot be serialized.") from error
+    return {
+        "pauli": [
+            [
+                float(np.real(qml.math.unwrap(coeff))),
+                {str(wire_index[wire]): pauli for wire, pauli in word.items()},
+            ]
+            for word, coeff in sentence.items()
+        ]
+    }
+
+
+def _decode_observable(encoded, wire_labels):
+    if encoded is None:
+        return None
+    if "pauli" in encoded:
+        words = {
+            qml.pauli.PauliWord({wire_labels[int(i)]: p for i, p in word.items()}): coeff
+            for coeff, word in encoded["pauli"]
+        }
+        return qml.pauli.PauliSentence(words).operation(wire_order=wire_labels)
+    op_class = getattr(qml, encoded["name"])
+    params = [_decode_parameter(p) for p in encoded["params"]]
+    return op_class(*params, wires=[wire_labels[i] for i in encoded["wires"]])
+
+
+def _encode_measurement(mp, wire_index):
+    for name, (mp_class, _) in MEASUREMENT_TYPES.items():
+        if type(mp) is mp_class:
+            encoded = {
+                "type": name,
+                "wires": [wire_index[wire] for wire in mp.wires] if mp.obs is None else [],
+                "obs": _encode_observable(mp.obs, wire_index),
+            }
+            if isinstance(mp, CountsMP) and mp.all_outcomes:
+                encoded["all_outcomes"] = True
+            if isinstance(mp, VnEntropyMP) and mp.log_base is not None:
+                encoded["log_base"] = mp.log_base
+            return encoded
+    raise ValueError(f"Measurement process {mp} cannot be serialized.")
+
+
+def _decode_measurement(encoded, wire_labels):
+    _, measure = MEASUREMENT_TYPES[encoded["type"]]
+    kwargs = {}
+    if encoded.get("all_outcomes"):
+        kwargs["all_outcomes"] = True
+    if "log_base" in encoded:
+        kwargs["log_base"] = encoded["log_base"]
+    obs = _decode_observable(encoded["obs"], wire_labels)
+    if obs is not None:
+        return measure(obs, **kwargs)
+    if encoded["type"] in ("expval", "var"):
+        raise ValueError(f"Measurement {encoded['type']} requires an observable.")
+    if encoded["type"] == "state":
+        return measure()
+    wires = [wire_labels[i] for i in encoded["wires"]]
+    if encoded["type"] in ("density_matrix", "vn_entropy", "purity"):
+        return measure(wires=wires, **kwargs)
+    return measure(wires=wires or None, **kwargs)
+
+
+def readout_wires(measurements, wire_index):
+    """
+    Get the wires read out by the shot-based measurements of a tape, as done by the measurement planner.
+
+    Args:
+        measurements (Sequence[MeasurementProcess]): The measurement processes of the tape.
+        wire_index (dict): The index of each wire label.
+
+    Returns:
+        list[int]: The indices of the wires read out, in increasing order.
+    """
+    wires = set()
+    for mp in measurements:
+        if not isinstance(mp, (CountsMP, SampleMP)):
+            continue
+        if mp.obs is None:
+            wires.update(wire_index.values())
+        else:
+            wires.add(wire_index[mp.obs.wires[0]])
+    return sorted(wires)
+
+
+def serialize_tape(tape, wires=None) -> dict:
+    """
+    Serialize a tape into the columnar format.
+
+    Args:
+        tape (QuantumTape): The tape to serialize, made of operations supported by the device. Its
+            parameters must be numbers or arrays.
+        wires (Optional[Sequence]): The wire labels of the device, which set the order of the wire
+            indices. Defaults to the wires of the tape.
+
+    Returns:
+        dict: The serialized circuit, which only contains JSON types.
+
+    Raises:
+        ValueError: If a measurement process or an observable of the tape cannot be serialized.
+    """
+    wire_labels = list(wires) if wires is not None else tape.wires.tolist()
+    wire_index = {label: i for i, label in enumerate(wire_labels)}
+    measurements = [_encode_measurement(mp, wire_index) for mp in tape.measurements]
+
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "wire_labels": wire_labels,
+        "gates": [op.name for op in tape.operations],
+        "gate_wires": [[wire_index[wire] for wire in op.wires] for op in tape.operations],
+        "params": [[_encode_parameter(p) for p in op.parameters] for op in tape.operations],
+        "hyperparameters": [
+            {key: value for key, value in op.hyperparameters.items() if isinstance(value, (bool, int, float, str))}
+            for op in tape.operations
+        ],
+        "readouts": readout_wires(tape.measurements, wire_index),
+        "measurements": measurements,
+        "shots": tape.shots.total_shots,
+    }
+
+
+def serializable(tape) -> bool:
+    """
+    Check if the measurement processes and observables of a tape can be serialized.
+    """
+    wire_index = {label: i for i, label in enumerate(tape.wires)}
+    try:
+        for mp in tape.measurements:
+            _encode_measurement(mp, wire_index)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_version(record):
+    if record.get("format") != FORMAT_NAME:
+        raise ValueError("The record is not a serialized circuit.")
+    if record.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"Serialized circuit version {record['version']} is not supported (latest is {FORMAT_VERSION})."
+        )
+
+
+def deserialize_tape(record) -> QuantumScript:
+    """
+    Build a tape back from its serialized form.
+
+    Args:
+        record (dict): The serialized circuit.
+
+    Returns:
+        QuantumScript: The tape.
+    """
+    _check_version(record)
+    wire_labels = record["wire_labels"]
+    operations = []
+    for name, wires, params, hyperparameters in zip(
+        record["gates"], record["gate_wires"], record["params"], record["hyperparameters"]
+    ):
+        op_class = getattr(qml, name)
+        kwargs = {key: value for key, value in hyperparameters.items() if key in ("tag", "id")}
+        operations.append(
+            op_class(
+                *[_decode_parameter(p) for p in params],
+                wires=[wire_labels[i] for i in wires],
+                **kwargs,
+            )
+        )
+    measurements = [_decode_measurement(mp, wire_labels) for mp in record["measurements"]]
+    return QuantumScript(operations, measurements, shots=record["shots"])
+
+
+def to_snowflurry(record, readouts=True):
+    """
+    Build the Snowflurry circuit of a serialized circuit.
+
+    Args:
+        record (dict): The serialized circuit.
+        readouts (bool): Whether to push the readouts of the shot-based measurements.
+
+    Returns:
+        The Julia ``QuantumCircuit``.
+    """
+    from pennylane_snowflurry.pennylane_converter import Snowflurry, SNOWFLURRY_OPERATION_MAP
+
+    _check_version(record)
+    circuit = Snowflurry.QuantumCircuit(qubit_count=len(record["wire_labels"]))
+    Snowflurry.serialized_circuit = circuit
+    for name, wires, params in zip(record["gates"], record["gate_wires"], record["params"]):
+        gate = SNOWFLURRY_OPERATION_MAP.get(name)
+        if gate is None or gate == NotImplementedError:
+            print(f"{name} is not supported by this device. skipping...")
+            continue
+        gate = gate.format(*params, *[wire + 1 for wire in wires])
+        Snowflurry.seval(f"push!(serialized_circuit,{gate})")
+    if readouts:
+        for wire in record["readouts"]:
+            Snowflurry.seval(f"push!(serialized_circuit, readout({wire + 1}, {wire + 1}))")
+    return circuit
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_circuits(path, tapes, wires=None, append=False):
+    """
+    Write a batch of tapes to a JSON Lines file, one serialized circuit per line.
+
+    Args:
+        path (str): The path of the file. The file is compressed if its name ends with ``.gz``.
+        tapes (Iterable[QuantumTape]): The tapes to write. They are serialized one at a time.
+        wires (Optional[Sequence]): The wire labels of the device.
+        append (bool): Whether to append to the file instead of overwriting it.
+
+    Returns:
+        int: The number of circuits written.
+    """
+    count = 0
+    with _open(path, "a" if append else "w") as file:
+        for tape in tapes:
+            file.write(json.dumps(serialize_tape(tape, wires=wires), separators=(",", ":")))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def read_circuits(path):
+    """
+    Read serialized circuits from a JSON Lines file, one at a time.
+
+    Args:
+        path (str): The path of the file.
+
+    Yields:
+        dict: The serialized circuits, in the order they were written.
+    """
+    with _open(path, "r") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                _check_version(record)
+                yield record
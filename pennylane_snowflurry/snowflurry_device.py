@@ -1,4 +1,5 @@
 from typing import Union, Callable, Tuple, Optional, Sequence
+import os
 import numpy as np
 from pennylane import Device
 import abc
@@ -8,9 +9,33 @@ from pennylane.typing import Result, ResultBatch
 from pennylane.transforms import convert_to_numpy_parameters
 from pennylane.transforms.core import TransformProgram
 from pennylane.operation import Operator
-from pennylane.devices.preprocess import decompose
 from pennylane_snowflurry.pennylane_converter import PennylaneConverter
-from pennylane_snowflurry.pennylane_converter import SNOWFLURRY_OPERATION_MAP
+from pennylane_snowflurry.pennylane_converter import (
+    SNOWFLURRY_OPERATION_MAP,
+    PRECISIONS,
+    default_wire_map,
+)
+from pennylane_snowflurry.result_store import ResultStore
+from pennylane_snowflurry.circuit_template import CircuitTemplate
+from pennylane_snowflurry.decomposition_cache import DecompositionCache, cached_decompose
+from pennylane_snowflurry.light_cone import light_cone
+from pennylane_snowflurry.resources import count_resources
+from pennylane_snowflurry.measurements.sparse import SparseObservableCache
+from pennylane_snowflurry.layout import SWAP_CNOTS, CouplingMap, LayoutSelector
+from pennylane_snowflurry.executors import MPIBatchExecutor, ProcessPoolBatchExecutor
+from pennylane_snowflurry.serialization import serializable
+from pennylane_snowflurry.memory import (
+    MemoryBudget,
+    estimate_peak_memory,
+    estimate_tableau_memory,
+)
+from pennylane_snowflurry import stabilizer
+from pennylane_snowflurry.trajectories import (
+    DEFAULT_TRAJECTORIES,
+    NOISE_CHANNELS,
+    simulate_trajectories,
+)
+from pennylane_snowflurry.warmup import JuliaWarmup, MAX_WARMUP_WIRES
 from pennylane_snowflurry.execution_config import (
     ExecutionConfig,
     DefaultExecutionConfig,
@@ -19,7 +44,7 @@ from pennylane.typing import Result, ResultBatch
 from ._version import __version__
 
 
-# The plugin does not support batching yet, but this is a placeholder for future implementation
+# A device executes a single tape or a batch of tapes
 Result_or_ResultBatch = Union[Result, ResultBatch]
 QuantumTapeBatch = Sequence[QuantumTape]
 QuantumTape_or_Batch = Union[
@@ -44,6 +69,8 @@ def stopping_condition(op: qml.operation.Operator) -> bool:
         This operator should eventually be mapped to a Snowflurry operation and won't
         need to be decomposed.
     """
+    if op.name == "Snapshot":
+        return True
     if op.name not in SNOWFLURRY_OPERATION_MAP.keys():
         return False
     if op.name == "GroverOperator":
@@ -52,20 +79,27 @@ def stopping_condition(op: qml.operation.Operator) -> bool:
         op.name == "MultiControlledX"
     ):  # TODO : remove this condition once MultiControlledX is supported
         return False
-    if op.name == "Snapshot":
-        return True
     if op.__class__.__name__[:3] == "Pow" and qml.operation.is_trainable(op):
         return False
 
     return op.has_matrix
 
 
+def noisy_stopping_condition(op: qml.operation.Operator) -> bool:
+    """Specify whether or not an Operator object is supported by the device in noisy mode, where the noise
+    channels of ``NOISE_CHANNELS`` are simulated by trajectories.
+    """
+    return op.name in NOISE_CHANNELS or stopping_condition(op)
+
+
 class SnowflurryQubitDevice(qml.devices.Device):
     """Snowflurry Qubit PennyLane device for interfacing with Anyon's quantum simulators or quantum Hardware.
 
     * Extends the PennyLane :class:`~.pennylane.Device` class.
     * Snowflurry API credentials are only required for sending jobs on Anyon System's QPU.
-    * Batching is not supported yet.
+    * Batches of tapes are executed together: identical analytic tapes run once, tapes differing only by
+      their parameters share a compiled circuit, and tapes can be distributed to ``max_workers`` processes
+      or to MPI ranks with ``distributed``.
 
     Args:
         wires (int, Iterable[Number, str]): Number of wires present on the device, or iterable that
@@ -85,10 +119,58 @@ class SnowflurryQubitDevice(qml.devices.Device):
             using a pool of at most ``max_workers`` processes. If ``max_workers`` is ``None``,
             only the current process executes tapes. If you experience any
             issue, say using JAX, TensorFlow, Torch, try setting ``max_workers`` to ``None``.
+        distributed (bool): Whether batches are executed on the ranks of an MPI job instead of on the
+            current node, with ``mpi4py.futures``. ``max_workers`` then sets the number of worker ranks,
+            and defaults to the size of the SLURM allocation. See :mod:`~.executors`.
         host (str): URL of the QPU server.
         user (str): Username.
         access_token (str): User access token.
         project_id (str): Used to identify which project the jobs sent to this QPU belong to.
+        result_store (Union[str, ResultStore, None]): A store in which the results returned by the QPU are
+            saved and from which they are served when the same job is submitted again. A string is used as
+            the path of a SQLite database. See :class:`~.ResultStore`, including its replay mode.
+        shot_chunk_size (int): If set, shots are drawn and processed in blocks of at most this many shots,
+            so that peak memory does not grow with the number of shots of counts and expectation values.
+        memory_budget (Union[int, str]): If set, the memory available to executions, in bytes or as a string
+            such as ``"16GiB"``. The peak memory of each execution is estimated before running it: an
+            execution that exceeds the budget is refused with a ``MemoryError``, and executions only run
+            while their estimates fit in the budget together. See :func:`~.estimate_peak_memory`.
+        target_precision (float): If set, expectation values of Pauli observables and probabilities measured
+            with shots are estimated adaptively: shots are drawn in increasing rounds until the standard
+            error of the estimate is at most ``target_precision``, the shots of the circuit being the
+            budget. See :mod:`~.measurements.adaptive`.
+        precision (str): The floating-point precision of simulations, ``"double"`` (default) or ``"single"``.
+            In single precision, the state is evolved, measured and returned as ``complex64``, halving the
+            memory of the state and of its transfers to NumPy. Every gate rounds the amplitudes to about
+            ``6e-8`` relative error, so the error grows at most linearly with the number of gates:
+            probabilities and expectation values stay within about ``1e-6`` of double precision for circuits
+            of up to a few hundred gates, and within ``n_gates * 1e-7`` in general. Shots are then sampled
+            in NumPy from the single-precision state. See ``benchmarks/precision.py``.
+        warmup (bool): Whether to compile the Julia methods used by the device in a background Julia task
+            started here, so that the first execution does not pay for their compilation. The first
+            execution waits for the warm-up, whose duration is given by :attr:`warmup_time` and reported
+            to the tracker as ``warmup_time``. See :mod:`~.warmup`.
+        state_directory (str): If set, ``qml.state()`` results are written to memory-mapped ``.npy`` files
+            in this directory, each in a new file named after the hash of the circuit, and returned as
+            ``np.memmap`` arrays. The state is copied to the file in chunks from the Julia buffer, so that
+            the resident memory stays at about one copy of the state.
+        coupling_map (str): If set, circuits sent to the QPU are placed on physical qubits chosen to
+            minimize the SWAPs needed by their two-qubit gates, before being transpiled. The path of a JSON
+            description of the QPU, as written by :func:`~.layout.export_coupling_map`, or the name of a
+            coupling map shipped with the plugin (``"grid_6x4"``). Layouts are cached per circuit structure,
+            and the two-qubit gates saved over the trivial layout are reported to the tracker as
+            ``two_qubit_gates_saved``. See :mod:`~.layout`.
+        trajectories (int): If set, circuits are simulated with noise: the ``DepolarizingChannel``,
+            ``AmplitudeDamping`` and ``BitFlip`` channels of the circuit are applied to this many quantum
+            trajectories of the state vector, whose measurements are averaged. The chunks of trajectories
+            run on the workers of ``max_workers`` when set. The number of trajectories and the largest
+            standard error of the averaged expectation values and probabilities are reported to the tracker
+            as ``trajectories`` and ``trajectory_standard_error``. See :mod:`~.trajectories`.
+        readout_error (Union[float, Tuple[float, float]]): If set, circuits are simulated with noise (with
+            ``DEFAULT_TRAJECTORIES`` trajectories unless ``trajectories`` is set), and measured bits are
+            flipped with this probability, or with the probabilities of reading 1 for a 0 and 0 for a 1.
+            The readout error applies to counts, samples, probabilities, and to expectation values and
+            variances of observables diagonal in the computational basis; other observables are refused.
 
     """  # host, user, access_token, project_id would ideally be keyword args
 
@@ -102,6 +184,18 @@ class SnowflurryQubitDevice(qml.devices.Device):
         access_token="",
         project_id="",
         realm="",
+        result_store=None,
+        shot_chunk_size=None,
+        memory_budget=None,
+        max_workers=None,
+        distributed=False,
+        target_precision=None,
+        precision="double",
+        warmup=False,
+        state_directory=None,
+        coupling_map=None,
+        trajectories=None,
+        readout_error=None,
     ) -> None:
         super().__init__(wires=wires, shots=shots)
 
@@ -113,6 +207,61 @@ class SnowflurryQubitDevice(qml.devices.Device):
         self.project_id = project_id
         self.realm = realm
         self._debugger = None
+        if isinstance(result_store, str):
+            result_store = ResultStore(result_store)
+        self.result_store = result_store
+        self.shot_chunk_size = shot_chunk_size
+        self.target_precision = target_precision
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Unknown precision {precision!r}, expected one of {', '.join(PRECISIONS)}."
+            )
+        self.precision = precision
+        self.state_directory = state_directory
+        if state_directory is not None:
+            os.makedirs(state_directory, exist_ok=True)
+        self._layout_selector = (
+            LayoutSelector(CouplingMap.load(coupling_map)) if coupling_map is not None else None
+        )
+        self._memory_budget = (
+            MemoryBudget(memory_budget) if memory_budget is not None else None
+        )
+        if distributed:
+            self._executor = MPIBatchExecutor(max_workers)
+        elif max_workers is not None:
+            self._executor = ProcessPoolBatchExecutor(max_workers)
+        else:
+            self._executor = None
+        if isinstance(readout_error, (int, float)):
+            readout_error = (readout_error, readout_error)
+        self.readout_error = readout_error
+        if trajectories is None and readout_error is not None:
+            trajectories = DEFAULT_TRAJECTORIES
+        if trajectories is not None and trajectories < 1:
+            raise ValueError(f"The number of trajectories must be positive, not {trajectories}.")
+        self.trajectories = trajectories
+        if self.noisy and self.use_qpu:
+            raise ValueError("Noisy simulations are not available when jobs are sent to the QPU.")
+        self._decomposition_cache = DecompositionCache(
+            noisy_stopping_condition if self.noisy else stopping_condition
+        )
+        # sparse matrices of the observables measured on the device
+        self._sparse_cache = SparseObservableCache()
+        # Julia circuit builders, by tape structure
+        self._circuit_templates = {}
+        # 1-based Julia index of each wire label, shared by every tape executed on the device
+        self._wire_map = (
+            {label: i + 1 for i, label in enumerate(self.wires)}
+            if self.wires is not None
+            else None
+        )
+        self._warmup = None
+        self._warmup_reported = False
+        if warmup:
+            self._warmup = JuliaWarmup(
+                self.num_wires if self.wires is not None else MAX_WARMUP_WIRES, precision
+            )
+            self._warmup.start()
 
     pennylane_requires = ">=0.30.0"
 
@@ -144,6 +293,53 @@ class SnowflurryQubitDevice(qml.devices.Device):
         """
         return len(self.wires)
 
+    @property
+    def use_qpu(self) -> bool:
+        """Whether shot-based measurements are sent to the QPU instead of the simulator."""
+        has_client = all([self.host, self.user, self.access_token, self.realm])
+        return has_client or (self.result_store is not None and self.result_store.replay)
+
+    @property
+    def noisy(self) -> bool:
+        """Whether circuits are simulated with noise, by quantum trajectories."""
+        return self.trajectories is not None
+
+    @property
+    def warmup_time(self) -> Optional[float]:
+        """The duration of the warm-up in seconds, once it has finished, or None without warm-up."""
+        if self._warmup is None:
+            return None
+        return self._warmup.wait()
+
+    def estimate_memory(self, circuit, num_wires=None, tableau=False):
+        """
+        Estimate the peak memory of the execution of a circuit.
+
+        Args:
+            circuit (QuantumTape): The circuit.
+            num_wires (Optional[int]): The number of wires of the simulated register. Defaults to the
+                number of wires of the device.
+            tableau (bool): Whether the circuit is executed by the stabilizer simulator.
+
+        Returns:
+            MemoryEstimate: The estimate, in bytes.
+        """
+        if num_wires is None:
+            num_wires = self.num_wires if self.wires is not None else len(circuit.wires)
+        if tableau:
+            return estimate_tableau_memory(
+                num_wires, circuit.shots.total_shots, self.shot_chunk_size
+            )
+        return estimate_peak_memory(
+            circuit.measurements,
+            num_wires,
+            shots=circuit.shots.total_shots,
+            shot_chunk_size=self.shot_chunk_size,
+            use_qpu=self.use_qpu,
+            amplitude_bytes=np.dtype(PRECISIONS[self.precision][1]).itemsize,
+            memmap_states=self.state_directory is not None,
+        )
+
     @property
     def name(self):
         """The name of the device."""
@@ -168,8 +364,9 @@ class SnowflurryQubitDevice(qml.devices.Device):
 
         transform_program = TransformProgram()
 
+        # decompositions are memoized per operator signature across tapes and executions
         transform_program.add_transform(
-            decompose, stopping_condition=stopping_condition, name=self.name
+            cached_decompose, cache=self._decomposition_cache
         )
 
         return transform_program, config
@@ -192,15 +389,76 @@ class SnowflurryQubitDevice(qml.devices.Device):
             Result (tuple): a single result if a single circuit is executed, or a tuple of results if a batch of
             circuits is executed.
         """
+        # the execution uses the methods compiled by the warm-up
+        warmup_time = None
+        if self._warmup is not None and not self._warmup_reported:
+            warmup_time = self._warmup.wait()
+            self._warmup_reported = True
+
         is_single_circuit = False
         if isinstance(circuits, QuantumScript):
             is_single_circuit = True
             circuits = [circuits]
 
+        # identical analytic tapes (e.g. unshifted copies made by gradient transforms) are executed once
+        batch = circuits
+        circuits, positions = self._deduplicate(batch)
+        # the register of each circuit is shrunk to the light cone of its measurements
+        registers = [self._register(circuit) for circuit in circuits]
+        circuits = [circuit for circuit, _ in registers]
+        wire_maps = [wire_map for _, wire_map in registers]
+        layouts = [self._layout(circuit, wire_map) for circuit, wire_map in zip(circuits, wire_maps)]
+
+        # Clifford circuits are executed by the stabilizer simulator
+        tableaus = [
+            self._uses_tableau(circuit, wire_map)
+            for circuit, wire_map in zip(circuits, wire_maps)
+        ]
+        estimates = [
+            self.estimate_memory(circuit, len(wire_map) if wire_map else None, tableau)
+            for circuit, wire_map, tableau in zip(circuits, wire_maps, tableaus)
+        ]
+        if self._memory_budget is not None:
+            # refuse the whole batch before running any of its circuits
+            for i, estimate in enumerate(estimates):
+                self._memory_budget.check(estimate.peak, f"Circuit {i} of the batch")
+
+        distribute = (
+            self._executor is not None
+            and len(circuits) > 1
+            and self._debugger is None
+            and not any(tableaus)
+            # the trajectories of noisy circuits are distributed instead
+            and not self.noisy
+            # layouts are applied by the converters of this process
+            and not any(layouts)
+        )
+        families = {} if distribute else self._families(circuits, wire_maps, tableaus)
+
         if self.tracker.active:
-            for c in circuits:
-                self.tracker.update(resources=c.specs["resources"])
-            self.tracker.update(batches=1, executions=len(circuits))
+            if warmup_time is not None:
+                self.tracker.update(warmup_time=warmup_time)
+            # the resources of each circuit are counted once, in a single pass over its operations
+            resources = [count_resources(circuit) for circuit in circuits]
+            for position in positions:
+                self.tracker.update(
+                    resources=resources[position],
+                    peak_memory=estimates[position].peak,
+                    simulated_wires=len(wire_maps[position] or circuits[position].wires),
+                )
+            self.tracker.update(
+                batches=1,
+                executions=len(batch),
+                deduplicated_executions=len(batch) - len(circuits),
+                templated_executions=sum(len(family) for family in families.values()),
+                tableau_executions=sum(tableaus),
+                two_qubit_gates_saved=sum(
+                    SWAP_CNOTS * (layouts[position].trivial_swaps - layouts[position].swaps)
+                    for position in positions
+                    if layouts[position] is not None
+                ),
+                **self._decomposition_cache.pop_statistics(),
+            )
             self.tracker.record()
 
         # Check if execution_config is an instance of ExecutionConfig
@@ -214,8 +472,199 @@ class SnowflurryQubitDevice(qml.devices.Device):
             # Fallback or default behavior if execution_config is not an instance of ExecutionConfig
             interface = None
 
-        results = tuple(
-            PennylaneConverter(
+        if distribute:
+            # circuits whose measurements cannot be serialized are executed in this process
+            remote = [i for i, circuit in enumerate(circuits) if serializable(circuit)]
+            results = [None] * len(circuits)
+            # the shots of each worker are drawn from a child of the seed of the device
+            seeds = np.random.SeedSequence(int(self._rng.integers(2**63))).spawn(len(remote))
+            remote_results = self._executor.map(
+                [circuits[i] for i in remote],
+                self._worker_options(),
+                registers=[list(wire_maps[i]) if wire_maps[i] else None for i in remote],
+                memory_budget=self._memory_budget,
+                peaks=[estimates[i].peak for i in remote],
+                seeds=seeds,
+            )
+            for i, result in zip(remote, remote_results):
+                results[i] = result
+            for i in sorted(set(range(len(circuits))) - set(remote)):
+                results[i] = self._execute_circuit(
+                    circuits[i], wire_maps[i], interface, estimates[i].peak
+                )
+        else:
+            prebuilt = self._build_families(circuits, wire_maps, families)
+            results = tuple(
+                self._execute_circuit(
+                    circuit, wire_map, interface, estimate.peak, built, tableau, layout
+                )
+                for circuit, wire_map, estimate, built, tableau, layout in zip(
+                    circuits, wire_maps, estimates, prebuilt, tableaus, layouts
+                )
+            )
+
+        results = tuple(results[position] for position in positions)
+        return results[0] if is_single_circuit else results
+
+    @staticmethod
+    def _deduplicate(circuits):
+        """
+        Find the identical analytic circuits of a batch, by hash. Circuits with shots are all executed, so
+        that copies get independent samples, as PennyLane does for cached executions with finite shots.
+
+        Returns:
+            Tuple[list[QuantumTape], list[int]]: The unique circuits, and the position of each circuit of the
+                batch among the unique circuits.
+        """
+        unique = []
+        index = {}
+        positions = []
+        for circuit in circuits:
+            if circuit.shots.total_shots is not None:
+                positions.append(len(unique))
+                unique.append(circuit)
+                continue
+            key = circuit.hash
+            if key not in index:
+                index[key] = len(unique)
+                unique.append(circuit)
+            positions.append(index[key])
+        return unique, positions
+
+    def _worker_options(self) -> dict:
+        """
+        Get the options with which workers execute circuits. Results stored in memory are not shared.
+        """
+        options = {
+            "host": self.host,
+            "user": self.user,
+            "access_token": self.access_token,
+            "project_id": self.project_id,
+            "realm": self.realm,
+            "shot_chunk_size": self.shot_chunk_size,
+            "target_precision": self.target_precision,
+            "precision": self.precision,
+            "state_directory": self.state_directory,
+        }
+        if self.result_store is not None and self.result_store.path != ":memory:":
+            options["result_store"] = self.result_store.path
+            options["replay"] = self.result_store.replay
+        return options
+
+    def _register(self, circuit):
+        """
+        Remove the gates and wires of a simulated circuit outside the light cone of its measurements.
+
+        Returns:
+            Tuple[QuantumTape, Optional[dict]]: The circuit to execute, and the 1-based Julia index of each
+                wire label of its register.
+        """
+        if self._wire_map is None or self.use_qpu or self._debugger is not None:
+            return circuit, self._wire_map
+        pruned = light_cone(circuit, self.wires.tolist())
+        if pruned is None:
+            return circuit, self._wire_map
+        circuit, labels = pruned
+        return circuit, {label: i + 1 for i, label in enumerate(labels)}
+
+    def _layout(self, circuit, wire_map):
+        """
+        Select the layout of a circuit sent to the QPU (see :mod:`~.layout`).
+
+        Returns:
+            Optional[Layout]: The layout, or None without coupling map or QPU.
+        """
+        if self._layout_selector is None or not self.use_qpu:
+            return None
+        return self._layout_selector.select(circuit, wire_map or default_wire_map(circuit.wires))
+
+    def _uses_tableau(self, circuit, wire_map) -> bool:
+        """
+        Check if a circuit is executed by the stabilizer simulator (see :mod:`~.stabilizer`).
+        """
+        if wire_map is None or self.use_qpu or self._debugger is not None or self.noisy:
+            return False
+        return stabilizer.supports(circuit)
+
+    def _families(self, circuits, wire_maps, tableaus) -> dict:
+        """
+        Group the circuits of a batch that only differ by their parameters, such as the shifted tapes of a
+        parameter-shift gradient.
+
+        Returns:
+            dict[tuple, list[int]]: The indices of the circuits of each family of at least two circuits,
+                keyed by their structure and the size of their register.
+        """
+        if self._wire_map is None or self._debugger is not None or self.noisy:
+            return {}
+        families = {}
+        for i, (circuit, wire_map) in enumerate(zip(circuits, wire_maps)):
+            if tableaus[i]:
+                continue
+            key = CircuitTemplate.key(circuit, wire_map)
+            if key is not None:
+                families.setdefault((key, len(wire_map)), []).append(i)
+        return {key: family for key, family in families.items() if len(family) > 1}
+
+    def _build_families(self, circuits, wire_maps, families) -> list:
+        """
+        Build the Snowflurry circuits of each family with a single call to the template of its structure.
+        The final states are computed in the same call when no measurement needs shots.
+
+        Returns:
+            list[Optional[tuple]]: For each circuit, what :meth:`PennylaneConverter.simulate` needs to skip
+                the conversion, or None if the circuit is converted on its own.
+        """
+        prebuilt = [None] * len(circuits)
+        for key, family in families.items():
+            if key not in self._circuit_templates:
+                first = family[0]
+                self._circuit_templates[key] = CircuitTemplate(
+                    circuits[first], wire_maps[first], len(wire_maps[first])
+                )
+            tapes = [circuits[i] for i in family]
+            # holding every state of the family at once would bypass the memory budget
+            # templates simulate in double precision only
+            with_states = (
+                self._memory_budget is None
+                and not self.use_qpu
+                and self.precision == "double"
+                and all(
+                    tape.shots.total_shots is None for tape in tapes
+                )
+            )
+            built = self._circuit_templates[key].build(tapes, with_states=with_states)
+            for i, circuit in zip(family, built):
+                prebuilt[i] = circuit
+        return prebuilt
+
+    def _execute_circuit(
+        self,
+        circuit,
+        wire_map,
+        interface,
+        peak_memory,
+        prebuilt=None,
+        tableau=False,
+        layout=None,
+    ):
+        """
+        Execute a single circuit, once its estimated peak memory fits in the memory budget.
+        """
+        if tableau:
+
+            def run():
+                return stabilizer.simulate_tableau(
+                    circuit, wire_map, len(wire_map), self.shot_chunk_size, self._rng
+                )
+
+        elif self.noisy:
+
+            def run():
+                return self._simulate_trajectories(circuit, wire_map)
+
+        else:
+            converter = PennylaneConverter(
                 circuit,
                 debugger=self._debugger,
                 interface=interface,
@@ -224,9 +673,53 @@ class SnowflurryQubitDevice(qml.devices.Device):
                 access_token=self.access_token,
                 project_id=self.project_id,
                 realm=self.realm,
-                wires=self.num_wires,
-            ).simulate()
-            for circuit in circuits
-        )
+                wires=len(wire_map) if wire_map else self.num_wires,
+                result_store=self.result_store,
+                shot_chunk_size=self.shot_chunk_size,
+                wire_map=wire_map,
+                target_precision=self.target_precision,
+                precision=self.precision,
+                rng=self._rng,
+                state_directory=self.state_directory,
+                layout=layout.mapping if layout is not None else None,
+                physical_qubits=self._layout_selector.coupling_map.num_qubits
+                if self._layout_selector is not None
+                else None,
+                sparse_cache=self._sparse_cache,
+            )
 
-        return results[0] if is_single_circuit else results
+            def run():
+                return converter.simulate(prebuilt)
+
+        if self._memory_budget is None:
+            return run()
+        with self._memory_budget.reserve(peak_memory):
+            return run()
+
+    def _simulate_trajectories(self, circuit, wire_map):
+        """
+        Simulate a noisy circuit with quantum trajectories, split in a chunk per worker.
+        """
+        wire_map = wire_map or default_wire_map(circuit.wires)
+        pool, chunks = None, 1
+        if self._executor is not None:
+            pool = self._executor.pool
+            chunks = self._executor.max_workers or os.cpu_count() or 1
+        estimate = simulate_trajectories(
+            circuit,
+            wire_map,
+            max(wire_map.values()),
+            self.trajectories,
+            readout_error=self.readout_error,
+            shot_chunk_size=self.shot_chunk_size,
+            rng=self._rng,
+            pool=pool,
+            chunks=chunks,
+        )
+        if self.tracker.active:
+            self.tracker.update(
+                trajectories=estimate.trajectories,
+                trajectory_standard_error=estimate.standard_error,
+            )
+            self.tracker.record()
+        return estimate.results
@@ -0,0 +1,494 @@
+"""
+Contains the stabilizer tableau simulator used by the device for circuits made of Clifford gates only.
+
+Clifford circuits map stabilizer states to stabilizer states, which are described by ``n`` stabilizer and
+``n`` destabilizer Pauli generators instead of ``2**n`` amplitudes (Aaronson and Gottesman, "Improved
+simulation of stabilizer circuits", 2004). Gates update the tableau in ``O(n)`` operations, so that
+samples, counts and expectation values of Pauli observables are computed in polynomial time, for
+registers far larger than a state vector can hold.
+"""
+import numpy as np
+import pennylane as qml
+from pennylane.measurements import CountsMP, ExpectationMP, SampleMP
+from pennylane_snowflurry.measurements.counts_array import MAX_PACKED_BITS, unpack_bits
+from pennylane_snowflurry.measurements.pauli_grouping import pauli_terms, qwc_groups
+from pennylane_snowflurry.measurements.planner import MeasurementPlanner, decimal_rows
+from pennylane_snowflurry.pennylane_converter import SNOWFLURRY_OPERATION_MAP
+
+# Gates of SNOWFLURRY_OPERATION_MAP that are Clifford gates for any parameters
+CLIFFORD_GATES = {"PauliX", "PauliY", "PauliZ", "Hadamard", "CNOT", "CY", "CZ", "SWAP", "ISWAP", "Identity"}
+
+# Rotations of SNOWFLURRY_OPERATION_MAP that are Clifford gates when their angle is a multiple of pi / 2
+CLIFFORD_ROTATIONS = {"PhaseShift", "RX", "RY", "RZ"}
+
+
+def quarter_turns(angle):
+    """
+    Get the number of quarter turns of an angle.
+
+    Returns:
+        Optional[int]: The angle as a multiple of pi / 2, modulo 4, or None if it is not a multiple.
+    """
+    turns = float(qml.math.unwrap(angle)) / (np.pi / 2)
+    if not np.isclose(turns, np.round(turns)):
+        return None
+    return int(np.round(turns)) % 4
+
+
+def is_clifford(op) -> bool:
+    """
+    Check if an operation is a Clifford gate of ``SNOWFLURRY_OPERATION_MAP``.
+    """
+    if op.name not in SNOWFLURRY_OPERATION_MAP:
+        return False
+    if op.name in CLIFFORD_GATES:
+        return True
+    return op.name in CLIFFORD_ROTATIONS and quarter_turns(op.parameters[0]) is not None
+
+
+def supports(tape) -> bool:
+    """
+    Check if a tape can be executed by the stabilizer simulator: its operations are Clifford gates, and
+    its measurements are counts, samples, or expectation values of observables made of Pauli words.
+    """
+    if not all(is_clifford(op) for op in tape.operations):
+        return False
+    for mp in tape.measurements:
+        if isinstance(mp, (CountsMP, SampleMP)):
+            continue
+        if not isinstance(mp, ExpectationMP) or mp.obs is None:
+            return False
+        try:
+            pauli_terms(mp.obs)
+        except ValueError:
+            return False
+    return True
+
+
+def _multiply(x1, z1, r1, x2, z2, r2):
+    """
+    Multiply the Pauli words ``(x1, z1, r1)`` and ``(x2, z2, r2)`` whose product is Hermitian. The second
+    word may hold several rows, each multiplied by the first word.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The X bits, Z bits and sign bits of the products.
+    """
+    x2i, z2i = x2.astype(int), z2.astype(int)
+    # exponent of i in the product of the Paulis of each qubit
+    g = np.where(
+        x1 & z1,
+        z2i - x2i,
+        np.where(x1, z2i * (2 * x2i - 1), np.where(z1, x2i * (1 - 2 * z2i), 0)),
+    )
+    phase = (2 * np.asarray(r1, dtype=int) + 2 * np.asarray(r2, dtype=int) + g.sum(axis=-1)) % 4
+    return x2 ^ x1, z2 ^ z1, phase == 2
+
+
+class Tableau:
+    """
+    The stabilizer tableau of an ``n``-qubit state.
+
+    Rows ``0`` to ``n - 1`` hold the destabilizers and rows ``n`` to ``2n - 1`` the stabilizers, each as the
+    X and Z bits of a Pauli word (both bits set for Y) and a sign bit. The initial state is ``|0...0>``.
+
+    Args:
+        num_qubits (int): The number of qubits.
+    """
+
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.x = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.z = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.r = np.zeros(2 * num_qubits, dtype=bool)
+        self.x[np.arange(num_qubits), np.arange(num_qubits)] = True
+        self.z[num_qubits + np.arange(num_qubits), np.arange(num_qubits)] = True
+
+    def copy(self):
+        tableau = Tableau.__new__(Tableau)
+        tableau.num_qubits = self.num_qubits
+        tableau.x, tableau.z, tableau.r = self.x.copy(), self.z.copy(), self.r.copy()
+        return tableau
+
+    def h(self, a):
+        self.r ^= self.x[:, a] & self.z[:, a]
+        self.x[:, a], self.z[:, a] = self.z[:, a].copy(), self.x[:, a].copy()
+
+    def s(self, a):
+        self.r ^= self.x[:, a] & self.z[:, a]
+        self.z[:, a] ^= self.x[:, a]
+
+    def cnot(self, a, b):
+        self.r ^= self.x[:, a] & self.z[:, b] & ~(self.x[:, b] ^ self.z[:, a])
+        self.x[:, b] ^= self.x[:, a]
+        self.z[:, a] ^= self.z[:, b]
+
+    def pauli_x(self, a):
+        self.r ^= self.z[:, a]
+
+    def pauli_y(self, a):
+        self.r ^= self.x[:, a] ^ self.z[:, a]
+
+    def pauli_z(self, a):
+        self.r ^= self.x[:, a]
+
+    def cz(self, a, b):
+        self.h(b)
+        self.cnot(a, b)
+        self.h(b)
+
+    def swap(self, a, b):
+        self.x[:, [a, b]] = self.x[:, [b, a]]
+        self.z[:, [a, b]] = self.z[:, [b, a]]
+
+    def phase(self, a, turns):
+        """Apply ``S**turns``, which is ``RZ(turns * pi / 2)`` up to a global phase."""
+        for _ in range(turns % 4):
+            self.s(a)
+
+    def apply(self, name, wires, parameters=()):
+        """
+        Apply a Clifford gate.
+
+        Args:
+            name (str): The name of the PennyLane operation.
+            wires (Sequence[int]): The qubits, indexed from 0.
+            parameters (Sequence[float]): The parameters of the operation.
+        """
+        if name == "Hadamard":
+            self.h(*wires)
+        elif name == "PauliX":
+            self.pauli_x(*wires)
+        elif name == "PauliY":
+            self.pauli_y(*wires)
+        elif name == "PauliZ":
+            self.pauli_z(*wires)
+        elif name == "CNOT":
+            self.cnot(*wires)
+        elif name == "CZ":
+            self.cz(*wires)
+        elif name == "CY":
+            # CY = S_b CNOT S_b^dagger
+            self.phase(wires[1], 3)
+            self.cnot(*wires)
+            self.phase(wires[1], 1)
+        elif name == "SWAP":
+            self.swap(*wires)
+        elif name == "ISWAP":
+            # ISWAP = SWAP CZ (S x S)
+            self.s(wires[0])
+            self.s(wires[1])
+            self.cz(*wires)
+            self.swap(*wires)
+        elif name in ("PhaseShift", "RZ"):
+            self.phase(wires[0], quarter_turns(parameters[0]))
+        elif name == "RX":
+            self.h(wires[0])
+            self.phase(wires[0], quarter_turns(parameters[0]))
+            self.h(wires[0])
+        elif name == "RY":
+            # RY = S RX S^dagger
+            self.phase(wires[0], 3)
+            self.apply("RX", wires, parameters)
+            self.phase(wires[0], 1)
+        elif name != "Identity":
+            raise ValueError(f"{name} is not a Clifford gate.")
+
+    def _products(self, h, i):
+        """
+        Multiply the rows ``h`` by the row ``i`` in place (the rowsum of Aaronson and Gottesman).
+        """
+        self.x[h], self.z[h], self.r[h] = _multiply(
+            self.x[i], self.z[i], self.r[i], self.x[h], self.z[h], self.r[h]
+        )
+
+    def _stabilizer_product(self, rows):
+        """
+        Multiply stabilizers, which commute.
+
+        Writing each word as ``(-1)**r * i**(x.z) * X**x Z**z``, moving the X factors of the product to the
+        left flips the sign once for each pair of a Z bit of a word with the X bit of a later word on the
+        same qubit, so the sign of the product is computed without multiplying the words one by one.
+
+        Args:
+            rows (Sequence[int]): The indices of the stabilizers, from 0 to ``n - 1``.
+
+        Returns:
+            bool: The sign bit of the product.
+        """
+        n = self.num_qubits
+        rows = n + np.asarray(rows, dtype=int)
+        if len(rows) == 0:
+            return False
+        x, z = self.x[rows], self.z[rows]
+        # only the parities of the Z bits of the previous words matter
+        previous_z = np.logical_xor.accumulate(z, axis=0)
+        swaps = np.count_nonzero(x[1:] & previous_z[:-1])
+        product_y = np.count_nonzero(np.logical_xor.reduce(x) & previous_z[-1])
+        exponent = (
+            2 * np.count_nonzero(self.r[rows]) + np.count_nonzero(x & z) + 2 * swaps - product_y
+        )
+        return exponent % 4 == 2
+
+    def measure(self, a, outcome=0):
+        """
+        Measure a qubit in the computational basis, collapsing the state.
+
+        Args:
+            a (int): The qubit.
+            outcome (int): The outcome chosen when the outcome is random.
+
+        Returns:
+            int: The outcome.
+        """
+        n = self.num_qubits
+        random = np.flatnonzero(self.x[n:, a])
+        if len(random) > 0:
+            p = n + random[0]
+            rows = np.flatnonzero(self.x[:, a])
+            rows = rows[rows != p]
+            if len(rows) > 0:
+                self._products(rows, p)
+            self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+            self.x[p], self.z[p] = False, False
+            self.z[p, a] = True
+            self.r[p] = bool(outcome)
+            return outcome
+        # the outcome is the sign of Z_a, the product of the stabilizers whose destabilizer anticommutes
+        # with it
+        return int(self._stabilizer_product(np.flatnonzero(self.x[:n, a])))
+
+    def expval(self, word):
+        """
+        Compute the expectation value of a Pauli word.
+
+        Args:
+            word (dict): The Pauli word, as ``{qubit: "X" | "Y" | "Z"}``.
+
+        Returns:
+            float: -1, 0 or 1.
+        """
+        n = self.num_qubits
+        xp = np.zeros(n, dtype=bool)
+        zp = np.zeros(n, dtype=bool)
+        for qubit, pauli in word.items():
+            xp[qubit] = pauli in ("X", "Y")
+            zp[qubit] = pauli in ("Y", "Z")
+        anticommutes = ((self.x & zp) ^ (self.z & xp)).sum(axis=1) % 2 == 1
+        if anticommutes[n:].any():
+            return 0.0
+        # the word is the product of the stabilizers whose destabilizer anticommutes with it
+        return -1.0 if self._stabilizer_product(np.flatnonzero(anticommutes[:n])) else 1.0
+
+    def support(self):
+        """
+        Get the computational basis states of the state, which are equally likely: an outcome ``s0`` and
+        the directions ``V`` such that the outcomes are ``s0 + span(V)`` over GF(2).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: ``s0`` and the independent directions, one per row.
+        """
+        n = self.num_qubits
+        collapsed = self.copy()
+        s0 = np.array([collapsed.measure(a) for a in range(n)], dtype=np.uint8)
+        # applying a stabilizer maps an outcome onto the outcome shifted by the X part of the stabilizer
+        directions = self.x[n:].copy()
+        rank = 0
+        for column in range(n):
+            pivots = np.flatnonzero(directions[rank:, column])
+            if len(pivots) == 0:
+                continue
+            pivot = rank + pivots[0]
+            directions[[rank, pivot]] = directions[[pivot, rank]]
+            others = np.flatnonzero(directions[:, column])
+            others = others[others != rank]
+            directions[others] ^= directions[rank]
+            rank += 1
+            if rank == len(directions):
+                break
+        return s0, directions[:rank].astype(np.uint8)
+
+
+class TableauSampler:
+    """
+    Draws shots from a tableau. Stands in for the converter in the :class:`MeasurementPlanner`, so that
+    counts and samples have the formats of the state-vector path.
+
+    Args:
+        tableau (Tableau): The tableau of the final state.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are drawn.
+        rng (np.random.Generator): The random number generator.
+    """
+
+    use_qpu = False
+
+    def __init__(self, tableau, shot_chunk_size=None, rng=None):
+        self.tableau = tableau
+        self.wires = tableau.num_qubits
+        self.shot_chunk_size = shot_chunk_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._support = None
+
+    def remove_readouts(self):
+        pass
+
+    def push_instruction(self, instruction):
+        pass
+
+    def iter_simulated_shots(self, shots):
+        """
+        Sample the tableau in blocks of at most ``shot_chunk_size`` shots.
+
+        Yields:
+            np.ndarray: The bits measured in each block, as an array of shape ``(block_size, num_bits)``.
+        """
+        if self._support is None:
+            self._support = self.tableau.support()
+        s0, directions = self._support
+        chunk_size = self.shot_chunk_size or shots
+        for start in range(0, shots, chunk_size):
+            block_size = min(chunk_size, shots - start)
+            if len(directions) == 0:
+                yield np.tile(s0, (block_size, 1))
+                continue
+            coefficients = self.rng.integers(0, 2, size=(block_size, len(directions)), dtype=np.uint8)
+            # the float product is exact while the number of directions is below 2**24
+            shifts = (coefficients.astype(np.float32) @ directions.astype(np.float32)).astype(np.int64) % 2
+            yield (shifts.astype(np.uint8) ^ s0)
+
+
+class WideSamplePlanner(MeasurementPlanner):
+    """
+    Shares the samples of a tableau between counts and sample measurements when the register has more
+    bits than a packed outcome can hold.
+
+    Counts are accumulated over the distinct rows of bits of each block. Samples are converted from the
+    rows of bits to the decimal format of the narrower registers (e.g. ``101`` for ``"101"``), as Python
+    integers.
+    """
+
+    def collect(self):
+        counts = {id(mp): {} for mp in self.measurements if isinstance(mp, CountsMP)}
+        samples = {
+            id(mp): np.empty(self.shots, dtype=object)
+            for mp in self.measurements
+            if isinstance(mp, SampleMP)
+        }
+        offset = 0
+        for bits in self.converter.iter_simulated_shots(self.shots):
+            for mp in self.measurements:
+                mask = np.zeros(bits.shape[1], dtype=np.uint8)
+                mask[self.readout_wires(mp)] = 1
+                masked = bits & mask
+                if id(mp) in samples:
+                    samples[id(mp)][offset : offset + len(bits)] = decimal_rows(masked)
+                    continue
+                rows, occurrences = np.unique(masked, axis=0, return_counts=True)
+                for row, occurrence in zip(rows, occurrences):
+                    key = (row + ord("0")).tobytes().decode()
+                    counts[id(mp)][key] = counts[id(mp)].get(key, 0) + int(occurrence)
+            offset += len(bits)
+
+        results = dict(samples)
+        for mp in self.measurements:
+            if id(mp) in counts:
+                results[id(mp)] = self.counts_dict(mp, counts[id(mp)])
+        return results
+
+    def counts_dict(self, mp, counts):
+        """
+        Sort the counts of a measurement process by outcome, adding the outcomes that were never measured
+        with ``all_outcomes``, as :meth:`CountsArray.to_dict` does.
+
+        Raises:
+            ValueError: If all the outcomes are requested for more wires than a packed outcome can hold.
+        """
+        if mp.all_outcomes:
+            wires = self.readout_wires(mp)
+            if len(wires) > MAX_PACKED_BITS:
+                raise ValueError(
+                    f"Cannot list all the outcomes of {len(wires)} wires. Use all_outcomes=False."
+                )
+            row = np.zeros(self.converter.wires, dtype=np.uint8)
+            for values in unpack_bits(np.arange(2 ** len(wires)), len(wires)):
+                row[wires] = values
+                counts.setdefault((row + ord("0")).tobytes().decode(), 0)
+        return dict(sorted(counts.items()))
+
+
+def sample_expval(tableau, terms, constant, shots, shot_chunk_size=None, rng=None):
+    """
+    Estimate the expectation value of an observable decomposed into Pauli words from shots, as the
+    state-vector path does: a copy of the tableau is rotated onto the basis of each group of
+    qubit-wise-commuting terms and sampled.
+
+    Args:
+        tableau (Tableau): The tableau of the final state.
+        terms (list[tuple[float, dict]]): The terms of the observable, on wires indexed from 0.
+        constant (float): The coefficient of the identity.
+        shots (int): The number of shots per group.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are drawn.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.float64: The estimate.
+    """
+    value = constant
+    for basis, group_terms in qwc_groups(terms):
+        rotated = tableau.copy()
+        for wire, pauli in basis.items():
+            # Y is measured by applying S^dagger then H
+            if pauli == "Y":
+                rotated.phase(wire, 3)
+            if pauli in ("X", "Y"):
+                rotated.h(wire)
+        total = 0.0
+        for bits in TableauSampler(rotated, shot_chunk_size, rng).iter_simulated_shots(shots):
+            for coeff, word in group_terms:
+                parity = np.bitwise_xor.reduce(bits[:, list(word)], axis=1)
+                total += coeff * np.sum(1.0 - 2.0 * parity)
+        value += total / shots
+    return np.float64(value)
+
+
+def simulate_tableau(tape, wire_map, num_wires, shot_chunk_size=None, rng=None):
+    """
+    Execute a Clifford tape with the stabilizer simulator.
+
+    Args:
+        tape (QuantumTape): A tape accepted by :func:`supports`.
+        wire_map (dict): The 1-based index of each wire label.
+        num_wires (int): The number of qubits.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are drawn.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        The results of the measurements, as returned by :meth:`PennylaneConverter.simulate`. Expectation
+        values are exact without shots, and estimated from shots otherwise.
+    """
+    wire_indices = {label: index - 1 for label, index in wire_map.items()}
+    tableau = Tableau(num_wires)
+    for op in tape.operations:
+        tableau.apply(op.name, [wire_indices[wire] for wire in op.wires], op.parameters)
+
+    measurements = [mp.map_wires(wire_indices) for mp in tape.measurements]
+    exact = tape.shots.total_shots is None
+    shots = tape.shots.total_shots or 1
+    sampler = TableauSampler(tableau, shot_chunk_size, rng)
+    if num_wires <= MAX_PACKED_BITS:
+        planner = MeasurementPlanner(sampler, measurements, shots)
+    else:
+        planner = WideSamplePlanner(sampler, measurements, shots)
+
+    results = []
+    for mp in measurements:
+        if isinstance(mp, ExpectationMP):
+            terms, constant = pauli_terms(mp.obs)
+            if exact:
+                results.append(
+                    np.float64(constant + sum(coeff * tableau.expval(word) for coeff, word in terms))
+                )
+            else:
+                results.append(sample_expval(tableau, terms, constant, shots, shot_chunk_size, rng))
+        else:
+            results.append(planner.result_for(mp))
+    return results[0] if len(results) == 1 else tuple(results)
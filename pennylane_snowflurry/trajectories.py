@@ -0,0 +1,358 @@
+"""
+Contains the noisy simulator of the device, which samples quantum trajectories of state vectors instead of
+evolving a density matrix.
+
+Each trajectory evolves a pure state: a gate applies its matrix, and a noise channel applies one of its
+Kraus operators ``K_i``, drawn with probability ``||K_i |psi>||^2``, before normalizing the state. The
+average over trajectories of any linear function of the state (probabilities, expectation values, reduced
+density matrices) converges to its value on the density matrix, with a standard error decreasing as
+``1 / sqrt(trajectories)``, while the memory stays that of a state vector.
+
+Trajectories are independent, so they are split into chunks run in parallel by the workers of the device,
+each with its own random stream.
+"""
+from collections import namedtuple
+import numpy as np
+import pennylane as qml
+from pennylane.measurements import (
+    CountsMP,
+    DensityMatrixMP,
+    ExpectationMP,
+    ProbabilityMP,
+    SampleMP,
+    VarianceMP,
+)
+from pennylane_snowflurry.measurements.counts_array import unpack_bits
+from pennylane_snowflurry.measurements.marginal import (
+    apply_matrix,
+    diagonal_eigvals,
+    expval_and_variance,
+    marginal_probabilities,
+    probability_tensor,
+    reduced_density_matrix,
+)
+from pennylane_snowflurry.measurements.planner import MeasurementPlanner
+
+# Noise channels simulated by trajectories
+NOISE_CHANNELS = {"DepolarizingChannel", "AmplitudeDamping", "BitFlip"}
+
+# Trajectories of a device with a readout error only
+DEFAULT_TRAJECTORIES = 100
+
+TrajectoryEstimate = namedtuple("TrajectoryEstimate", ["results", "trajectories", "standard_error"])
+TrajectoryEstimate.__doc__ = """The results of a noisy circuit, the number of trajectories they average, and the largest standard error across trajectories of its expectation values and probabilities."""
+
+
+def is_noisy(tape) -> bool:
+    """
+    Check if a tape contains noise channels.
+    """
+    return any(op.name in NOISE_CHANNELS for op in tape.operations)
+
+
+def compile_program(tape, wire_map, num_wires):
+    """
+    Get the matrices applied by the operations of a tape, computed once for all trajectories.
+
+    Args:
+        tape (QuantumTape): The tape.
+        wire_map (dict): The 1-based index of each wire label.
+        num_wires (int): The number of qubits.
+
+    Returns:
+        Tuple[np.ndarray, list[tuple]]: The initial state vector, and for each operation its Kraus
+            operators (its matrix for a gate), its wires and whether it is a channel.
+    """
+    wire_indices = {label: index - 1 for label, index in wire_map.items()}
+    initial = np.zeros(2**num_wires, dtype=complex)
+    initial[0] = 1
+    program = []
+    for i, op in enumerate(tape.operations):
+        if isinstance(op, qml.Snapshot):
+            continue
+        if i == 0 and isinstance(op, qml.operation.StatePrepBase):
+            initial = op.map_wires(wire_indices).state_vector(wire_order=range(num_wires))
+            initial = np.asarray(initial, dtype=complex).reshape(-1)
+            continue
+        wires = [wire_indices[wire] for wire in op.wires]
+        if op.name in NOISE_CHANNELS:
+            program.append((op.kraus_matrices(), wires, True))
+        else:
+            program.append(([qml.matrix(op)], wires, False))
+    return initial, program
+
+
+def run_trajectory(initial, program, num_wires, rng):
+    """
+    Evolve the initial state through one trajectory of a program.
+
+    Returns:
+        np.ndarray: The normalized final state vector.
+    """
+    tensor = initial.reshape((2,) * num_wires)
+    for matrices, wires, channel in program:
+        if not channel:
+            tensor = apply_matrix(tensor, matrices[0], wires)
+            continue
+        # the first Kraus operator whose cumulative probability exceeds a uniform draw is applied, or the
+        # last one with a non-zero probability when rounding leaves the cumulative probability below the draw
+        draw = rng.random()
+        cumulative = 0.0
+        selected = None
+        for matrix in matrices:
+            candidate = apply_matrix(tensor, matrix, wires)
+            probability = np.real(np.vdot(candidate, candidate))
+            if probability <= 0:
+                continue
+            selected = candidate / np.sqrt(probability)
+            cumulative += probability
+            if cumulative >= draw:
+                break
+        tensor = selected
+    return tensor.reshape(-1)
+
+
+def readout_flips(bits, readout_error, rng):
+    """
+    Flip measured bits with the readout error of the device.
+
+    Args:
+        bits (np.ndarray): The measured bits.
+        readout_error (tuple[float, float]): The probabilities of reading 1 for a 0, and 0 for a 1.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: The bits that are read.
+    """
+    p01, p10 = readout_error
+    flip = rng.random(bits.shape) < np.where(bits == 0, p01, p10)
+    return bits ^ flip.astype(bits.dtype)
+
+
+def readout_probabilities(probabilities, num_wires, readout_error):
+    """
+    Apply the readout error of the device to the probabilities of the outcomes of some wires.
+    """
+    p01, p10 = readout_error
+    # column j is the distribution of the bit read for the bit j
+    confusion = np.array([[1 - p01, p10], [p01, 1 - p10]])
+    tensor = probabilities.reshape((2,) * num_wires)
+    for wire in range(num_wires):
+        tensor = apply_matrix(tensor, confusion, [wire])
+    return tensor.reshape(-1)
+
+
+def run_trajectories(initial, program, measurements, num_wires, shots, readout_error, seed):
+    """
+    Run a chunk of trajectories and measure their final states. This is the function run by the workers.
+
+    Args:
+        initial (np.ndarray): The initial state vector.
+        program (list[tuple]): The operations, as returned by :func:`compile_program`.
+        measurements (Sequence[MeasurementProcess]): The measurement processes, on wires indexed from 0.
+        num_wires (int): The number of qubits.
+        shots (Sequence[int]): The number of shots drawn from each trajectory, 0 without shots.
+        readout_error (Optional[tuple[float, float]]): The readout error of the device, applied to the
+            observables of expectation values and variances, which must then be diagonal.
+        seed (np.random.SeedSequence): The seed of the random stream of the chunk.
+
+    Returns:
+        Tuple[dict, np.ndarray]: The value of each state-based measurement on each trajectory (the sum of
+            the reduced density matrices), keyed by the index of the measurement, and the bits of the
+            shots of all trajectories.
+    """
+    rng = np.random.default_rng(seed)
+    values = {i: [] for i, mp in enumerate(measurements) if not isinstance(mp, DensityMatrixMP)}
+    values.update(
+        {i: 0 for i, mp in enumerate(measurements) if isinstance(mp, DensityMatrixMP)}
+    )
+    # the eigenvalues of the observables measured through the readout error
+    eigvals = {}
+    if readout_error is not None:
+        eigvals = {
+            i: diagonal_eigvals(mp.obs)
+            for i, mp in enumerate(measurements)
+            if isinstance(mp, (ExpectationMP, VarianceMP))
+        }
+    bits = []
+    for trajectory_shots in shots:
+        state = run_trajectory(initial, program, num_wires, rng)
+        for i, mp in enumerate(measurements):
+            if isinstance(mp, DensityMatrixMP):
+                values[i] = values[i] + reduced_density_matrix(state, mp.wires.tolist(), num_wires)
+            elif isinstance(mp, ProbabilityMP):
+                values[i].append(
+                    marginal_probabilities(probability_tensor(state, num_wires), mp.wires.tolist())
+                )
+            elif i in eigvals:
+                probabilities = marginal_probabilities(
+                    probability_tensor(state, num_wires), mp.obs.wires.tolist()
+                )
+                probabilities = readout_probabilities(probabilities, len(mp.obs.wires), readout_error)
+                values[i].append((np.dot(probabilities, eigvals[i]), np.dot(probabilities, eigvals[i] ** 2)))
+            elif isinstance(mp, (ExpectationMP, VarianceMP)):
+                expval, variance = expval_and_variance(state, mp.obs, num_wires)
+                # the mean of the square of the observable, for the variance of the mixture
+                values[i].append((expval, variance + expval**2))
+        if trajectory_shots > 0:
+            cumulative = np.cumsum(np.abs(state) ** 2)
+            cumulative /= cumulative[-1]
+            outcomes = np.searchsorted(cumulative, rng.random(trajectory_shots), side="right")
+            outcomes = np.minimum(outcomes, len(state) - 1)
+            trajectory_bits = unpack_bits(outcomes, num_wires).astype(np.uint8)
+            if readout_error is not None:
+                trajectory_bits = readout_flips(trajectory_bits, readout_error, rng)
+            bits.append(trajectory_bits)
+    bits = np.concatenate(bits) if bits else np.zeros((0, num_wires), dtype=np.uint8)
+    return {i: np.asarray(value) for i, value in values.items()}, bits
+
+
+class TrajectorySampler:
+    """
+    Serves the shots of the trajectories. Stands in for the converter in the :class:`MeasurementPlanner`,
+    so that counts and samples have the formats of the state-vector path.
+
+    Args:
+        bits (np.ndarray): The bits of all the shots, of shape ``(shots, num_wires)``.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are served.
+    """
+
+    use_qpu = False
+
+    def __init__(self, bits, shot_chunk_size=None):
+        self.bits = bits
+        self.wires = bits.shape[1]
+        self.shot_chunk_size = shot_chunk_size
+
+    def remove_readouts(self):
+        pass
+
+    def push_instruction(self, instruction):
+        pass
+
+    def iter_simulated_shots(self, shots):
+        chunk_size = self.shot_chunk_size or shots
+        for start in range(0, shots, chunk_size):
+            yield self.bits[start : start + chunk_size]
+
+
+def split(total, parts):
+    """
+    Split a total into a number of nearly equal parts.
+    """
+    sizes = np.full(parts, total // parts, dtype=int)
+    sizes[: total % parts] += 1
+    return sizes
+
+
+def simulate_trajectories(
+    tape,
+    wire_map,
+    num_wires,
+    trajectories,
+    readout_error=None,
+    shot_chunk_size=None,
+    rng=None,
+    pool=None,
+    chunks=1,
+):
+    """
+    Execute a noisy tape by averaging quantum trajectories.
+
+    Expectation values, variances, probabilities and reduced density matrices are averaged over the
+    trajectories. Counts and samples are drawn from the trajectories, the shots being split evenly between
+    them. The readout error flips the bits of counts and samples, and is applied to probabilities and to the
+    outcomes of the observables of expectation values and variances. A tape
+    without noise channels is deterministic, so it is simulated with a single trajectory.
+
+    Args:
+        tape (QuantumTape): The tape.
+        wire_map (dict): The 1-based index of each wire label.
+        num_wires (int): The number of qubits.
+        trajectories (int): The number of trajectories.
+        readout_error (Optional[tuple[float, float]]): The probabilities of reading 1 for a 0, and 0 for a 1.
+        shot_chunk_size (Optional[int]): The size of the blocks in which shots are counted.
+        rng (np.random.Generator): The random number generator.
+        pool (Optional[concurrent.futures.Executor]): The workers running the chunks of trajectories. The
+            chunks are run in this process without workers.
+        chunks (int): The number of chunks in which the trajectories are split.
+
+    Returns:
+        TrajectoryEstimate: The results of the measurements, as returned by
+            :meth:`PennylaneConverter.simulate`, with the convergence of the estimate.
+
+    Raises:
+        ValueError: If the tape measures its state, which is mixed, or with a readout error, an observable
+            that is not diagonal in the computational basis.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    wire_indices = {label: index - 1 for label, index in wire_map.items()}
+    measurements = [mp.map_wires(wire_indices) for mp in tape.measurements]
+    supported = (CountsMP, SampleMP, ProbabilityMP, ExpectationMP, VarianceMP, DensityMatrixMP)
+    for mp in measurements:
+        if not isinstance(mp, supported):
+            raise ValueError(f"Measurement process {mp} is not supported by noisy simulations.")
+        if (
+            readout_error is not None
+            and isinstance(mp, (ExpectationMP, VarianceMP))
+            and diagonal_eigvals(mp.obs) is None
+        ):
+            raise ValueError(
+                f"The readout error cannot be applied to {mp.obs}, which is not diagonal in the "
+                "computational basis."
+            )
+
+    if not is_noisy(tape):
+        trajectories = 1
+    chunks = max(1, min(chunks, trajectories))
+    shots = tape.shots.total_shots
+    sampled = shots is not None and any(isinstance(mp, (CountsMP, SampleMP)) for mp in measurements)
+    trajectory_shots = split(shots, trajectories) if sampled else np.zeros(trajectories, dtype=int)
+    # the order of the trajectories is shuffled, so that the shots of each chunk are spread
+    trajectory_shots = rng.permutation(trajectory_shots)
+
+    initial, program = compile_program(tape, wire_map, num_wires)
+    seeds = np.random.SeedSequence(int(rng.integers(2**63))).spawn(chunks)
+    bounds = np.concatenate([[0], np.cumsum(split(trajectories, chunks))])
+    arguments = [
+        (initial, program, measurements, num_wires, trajectory_shots[start:stop], readout_error, seed)
+        for start, stop, seed in zip(bounds[:-1], bounds[1:], seeds)
+    ]
+    if pool is None:
+        outputs = [run_trajectories(*args) for args in arguments]
+    else:
+        futures = [pool.submit(run_trajectories, *args) for args in arguments]
+        outputs = [future.result() for future in futures]
+
+    bits = np.concatenate([chunk_bits for _, chunk_bits in outputs])
+    # the shots of a trajectory are consecutive, so they are shuffled to be independent
+    bits = bits[rng.permutation(len(bits))]
+    planner = MeasurementPlanner(TrajectorySampler(bits, shot_chunk_size), measurements, len(bits))
+
+    results = []
+    standard_error = 0.0
+    for i, mp in enumerate(measurements):
+        if isinstance(mp, (CountsMP, SampleMP)):
+            results.append(planner.result_for(mp))
+            continue
+        if isinstance(mp, DensityMatrixMP):
+            results.append(sum(values[i] for values, _ in outputs) / trajectories)
+            continue
+        values = np.concatenate([chunk_values[i] for chunk_values, _ in outputs])
+        mean = values.mean(axis=0)
+        if trajectories > 1:
+            errors = values.std(axis=0, ddof=1) / np.sqrt(trajectories)
+            # the error of a variance is that of the expectation value it is computed from
+            errors = errors if isinstance(mp, ProbabilityMP) else errors[:1]
+            standard_error = max(standard_error, float(np.max(errors)))
+        if isinstance(mp, ProbabilityMP):
+            if readout_error is not None:
+                mean = readout_probabilities(mean, len(mp.wires) or num_wires, readout_error)
+            results.append(mean)
+        elif isinstance(mp, ExpectationMP):
+            results.append(np.float64(mean[0]))
+        else:
+            results.append(np.float64(mean[1] - mean[0] ** 2))
+
+    results = results[0] if len(results) == 1 else tuple(results)
+    return TrajectoryEstimate(results, trajectories, standard_error)
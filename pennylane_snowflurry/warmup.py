@@ -0,0 +1,126 @@
+"""
+Contains :class:`JuliaWarmup`, which compiles the Julia methods used by the device in a background Julia
+task, so that the first execution in a fresh process does not pay for their compilation.
+
+Julia compiles a method the first time it is called with new argument types, which costs seconds for
+``simulate``, ``simulate_with_snapshots``, ``get_measurement_probabilities`` and the gate constructors.
+The warm-up calls all of them on a small circuit with every gate of ``SNOWFLURRY_OPERATION_MAP``.
+Compiled methods only depend on the types of their arguments, not on the number of qubits, so the circuit
+has the qubit count of the device up to :data:`MAX_WARMUP_WIRES`.
+
+Julia may only be called from the Python thread that initialized it, so the warm-up is not a Python
+thread: the task is spawned and fetched from the main thread, and runs on another Julia thread when Julia
+is started with several threads (e.g. ``PYTHON_JULIACALL_THREADS=2``). With a single Julia thread, it runs
+when it is fetched.
+"""
+import warnings
+import pennylane as qml
+from pennylane_snowflurry.pennylane_converter import (
+    Snowflurry,
+    SNOWFLURRY_OPERATION_MAP,
+    PRECISIONS,
+)
+
+# Largest register of the warm-up circuit
+MAX_WARMUP_WIRES = 10
+
+
+def warmup_gates(qubit_count):
+    """
+    Get an instruction for every gate of ``SNOWFLURRY_OPERATION_MAP`` that fits in a register.
+
+    Args:
+        qubit_count (int): The number of qubits of the register.
+
+    Returns:
+        list[str]: The Snowflurry instructions, acting on the first qubits of the register.
+    """
+    gates = []
+    for name, gate in SNOWFLURRY_OPERATION_MAP.items():
+        if gate == NotImplementedError:
+            continue
+        op_class = getattr(qml, name)
+        # operators on any number of wires (Identity) act on one wire
+        num_wires = max(op_class.num_wires, 1)
+        if num_wires > qubit_count:
+            continue
+        parameters = [0.5] * op_class.num_params
+        gates.append(gate.format(*parameters, *range(1, num_wires + 1)))
+    return gates
+
+
+def warmup_source(qubit_count, precision="double"):
+    """
+    Get the Julia code calling every method used by the device on a circuit with all the gates.
+
+    Args:
+        qubit_count (int): The number of qubits of the circuit.
+        precision (str): The precision of the device (see ``PRECISIONS``).
+
+    Returns:
+        str: The Julia code.
+    """
+    pushes = "\n".join(f"    push!(c, {gate})" for gate in warmup_gates(qubit_count))
+    element_type, _ = PRECISIONS[precision]
+    return f"""
+let c = QuantumCircuit(qubit_count={qubit_count})
+{pushes}
+    ket = simulate(c)
+    simulate_with_snapshots(c, Int64[1], {element_type})
+    get_measurement_probabilities(ket)
+    for qubit in 1:{qubit_count}
+        push!(c, readout(qubit, qubit))
+    end
+    simulate_with_snapshots(c, Int64[], {element_type})
+    nothing
+end
+"""
+
+
+class JuliaWarmup:
+    """
+    Compiles the Julia methods used by the device in a background Julia task.
+
+    The device waits for the warm-up to finish before its first execution, so that the execution uses the
+    compiled methods instead of compiling them a second time. A warm-up that fails only emits a warning:
+    the methods are then compiled by the first execution, as without warm-up.
+
+    Args:
+        num_wires (int): The number of wires of the device.
+        precision (str): The precision of the device (see ``PRECISIONS``).
+    """
+
+    def __init__(self, num_wires, precision="double"):
+        self.qubit_count = max(1, min(num_wires, MAX_WARMUP_WIRES))
+        self.precision = precision
+        # duration of the warm-up, in seconds
+        self.elapsed = None
+        self._task = None
+
+    def start(self):
+        """Spawn the Julia task of the warm-up. Must be called from the thread that initialized Julia."""
+        source = warmup_source(self.qubit_count, self.precision)
+        # the task returns its duration, measured in Julia
+        self._task = Snowflurry.seval(
+            f"Threads.@spawn begin\n    start = time()\n{source}\n    time() - start\nend"
+        )
+
+    @property
+    def done(self) -> bool:
+        """Whether the warm-up has finished."""
+        return self.elapsed is not None
+
+    def wait(self):
+        """
+        Wait for the warm-up to finish. Must be called from the thread that initialized Julia.
+
+        Returns:
+            float: The duration of the warm-up, in seconds.
+        """
+        if self.elapsed is None:
+            try:
+                self.elapsed = float(Snowflurry.fetch(self._task))
+            except Exception as error:  # pylint: disable=broad-except
+                warnings.warn(f"The Julia warm-up failed: {error}")
+                self.elapsed = 0.0
+        return self.elapsed
@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from pennylane_snowflurry.measurements.adaptive import (
+    adaptive_expval,
+    adaptive_probabilities,
+    neyman_allocation,
+)
+
+
+class MockQPU:
+    """Stands in for a converter sending jobs to the QPU. Outcomes are drawn from the distribution of the
+    basis pushed before the readouts."""
+
+    def __init__(self, distributions, seed=0):
+        self.distributions = distributions
+        self.rng = np.random.default_rng(seed)
+        self.use_qpu = True
+        self.julia_instructions = []
+        self.jobs = []
+
+    def remove_readouts(self):
+        self.julia_instructions = [
+            i for i in self.julia_instructions if not i.startswith("readout")
+        ]
+
+    def push_instruction(self, instruction):
+        self.julia_instructions.append(instruction)
+
+    def truncate_instructions(self, length):
+        del self.julia_instructions[length:]
+
+    def run_job(self, shots, run=0):
+        self.jobs.append((tuple(self.julia_instructions), shots, run))
+        rotated = any(i.startswith("hadamard") for i in self.julia_instructions)
+        outcomes, probabilities = zip(*self.distributions[rotated].items())
+        draws = self.rng.choice(len(outcomes), size=shots, p=probabilities)
+        counts = np.bincount(draws, minlength=len(outcomes))
+        return {outcome: int(n) for outcome, n in zip(outcomes, counts) if n > 0}
+
+
+class TestAdaptive(unittest.TestCase):
+
+    def test_neyman_allocation(self):
+        self.assertEqual(neyman_allocation([3.0, 1.0], 100).tolist(), [75, 25])
+        self.assertEqual(neyman_allocation([0.0, 0.0], 3).sum(), 3)
+
+    def test_expval_stops_at_target(self):
+        # <Z0> = 0 with a variance of 1 per shot, <X0> = 1 exactly
+        qpu = MockQPU({False: {"0": 0.5, "1": 0.5}, True: {"0": 1.0}})
+        terms = [(1.0, {0: "Z"}), (1.0, {0: "X"})]
+        estimate = adaptive_expval(qpu, terms, 0.0, 100_000, target=0.05)
+        self.assertLessEqual(np.sqrt(estimate.variance), 0.05)
+        self.assertLess(estimate.shots, 100_000)
+        self.assertAlmostEqual(estimate.value, 1.0, delta=0.2)
+        # the exact group only gets the pilot round
+        rotated_shots = sum(shots for instructions, shots, _ in qpu.jobs if "hadamard(1)" in instructions)
+        self.assertEqual(rotated_shots, 100)
+        # repeated jobs of the same size are numbered
+        jobs = [(instructions, shots, run) for instructions, shots, run in qpu.jobs]
+        self.assertEqual(len(set(jobs)), len(jobs))
+
+    def test_expval_respects_budget(self):
+        qpu = MockQPU({False: {"0": 0.5, "1": 0.5}, True: {"0": 0.5, "1": 0.5}})
+        estimate = adaptive_expval(qpu, [(1.0, {0: "Z"}), (1.0, {0: "X"})], 0.0, 1000, target=1e-6)
+        self.assertEqual(estimate.shots, 1000)
+
+    def test_probabilities(self):
+        qpu = MockQPU({False: {"00": 0.25, "10": 0.75}})
+        estimate = adaptive_probabilities(qpu, [0], 50_000, target=0.01)
+        self.assertLessEqual(np.sqrt(estimate.variance.max()), 0.01)
+        self.assertTrue(np.allclose(estimate.value, [0.25, 0.75], atol=0.05))
+
+
+if __name__ == "__main__":
+    unittest.main()
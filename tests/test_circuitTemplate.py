@@ -0,0 +1,40 @@
+import unittest
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.circuit_template import CircuitTemplate
+
+
+def shifted_tape(x, y):
+    return QuantumScript(
+        [qml.RX(x, 0), qml.CNOT([0, 1]), qml.RY(y, 1)], [qml.expval(qml.PauliZ(1))]
+    )
+
+
+class TestCircuitTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.wire_map = {0: 1, 1: 2}
+
+    def test_key_ignores_parameters(self):
+        key = CircuitTemplate.key(shifted_tape(0.1, 0.2), self.wire_map)
+        self.assertEqual(key, CircuitTemplate.key(shifted_tape(1.5, -0.2), self.wire_map))
+        other = QuantumScript([qml.RX(0.1, 1)], [qml.state()])
+        self.assertNotEqual(key, CircuitTemplate.key(other, self.wire_map))
+
+    def test_key_rejects_state_preparation(self):
+        tape = QuantumScript([qml.BasisState([1, 0], wires=[0, 1])], [qml.state()])
+        self.assertIsNone(CircuitTemplate.key(tape, self.wire_map))
+
+    def test_source_and_instructions(self):
+        template = CircuitTemplate(shifted_tape(0.1, 0.2), self.wire_map, 2)
+        self.assertEqual(template.num_params, 2)
+        self.assertIn("push!(c, rotation_x(1,p[1]))", template.source)
+        self.assertIn("push!(c, rotation_y(2,p[2]))", template.source)
+        self.assertEqual(
+            template.instructions(CircuitTemplate.parameters(shifted_tape(0.5, 0.25))),
+            ["rotation_x(1,0.5)", "control_x(1,2)", "rotation_y(2,0.25)"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
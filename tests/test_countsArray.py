@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from pennylane_snowflurry.measurements.counts_array import CountsArray, pack_bits, unpack_bits
+
+
+class TestCountsArray(unittest.TestCase):
+
+    def test_pack_and_unpack(self):
+        bits = np.array([[0, 1, 1], [1, 0, 0]])
+        self.assertTrue(np.array_equal(pack_bits(bits), [3, 4]))
+        self.assertTrue(np.array_equal(unpack_bits(pack_bits(bits), 3), bits))
+
+    def test_pack_limit(self):
+        bits = np.ones((1, 63), dtype=np.uint8)
+        self.assertEqual(pack_bits(bits)[0], 2**63 - 1)
+        with self.assertRaises(ValueError):
+            pack_bits(np.ones((1, 64), dtype=np.uint8))
+
+    def test_histogram(self):
+        for num_bits in (3, 20):
+            counts = CountsArray.from_outcomes([5, 1, 5, 5], num_bits)
+            self.assertTrue(np.array_equal(counts.outcomes, [1, 5]))
+            self.assertTrue(np.array_equal(counts.counts, [1, 3]))
+            self.assertEqual(counts.shots, 4)
+
+    def test_merge_and_to_dict(self):
+        first = CountsArray.from_dict({"01": 2, "10": 1})
+        second = CountsArray.from_outcomes([1, 3], 2)
+        self.assertEqual((first + second).to_dict(), {"01": 3, "10": 1, "11": 1})
+        self.assertEqual(
+            CountsArray.concatenate([first, second, second]).to_dict(),
+            {"01": 4, "10": 1, "11": 2},
+        )
+
+    def test_project_and_all_outcomes(self):
+        counts = CountsArray.from_dict({"011": 2, "110": 1})
+        projected = counts.project([1])
+        self.assertEqual(projected.to_dict(), {"010": 3})
+        self.assertEqual(projected.to_dict(all_outcomes=True, bits=[1]), {"000": 0, "010": 3})
+        self.assertEqual(len(counts.to_dict(all_outcomes=True)), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import pennylane as qml
+from pennylane_snowflurry.decomposition_cache import DecompositionCache, cached_decompose
+from pennylane_snowflurry.snowflurry_device import stopping_condition
+
+
+class TestDecompositionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = DecompositionCache(stopping_condition)
+
+    def assertSameOperations(self, first, second):
+        self.assertEqual(len(first), len(second))
+        for op, expected in zip(first, second):
+            self.assertTrue(qml.equal(op, expected), f"{op} != {expected}")
+
+    def test_template_is_reused_on_other_wires(self):
+        first = self.cache.expand(qml.QFT(wires=[0, 1, 2]))
+        second = self.cache.expand(qml.QFT(wires=["a", "b", "c"]))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertTrue(all(stopping_condition(op) for op in first))
+        self.assertSameOperations(
+            second, [op.map_wires({0: "a", 1: "b", 2: "c"}) for op in first]
+        )
+
+    def test_parameters_are_rebound(self):
+        self.cache.expand(qml.IsingXX(0.3, wires=[0, 1]))
+        expansion = self.cache.expand(qml.IsingXX(1.2, wires=[1, 2]))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertSameOperations(
+            expansion, [qml.CNOT([1, 2]), qml.RX(1.2, wires=1), qml.CNOT([1, 2])]
+        )
+
+    def test_derived_parameters_are_not_cached(self):
+        self.cache.expand(qml.CRot(0.1, 0.2, 0.3, wires=[0, 1]))
+        expansion = self.cache.expand(qml.CRot(0.4, 0.5, 0.6, wires=[0, 1]))
+        self.assertEqual(self.cache.hits, 0)
+        self.assertTrue(
+            qml.math.allclose(
+                qml.matrix(qml.tape.QuantumScript(expansion), wire_order=[0, 1]),
+                qml.matrix(qml.CRot(0.4, 0.5, 0.6, wires=[0, 1])),
+            )
+        )
+
+    def test_parameters_choosing_the_decomposition_are_not_cached(self):
+        self.cache.expand(qml.BasisState([1, 0], wires=[0, 1]))
+        expansion = self.cache.expand(qml.BasisState([0, 1], wires=[0, 1]))
+        self.assertEqual(self.cache.hits, 0)
+        self.assertSameOperations(expansion, [qml.PauliX(1)])
+
+    def test_infinite_decomposition(self):
+        class Loop(qml.operation.Operation):
+            num_wires = 1
+
+            def decomposition(self):
+                return [Loop(wires=self.wires)]
+
+        tape = qml.tape.QuantumScript([Loop(wires=0)], [qml.state()])
+        with self.assertRaises(qml.DeviceError):
+            cached_decompose(tape, cache=self.cache)
+
+    def test_statistics(self):
+        self.cache.expand(qml.QFT(wires=[0, 1]))
+        self.cache.expand(qml.QFT(wires=[0, 1]))
+        statistics = self.cache.pop_statistics()
+        self.assertEqual(statistics["decomposition_cache_hits"], 1)
+        self.assertEqual(statistics["decomposition_cache_misses"], 1)
+        self.assertEqual(self.cache.pop_statistics()["decomposition_cache_hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
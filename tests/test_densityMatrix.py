@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+from pennylane_snowflurry.measurements import DensityMatrix, Purity, VnEntropy
+
+
+class TestDensityMatrix(unittest.TestCase):
+    """Compare the reduced-state measurements with 'default.qubit'."""
+
+    def setUp(self):
+        self.ops = [qml.RY(0.8, 0), qml.CNOT([0, 1]), qml.RX(0.3, 2), qml.CNOT([1, 2])]
+        self.dev_pennylane = qml.device("default.qubit", wires=3)
+        tape = QuantumScript(self.ops, [qml.state()])
+        self.converter = PennylaneConverter(tape, wires=3)
+        # reduced density matrices are computed in NumPy from the cached state
+        self.converter._state = qml.execute([tape], self.dev_pennylane)[0]
+
+    def reference(self, mp):
+        return qml.execute([QuantumScript(self.ops, [mp])], self.dev_pennylane)[0]
+
+    def test_strategies(self):
+        mp = qml.density_matrix(wires=[0])
+        self.assertIsInstance(self.converter.get_strategy(mp), DensityMatrix)
+        self.assertIsInstance(self.converter.get_strategy(qml.purity(wires=[0])), Purity)
+        self.assertIsInstance(self.converter.get_strategy(qml.vn_entropy(wires=[0])), VnEntropy)
+
+    def test_density_matrix(self):
+        mp = qml.density_matrix(wires=[2, 0])
+        result = self.converter.measure(mp, 1)
+        self.assertEqual(result.shape, (4, 4))
+        self.assertTrue(np.allclose(result, self.reference(mp)))
+
+    def test_vn_entropy(self):
+        for mp in (qml.vn_entropy(wires=[0]), qml.vn_entropy(wires=[1, 2], log_base=2)):
+            self.assertAlmostEqual(self.converter.measure(mp, 1), self.reference(mp))
+
+    def test_purity(self):
+        mp = qml.purity(wires=[0, 2])
+        self.assertAlmostEqual(self.converter.measure(mp, 1), self.reference(mp))
+        # a pure state
+        self.assertAlmostEqual(self.converter.measure(qml.purity(wires=[0, 1, 2]), 1), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
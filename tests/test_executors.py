@@ -0,0 +1,121 @@
+import os
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry import executors
+from pennylane_snowflurry.executors import (
+    BatchExecutor,
+    MPIBatchExecutor,
+    ProcessPoolBatchExecutor,
+    execute_record,
+    slurm_allocation,
+)
+from pennylane_snowflurry.serialization import serialize_tape
+from pennylane_snowflurry.memory import MemoryBudget
+
+
+class ThreadBatchExecutor(BatchExecutor):
+    def create_pool(self):
+        return ThreadPoolExecutor(max_workers=2)
+
+
+def fake_execute_record(record, options, seed=None):
+    return (record["gates"], options["shot_chunk_size"])
+
+
+def seeded_execute_record(record, options, seed=None):
+    return np.random.default_rng(seed).integers(2**32)
+
+
+class TestExecutors(unittest.TestCase):
+
+    def test_slurm_allocation(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(slurm_allocation(), {})
+        env = {"SLURM_JOB_ID": "42", "SLURM_JOB_NUM_NODES": "2", "SLURM_NTASKS": "8"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            self.assertEqual(slurm_allocation()["nodes"], 2)
+            self.assertEqual(MPIBatchExecutor().max_workers, 7)
+
+    def test_results_in_order(self):
+        tapes = [
+            QuantumScript([qml.Hadamard(0)], [qml.state()]),
+            QuantumScript([qml.PauliX(1)], [qml.state()]),
+            QuantumScript([qml.CNOT([0, 1])], [qml.state()]),
+        ]
+        executor = ThreadBatchExecutor()
+        budget = MemoryBudget(100)
+        with mock.patch.object(executors, "execute_record", fake_execute_record):
+            results = executor.map(
+                tapes, {"shot_chunk_size": 10}, registers=[[0, 1]] * 3, memory_budget=budget, peaks=[60, 60, 60]
+            )
+        executor.shutdown()
+        self.assertEqual([gates for gates, _ in results], [["Hadamard"], ["PauliX"], ["CNOT"]])
+        self.assertEqual(budget.reserved, 0)
+
+    def test_seeds_reach_the_workers(self):
+        tapes = [QuantumScript([qml.Hadamard(0)], [qml.sample()], shots=10)] * 2
+        executor = ThreadBatchExecutor()
+        with mock.patch.object(executors, "execute_record", seeded_execute_record):
+            runs = [
+                executor.map(tapes, {}, seeds=np.random.SeedSequence(7).spawn(2)) for _ in range(2)
+            ]
+        executor.shutdown()
+        self.assertEqual(runs[0], runs[1])
+        self.assertNotEqual(runs[0][0], runs[0][1])
+
+    def test_pool_is_created_by_subclasses(self):
+        with self.assertRaises(TypeError):
+            BatchExecutor()
+
+    def test_workers_are_spawned(self):
+        executor = ProcessPoolBatchExecutor(1)
+        pool = executor.create_pool()
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+        pool.shutdown()
+
+
+class TestWorkerRoundTrip(unittest.TestCase):
+    """Execute serialized circuits with Snowflurry, as the workers do, and compare with 'default.qubit'."""
+
+    def setUp(self):
+        self.tape = QuantumScript(
+            [qml.Hadamard(0), qml.CNOT([0, 1]), qml.RY(0.3, 1)],
+            [qml.expval(qml.PauliZ(1)), qml.probs(wires=[0, 1])],
+        )
+        self.expected = qml.execute([self.tape], qml.device("default.qubit", wires=2))[0]
+
+    def test_execute_record(self):
+        record = serialize_tape(self.tape, wires=[0, 1])
+        result = execute_record(record, {"shot_chunk_size": None})
+        for value, expected in zip(result, self.expected):
+            self.assertTrue(np.allclose(value, expected))
+
+    def test_process_pool(self):
+        executor = ProcessPoolBatchExecutor(1)
+        try:
+            (result,) = executor.map([self.tape], {"shot_chunk_size": None}, registers=[[0, 1]])
+        finally:
+            executor.shutdown()
+        for value, expected in zip(result, self.expected):
+            self.assertTrue(np.allclose(value, expected))
+
+    def test_seeded_samples(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.sample()], shots=100)
+        executor = ProcessPoolBatchExecutor(2)
+        try:
+            runs = [
+                executor.map([tape, tape], {"shot_chunk_size": None}, seeds=np.random.SeedSequence(7).spawn(2))
+                for _ in range(2)
+            ]
+        finally:
+            executor.shutdown()
+        for first, second in zip(*runs):
+            np.testing.assert_array_equal(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane_snowflurry.pennylane_converter import Snowflurry
+
+
+class TestSimulateWithSnapshots(unittest.TestCase):
+    """Run simulate_with_snapshots in Julia, against Snowflurry.simulate and 'default.qubit'."""
+
+    def setUp(self):
+        Snowflurry.seval(
+            """
+            helper_circuit = QuantumCircuit(qubit_count=2)
+            push!(helper_circuit, hadamard(1))
+            push!(helper_circuit, control_x(1, 2))
+            push!(helper_circuit, readout(2, 1))
+            """
+        )
+
+    def test_snapshots_and_final_state(self):
+        cuts = np.array([0, 1], dtype=np.int64)
+        snapshots, ket = Snowflurry.simulate_with_snapshots(Snowflurry.helper_circuit, cuts)
+        Snowflurry.seval(
+            """
+            hadamard_circuit = QuantumCircuit(qubit_count=2)
+            push!(hadamard_circuit, hadamard(1))
+            """
+        )
+        expected = [
+            np.array(Snowflurry.seval("Ket([1, 0, 0, 0])").data),
+            np.array(Snowflurry.simulate(Snowflurry.hadamard_circuit).data),
+        ]
+        self.assertEqual(len(snapshots), 2)
+        for snapshot, state in zip(snapshots, expected):
+            np.testing.assert_allclose(np.array(snapshot.data), state)
+        # the readout is skipped
+        Snowflurry.seval("pop!(helper_circuit)")
+        np.testing.assert_allclose(
+            np.array(ket.data), np.array(Snowflurry.simulate(Snowflurry.helper_circuit).data)
+        )
+
+    def test_single_precision(self):
+        _, ket = Snowflurry.simulate_with_snapshots(
+            Snowflurry.helper_circuit, np.zeros(0, dtype=np.int64), Snowflurry.seval("ComplexF32")
+        )
+        state = np.array(ket.data)
+        self.assertEqual(state.dtype, np.complex64)
+        np.testing.assert_allclose(state, [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)], atol=1e-6)
+
+    def test_device_snapshots(self):
+        def circuit():
+            qml.Hadamard(0)
+            qml.Snapshot("h")
+            qml.CNOT([0, 1])
+            qml.RY(0.4, 1)
+            return qml.state()
+
+        dev_snowflurry = qml.device("snowflurry.qubit", wires=2, precision="single")
+        dev_pennylane = qml.device("default.qubit", wires=2)
+        r_s = qml.snapshots(qml.QNode(circuit, dev_snowflurry))()
+        r_p = qml.snapshots(qml.QNode(circuit, dev_pennylane))()
+        np.testing.assert_allclose(r_s["h"], r_p["h"], atol=1e-6)
+        np.testing.assert_allclose(r_s["execution_results"], r_p["execution_results"], atol=1e-6)
+
+
+class TestPlaceCircuit(unittest.TestCase):
+    """Run place_circuit in Julia, against the same circuit written on the physical qubits."""
+
+    def test_placed_circuit(self):
+        Snowflurry.seval(
+            """
+            logical_circuit = QuantumCircuit(qubit_count=2, bit_count=2)
+            push!(logical_circuit, sigma_x(1))
+            push!(logical_circuit, control_x(1, 2))
+            push!(logical_circuit, readout(1, 1))
+            push!(logical_circuit, readout(2, 2))
+            physical_circuit = QuantumCircuit(qubit_count=4, bit_count=2)
+            push!(physical_circuit, sigma_x(4))
+            push!(physical_circuit, control_x(4, 2))
+            push!(physical_circuit, readout(4, 1))
+            push!(physical_circuit, readout(2, 2))
+            """
+        )
+        placed = Snowflurry.place_circuit(
+            Snowflurry.logical_circuit,
+            np.array([1, 2], dtype=np.int64),
+            np.array([4, 2], dtype=np.int64),
+            4,
+        )
+        self.assertEqual(Snowflurry.get_num_qubits(placed), 4)
+        self.assertEqual(Snowflurry.get_num_bits(placed), 2)
+        # the readouts keep their destination bits
+        readouts = list(placed.instructions)[2:]
+        self.assertEqual([r.connected_qubit for r in readouts], [4, 2])
+        self.assertEqual([r.destination_bit for r in readouts], [1, 2])
+        Snowflurry.placed_circuit = placed
+        Snowflurry.seval(
+            """
+            for circuit in (placed_circuit, physical_circuit)
+                pop!(circuit)
+                pop!(circuit)
+            end
+            """
+        )
+        np.testing.assert_allclose(
+            np.array(Snowflurry.simulate(Snowflurry.placed_circuit).data),
+            np.array(Snowflurry.simulate(Snowflurry.physical_circuit).data),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
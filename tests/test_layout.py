@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.layout import (
+    CouplingMap,
+    LayoutSelector,
+    export_coupling_map,
+    interactions,
+    swap_count,
+)
+
+
+class TestLayout(unittest.TestCase):
+
+    def setUp(self):
+        # 1 - 2 - 3 - 4 - 5
+        self.line = CouplingMap(5, [[1, 2], [2, 3], [3, 4], [4, 5]], "line")
+
+    def test_load_shipped_map(self):
+        coupling_map = CouplingMap.load("grid_6x4")
+        self.assertEqual(coupling_map.num_qubits, 24)
+        self.assertEqual(coupling_map.distances[1, 2], 1)
+        with self.assertRaises(ValueError):
+            CouplingMap.load("unknown")
+
+    def test_distances(self):
+        self.assertEqual(self.line.distances[1, 5], 4)
+        self.assertEqual(swap_count({1: 1, 2: 5}, [(1, 2)], self.line), 3)
+
+    def test_interactions(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 2]), qml.Toffoli([0, 1, 2])], [])
+        wire_map = {0: 1, 1: 2, 2: 3}
+        self.assertEqual(interactions(tape, wire_map), [(1, 3), (1, 2), (1, 3), (2, 3)])
+
+    def test_trivial_layout_is_kept(self):
+        tape = QuantumScript([qml.CNOT([0, 1]), qml.CNOT([1, 2])], [qml.counts()])
+        layout = LayoutSelector(self.line).select(tape, {0: 1, 1: 2, 2: 3})
+        self.assertEqual(layout.mapping, {1: 1, 2: 2, 3: 3})
+        self.assertEqual(layout.swaps, 0)
+
+    def test_layout_saves_swaps(self):
+        # logical qubit 1 interacts with all the others, so it is placed in the middle of the line
+        tape = QuantumScript(
+            [qml.CNOT([0, 1]), qml.CNOT([0, 2]), qml.CNOT([0, 1]), qml.CNOT([0, 2])], [qml.counts()]
+        )
+        selector = LayoutSelector(self.line)
+        layout = selector.select(tape, {0: 1, 1: 2, 2: 3})
+        self.assertEqual(layout.trivial_swaps, 2)
+        self.assertEqual(layout.swaps, 0)
+        self.assertEqual(sorted(layout.mapping), [1, 2, 3])
+        # the layout is cached per structure
+        self.assertIs(selector.select(tape.copy(), {0: 1, 1: 2, 2: 3}), layout)
+
+    def test_too_many_qubits(self):
+        tape = QuantumScript([qml.CNOT([0, 5])], [qml.counts()])
+        with self.assertRaises(ValueError):
+            LayoutSelector(self.line).select(tape, {wire: wire + 1 for wire in range(6)})
+
+    def test_export_coupling_map(self):
+        with tempfile.TemporaryDirectory() as directory, patch(
+            "pennylane_snowflurry.pennylane_converter.Snowflurry"
+        ) as snowflurry:
+            snowflurry.seval.return_value = {1: [2], 2: [1, 3], 3: [2]}
+            path = os.path.join(directory, "line.json")
+            coupling_map = export_coupling_map(path, "LineConnectivity(3)", "line")
+            with open(path) as file:
+                self.assertEqual(json.load(file)["edges"], [[1, 2], [2, 3]])
+        self.assertEqual(coupling_map.distances[1, 3], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.light_cone import light_cone
+
+
+class TestLightCone(unittest.TestCase):
+
+    def test_gates_outside_the_cone_are_removed(self):
+        tape = QuantumScript(
+            [qml.Hadamard(0), qml.CNOT([0, 1]), qml.RX(0.5, 4), qml.CNOT([2, 3]), qml.RY(0.1, 1)],
+            [qml.expval(qml.PauliZ(1))],
+        )
+        pruned, labels = light_cone(tape, range(6))
+        self.assertEqual([op.name for op in pruned.operations], ["Hadamard", "CNOT", "RY"])
+        self.assertEqual(labels, [0, 1])
+
+    def test_later_gates_do_not_widen_the_cone(self):
+        # the CNOT acts on wire 0 after the last gate on wire 1 that matters
+        tape = QuantumScript(
+            [qml.RX(0.5, 1), qml.CNOT([0, 2])], [qml.probs(wires=[1])]
+        )
+        pruned, labels = light_cone(tape, ["a", 0, 1, 2])
+        self.assertEqual([op.name for op in pruned.operations], ["RX"])
+        self.assertEqual(labels, [1])
+
+    def test_density_matrix_of_some_wires(self):
+        tape = QuantumScript(
+            [qml.Hadamard(0), qml.CNOT([0, 1]), qml.RX(0.5, 2)], [qml.density_matrix(wires=[1])]
+        )
+        pruned, labels = light_cone(tape, range(3))
+        self.assertEqual([op.name for op in pruned.operations], ["Hadamard", "CNOT"])
+        self.assertEqual(labels, [0, 1])
+
+    def test_whole_register_measurements_are_not_pruned(self):
+        for mp in (qml.state(), qml.counts(), qml.sample(qml.PauliZ(0)), qml.probs()):
+            tape = QuantumScript([qml.Hadamard(0)], [mp])
+            self.assertIsNone(light_cone(tape, range(3)))
+
+    def test_nothing_to_prune(self):
+        tape = QuantumScript([qml.CNOT([0, 1])], [qml.expval(qml.PauliZ(1))])
+        self.assertIsNone(light_cone(tape, [0, 1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import numpy as np
+import scipy.sparse
+import pennylane as qml
+from pennylane_snowflurry.measurements.marginal import (
+    probability_tensor,
+    marginal_probabilities,
+    expval_and_variance,
+    reduced_density_matrix,
+)
+from pennylane_snowflurry.measurements.sparse import SparseObservableCache
+
+
+class TestMarginal(unittest.TestCase):
+    """Compare the NumPy marginalization engine with 'default.qubit'."""
+
+    def setUp(self):
+        self.dev_pennylane = qml.device("default.qubit", wires=3)
+        self.ops = [
+            qml.RX(0.3, 0),
+            qml.RY(1.1, 1),
+            qml.CNOT([0, 1]),
+            qml.RX(0.7, 2),
+            qml.CNOT([1, 2]),
+            qml.RY(-0.4, 0),
+        ]
+
+        @qml.qnode(self.dev_pennylane)
+        def circuit_state():
+            for op in self.ops:
+                qml.apply(op)
+            return qml.state()
+
+        self.state = np.array(circuit_state())
+
+    def test_marginal_probabilities(self):
+        for wires in ([0], [2, 0], [1, 2, 0], []):
+
+            @qml.qnode(self.dev_pennylane)
+            def circuit_probs():
+                for op in self.ops:
+                    qml.apply(op)
+                return qml.probs(wires=wires or None)
+
+            result = marginal_probabilities(probability_tensor(self.state, 3), wires)
+            self.assertTrue(np.allclose(result, circuit_probs()))
+
+    def test_reduced_density_matrix(self):
+        for wires in ([0], [2, 0], [1, 2, 0]):
+
+            @qml.qnode(self.dev_pennylane)
+            def circuit_density_matrix():
+                for op in self.ops:
+                    qml.apply(op)
+                return qml.density_matrix(wires=wires)
+
+            result = reduced_density_matrix(self.state, wires, 3)
+            self.assertTrue(np.allclose(result, circuit_density_matrix()))
+
+    def test_expval_and_variance(self):
+        observables = [
+            qml.PauliZ(0),
+            qml.PauliY(1) @ qml.PauliX(2),
+            qml.Hamiltonian([0.3, -1.2], [qml.PauliZ(0) @ qml.PauliZ(2), qml.PauliX(1)]),
+            qml.Hermitian(np.array([[1, 1j], [-1j, 2]]), wires=1),
+            qml.Hadamard(2),
+        ]
+        for obs in observables:
+
+            @qml.qnode(self.dev_pennylane)
+            def circuit_var():
+                for op in self.ops:
+                    qml.apply(op)
+                return qml.expval(obs), qml.var(obs)
+
+            self.assertTrue(
+                np.allclose(expval_and_variance(self.state, obs, 3), circuit_var())
+            )
+
+    def test_observables_without_pauli_terms(self):
+        hamiltonian = scipy.sparse.random(4, 4, density=0.5, random_state=0)
+        hamiltonian = scipy.sparse.csr_matrix(hamiltonian + hamiltonian.T)
+        hermitian = np.array([[1, 1j, 0, 0], [-1j, 2, 0, 0], [0, 0, 0, 1], [0, 0, 1, 3]])
+        observables = [
+            qml.SparseHamiltonian(hamiltonian, wires=[2, 0]),
+            qml.Projector([1, 0], wires=[0, 2]),
+            qml.Hermitian(hermitian, wires=[2, 1]),
+            qml.PauliX(0) @ qml.Hermitian(hermitian, wires=[1, 2]),
+            0.5 * qml.Projector([1], wires=[1]) + qml.PauliZ(2),
+        ]
+        cache = SparseObservableCache()
+        for obs in observables:
+            # default.qubit has no variance of sparse Hamiltonians, so they are compared with dense matrices
+            matrix = qml.matrix(obs, wire_order=range(3))
+            expval = np.real(np.vdot(self.state, matrix @ self.state))
+            variance = np.real(np.vdot(self.state, matrix @ matrix @ self.state)) - expval**2
+            self.assertTrue(
+                np.allclose(expval_and_variance(self.state, obs, 3, cache), (expval, variance))
+            )
+        # the expectation value and the variance share the matrix of the sparse Hamiltonian
+        self.assertEqual((cache.misses, cache.hits), (1, 0))
+        expval_and_variance(self.state, observables[0], 3, cache)
+        self.assertEqual(cache.hits, 1)
+
+    def test_sparse_hamiltonians_with_the_same_pattern(self):
+        cache = SparseObservableCache()
+        diagonal = np.arange(8, dtype=float)
+        for entry in (3.0, 3.5):
+            diagonal[4] = entry
+            obs = qml.SparseHamiltonian(scipy.sparse.diags(diagonal, format="csr"), wires=range(3))
+            expval = np.real(np.vdot(self.state, diagonal * self.state))
+            self.assertAlmostEqual(expval_and_variance(self.state, obs, 3, cache)[0], expval)
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane_snowflurry.measurements import MeasurementPlanner
+
+
+class FakeConverter:
+    """Stands in for PennylaneConverter and records how many times shots are drawn."""
+
+    def __init__(self, wires, samples, shot_chunk_size=None):
+        self.wires = wires
+        self.use_qpu = False
+        self.samples = samples
+        self.shot_chunk_size = shot_chunk_size
+        self.instructions = []
+        self.draws = []
+
+    def remove_readouts(self):
+        self.instructions = []
+
+    def push_instruction(self, instruction):
+        self.instructions.append(instruction)
+
+    def iter_simulated_shots(self, shots):
+        chunk_size = self.shot_chunk_size or shots
+        for start in range(0, shots, chunk_size):
+            block = self.samples[start : min(start + chunk_size, shots)]
+            self.draws.append(len(block))
+            yield np.array([[int(bit) for bit in bits] for bits in block])
+
+
+class TestMeasurementPlanner(unittest.TestCase):
+
+    def test_shots_are_drawn_once(self):
+        converter = FakeConverter(2, ["01", "11", "10", "00"])
+        counts = qml.counts(qml.PauliZ(0))
+        sample = qml.sample(qml.PauliZ(1))
+        planner = MeasurementPlanner(converter, [counts, sample, qml.expval(qml.PauliZ(0))], 4)
+
+        self.assertEqual(planner.wires, [0, 1])
+        self.assertEqual(planner.result_for(counts), {"00": 2, "10": 2})
+        self.assertTrue(np.array_equal(planner.result_for(sample), [1, 1, 0, 0]))
+        self.assertEqual(converter.draws, [4])
+        self.assertEqual(converter.instructions, ["readout(1, 1)", "readout(2, 2)"])
+
+    def test_shots_are_drawn_in_blocks(self):
+        converter = FakeConverter(2, ["01", "11", "10", "00", "11"], shot_chunk_size=2)
+        counts = qml.counts()
+        sample = qml.sample()
+        planner = MeasurementPlanner(converter, [counts, sample], 5)
+
+        self.assertEqual(planner.result_for(counts), {"01": 1, "11": 2, "10": 1, "00": 1})
+        self.assertTrue(np.array_equal(planner.result_for(sample), [1, 11, 10, 0, 11]))
+        self.assertEqual(converter.draws, [2, 2, 1])
+
+    def test_all_outcomes(self):
+        converter = FakeConverter(2, ["01", "11", "11"])
+        counts = qml.counts(qml.PauliZ(1), all_outcomes=True)
+        planner = MeasurementPlanner(converter, [counts], 3)
+        self.assertEqual(planner.result_for(counts), {"00": 0, "01": 3})
+
+    def test_wide_samples(self):
+        for num_bits in (19, 20, 63):
+            converter = FakeConverter(num_bits, ["1" * num_bits, "0" * (num_bits - 1) + "1"])
+            sample = qml.sample()
+            planner = MeasurementPlanner(converter, [sample], 2)
+            self.assertEqual(list(planner.result_for(sample)), [int("1" * num_bits), 1])
+
+    def test_covers(self):
+        converter = FakeConverter(1, ["0", "1"])
+        counts = qml.counts()
+        planner = MeasurementPlanner(converter, [counts], 2)
+        self.assertTrue(planner.covers(counts, 2))
+        self.assertFalse(planner.covers(counts, 3))
+        self.assertFalse(planner.covers(qml.counts(), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
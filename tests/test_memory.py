@@ -0,0 +1,69 @@
+import sys
+import threading
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane_snowflurry.memory import MemoryBudget, estimate_peak_memory, parse_memory
+from pennylane_snowflurry.measurements.planner import decimal_rows
+
+
+class TestMemory(unittest.TestCase):
+
+    def test_parse_memory(self):
+        self.assertEqual(parse_memory(1024), 1024)
+        self.assertEqual(parse_memory("2KiB"), 2048)
+        self.assertEqual(parse_memory("1.5 GB"), 1_500_000_000)
+        with self.assertRaises(ValueError):
+            parse_memory("lots")
+
+    def test_state_estimate(self):
+        estimate = estimate_peak_memory([qml.state()], 10)
+        # the Julia state, its NumPy copy and the returned copy
+        self.assertEqual(estimate.peak, 3 * 16 * 2**10)
+        self.assertEqual(estimate.samples, 0)
+
+    def test_memmap_state_estimate(self):
+        estimate = estimate_peak_memory([qml.state()], 10, memmap_states=True)
+        # only the Julia state, streamed to the file
+        self.assertEqual(estimate.peak, 16 * 2**10)
+
+    def test_qpu_counts_do_not_simulate(self):
+        estimate = estimate_peak_memory([qml.counts()], 30, shots=1000, use_qpu=True)
+        self.assertEqual(estimate.state, 0)
+        self.assertEqual(estimate.probabilities, 0)
+
+    def test_shot_chunks_bound_samples(self):
+        full = estimate_peak_memory([qml.counts()], 4, shots=100_000)
+        chunked = estimate_peak_memory([qml.counts()], 4, shots=100_000, shot_chunk_size=1000)
+        self.assertLess(chunked.samples, full.samples)
+
+    def test_wide_samples_are_python_integers(self):
+        narrow = estimate_peak_memory([qml.sample()], 19, shots=1000)
+        wide = estimate_peak_memory([qml.sample()], 40, shots=1000)
+        samples = decimal_rows(np.ones((1000, 40), dtype=np.uint8))
+        self.assertGreaterEqual(wide.samples, samples.nbytes + sum(sys.getsizeof(s) for s in samples))
+        self.assertGreater(wide.samples / 40, narrow.samples / 19)
+
+    def test_budget_refuses_and_throttles(self):
+        budget = MemoryBudget(100)
+        with self.assertRaises(MemoryError):
+            budget.check(101)
+
+        order = []
+
+        def second():
+            with budget.reserve(60):
+                order.append("second")
+
+        with budget.reserve(60):
+            thread = threading.Thread(target=second)
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual(order, [])
+            order.append("first")
+        thread.join(1)
+        self.assertEqual(order, ["first", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane_snowflurry.measurements.pauli_grouping import (
+    pauli_terms,
+    qwc_groups,
+    squared_terms,
+    group_estimate,
+    basis_rotations,
+)
+from pennylane_snowflurry.measurements.counts_array import CountsArray
+from pennylane_snowflurry.measurements.variance import Variance
+
+
+class PlusStateQPU:
+    """Stands in for a converter sending jobs to the QPU, with the circuit preparing |+> on wire 0."""
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.use_qpu = True
+        self.shot_based = True
+        self.julia_instructions = []
+        self.jobs = []
+
+    def remove_readouts(self):
+        self.julia_instructions = [
+            i for i in self.julia_instructions if not i.startswith("readout")
+        ]
+
+    def push_instruction(self, instruction):
+        self.julia_instructions.append(instruction)
+
+    def truncate_instructions(self, length):
+        del self.julia_instructions[length:]
+
+    def run_job(self, shots, run=0):
+        self.jobs.append(tuple(self.julia_instructions))
+        # the X basis rotation takes |+> to |0>
+        if any(i.startswith("hadamard") for i in self.julia_instructions):
+            return {"0": shots}
+        ones = int(self.rng.binomial(shots, 0.5))
+        return {"0": shots - ones, "1": ones}
+
+
+class TestPauliGrouping(unittest.TestCase):
+
+    def test_pauli_terms(self):
+        H = qml.Hamiltonian(
+            [0.5, -1.0, 2.0],
+            [qml.Identity(0), qml.PauliZ(0) @ qml.PauliZ(1), qml.PauliX(1)],
+        )
+        terms, constant = pauli_terms(H)
+        self.assertAlmostEqual(constant, 0.5)
+        self.assertEqual(sorted(terms, key=lambda t: t[0]), [(-1.0, {0: "Z", 1: "Z"}), (2.0, {1: "X"})])
+
+    def test_squared_terms(self):
+        # (X0 + Z0 + Z1)^2 = 3 + 2 Z0 Z1 + 2 X0 Z1, the anticommuting X0 Z0 + Z0 X0 cancelling
+        terms, constant = squared_terms(qml.PauliX(0) + qml.PauliZ(0) + qml.PauliZ(1))
+        self.assertAlmostEqual(constant, 3.0)
+        self.assertEqual(
+            sorted(terms, key=lambda t: sorted(t[1].items())),
+            [(2.0, {0: "X", 1: "Z"}), (2.0, {0: "Z", 1: "Z"})],
+        )
+
+    def test_qwc_groups(self):
+        terms = [
+            (1.0, {0: "Z", 1: "Z"}),
+            (0.5, {0: "Z"}),
+            (0.25, {1: "X"}),
+            (0.1, {0: "Y", 1: "X"}),
+        ]
+        groups = qwc_groups(terms)
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups[0][0], {0: "Z", 1: "Z"})
+        self.assertEqual(groups[1][0], {0: "Y", 1: "X"})
+        self.assertEqual(sum(len(group_terms) for _, group_terms in groups), len(terms))
+
+    def test_group_estimate(self):
+        # <Z0 Z1> = 1 for the Bell state, <Z0> = 0
+        counts = CountsArray.from_dict({"00": 50, "11": 50})
+        estimate = group_estimate(counts, [(2.0, {0: "Z", 1: "Z"}), (1.0, {0: "Z"})])
+        self.assertAlmostEqual(estimate.value, 2.0)
+        self.assertEqual(estimate.shots, 100)
+        self.assertAlmostEqual(estimate.variance, 1.0 * 100 / 99 / 100)
+
+    def test_basis_rotations(self):
+        self.assertEqual(basis_rotations({0: "Z"}), [])
+        self.assertEqual(
+            basis_rotations({1: "Y", 0: "X"}),
+            ["hadamard(1)", "phase_shift(2,-1.5707963267948966)", "hadamard(2)"],
+        )
+
+    def test_variance_of_several_groups(self):
+        # for |+>, H = X0 + Z0 has <H> = 1 and <H^2> = 2, so its variance is 1
+        qpu = PlusStateQPU()
+        variance = Variance().measure(qpu, qml.var(qml.PauliX(0) + qml.PauliZ(0)), 10_000)
+        self.assertAlmostEqual(variance, 1.0, delta=0.1)
+        self.assertNotEqual(variance, 1.0)
+        # one job per group of H, and none for the constant H^2
+        self.assertEqual(len(qpu.jobs), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+from pennylane_snowflurry.measurements import ExpectationValue
+from pennylane_snowflurry.measurements.marginal import apply_observable
+
+
+def bell_state():
+    return np.array([1, 0, 0, 1], dtype=np.complex64) / np.sqrt(2)
+
+
+class TestSinglePrecision(unittest.TestCase):
+
+    def converter(self, tape):
+        converter = PennylaneConverter(
+            tape, wires=2, precision="single", rng=np.random.default_rng(0)
+        )
+        converter.convert_circuit(tape)
+        # the single-precision simulation runs in Julia in test_juliaHelpers
+        converter._state = bell_state()
+        converter._state_gates = converter.gate_count()
+        return converter
+
+    def test_unknown_precision(self):
+        with self.assertRaises(ValueError):
+            PennylaneConverter(QuantumScript([], [qml.state()]), wires=1, precision="half")
+
+    def test_sample_state(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.counts()], shots=1000)
+        converter = self.converter(tape)
+        converter.shot_chunk_size = 300
+        blocks = list(converter.iter_simulated_shots(1000))
+        self.assertEqual([len(block) for block in blocks], [300, 300, 300, 100])
+        bits = np.concatenate(blocks)
+        # only |00> and |11> are sampled
+        self.assertTrue(np.all(bits[:, 0] == bits[:, 1]))
+        self.assertTrue(300 < bits[:, 0].sum() < 700)
+
+    def test_blocks_share_one_simulation(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.counts()], shots=1000)
+        converter = PennylaneConverter(tape, wires=2, rng=np.random.default_rng(0))
+        converter.convert_circuit(tape)
+        converter.shot_chunk_size = 300
+        with mock.patch("pennylane_snowflurry.pennylane_converter.Snowflurry") as snowflurry:
+            snowflurry.simulate_with_snapshots.return_value = (None, mock.Mock(data=bell_state()))
+            bits = np.concatenate(list(converter.iter_simulated_shots(1000)))
+        snowflurry.simulate_with_snapshots.assert_called_once()
+        snowflurry.simulate_shots.assert_not_called()
+        self.assertEqual(len(bits), 1000)
+        self.assertTrue(np.all(bits[:, 0] == bits[:, 1]))
+
+    def test_sampled_state_is_kept(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.counts(), qml.probs()], shots=100)
+        converter = PennylaneConverter(tape, wires=2, rng=np.random.default_rng(0))
+        converter.convert_circuit(tape)
+        with mock.patch("pennylane_snowflurry.pennylane_converter.Snowflurry") as snowflurry:
+            snowflurry.simulate_with_snapshots.return_value = (None, mock.Mock(data=bell_state()))
+            list(converter.iter_simulated_shots(100))
+            state = converter.get_state()
+            # a basis rotation changes the sampled state, which is not kept
+            converter.push_instruction("hadamard(1)")
+            list(converter.iter_simulated_shots(100))
+        self.assertEqual(snowflurry.simulate_with_snapshots.call_count, 2)
+        snowflurry.simulate.assert_not_called()
+        self.assertIs(converter.get_state(), state)
+
+    def test_expval_from_state(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.expval(qml.PauliX(0))])
+        converter = self.converter(tape)
+        mp = qml.expval(qml.PauliX(0) @ qml.PauliX(1))
+        self.assertAlmostEqual(ExpectationValue().measure(converter, mp, 1), 1.0, places=6)
+
+    def test_double_precision_expval_uses_cached_state(self):
+        tape = QuantumScript([qml.Hadamard(0), qml.CNOT([0, 1])], [qml.expval(qml.PauliZ(0))])
+        converter = PennylaneConverter(tape, wires=2)
+        converter._state = bell_state().astype(np.complex128)
+        with mock.patch.object(converter, "simulate_state") as simulate_state:
+            mp = qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
+            self.assertAlmostEqual(ExpectationValue().measure(converter, mp, None), 1.0)
+        simulate_state.assert_not_called()
+
+    def test_observable_keeps_precision(self):
+        state = bell_state()
+        self.assertEqual(apply_observable(state, qml.PauliY(0), 2).dtype, np.complex64)
+        self.assertEqual(apply_observable(state, qml.Hermitian(np.eye(2), 0), 2).dtype, np.complex64)
+
+
+if __name__ == "__main__":
+    unittest.main()
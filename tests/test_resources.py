@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.resources import count_resources
+
+
+class TestResources(unittest.TestCase):
+    """Compare the resources with the ones of tape.specs."""
+
+    def test_same_as_specs(self):
+        rng = np.random.default_rng(0)
+        gates = [qml.Hadamard, qml.RX, qml.CNOT, qml.Toffoli]
+        for _ in range(20):
+            ops = []
+            for gate in rng.choice(gates, size=15):
+                wires = [int(w) for w in rng.permutation(5)[: gate.num_wires]]
+                ops.append(gate(0.3, wires) if gate is qml.RX else gate(wires))
+            tape = QuantumScript(ops, [qml.expval(qml.PauliZ(0))], shots=100)
+            self.assertEqual(count_resources(tape), tape.specs["resources"])
+
+    def test_snapshots_are_full_width_layers(self):
+        tape = QuantumScript([qml.RX(0.1, 0), qml.Snapshot(), qml.RX(0.2, 1)], [qml.state()])
+        resources = count_resources(tape)
+        self.assertEqual(resources.depth, 3)
+        self.assertEqual(resources.gate_sizes[0], 1)
+        self.assertEqual(resources, tape.specs["resources"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from pennylane_snowflurry.result_store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.instructions = ["hadamard(1)", "control_x(1,2)", "readout(1, 1)", "readout(2, 2)"]
+        self.target = "example.anyonsys.com/realm/project"
+
+    def test_key_is_content_addressed(self):
+        key = ResultStore.key(self.instructions, 100, self.target)
+        self.assertEqual(key, ResultStore.key(list(self.instructions), 100, self.target))
+        self.assertNotEqual(key, ResultStore.key(self.instructions, 200, self.target))
+        self.assertNotEqual(key, ResultStore.key(self.instructions, 100, "other"))
+        self.assertNotEqual(key, ResultStore.key(["rotation_x(1,0.5)"], 100, self.target))
+
+    def test_put_and_get(self):
+        store = ResultStore()
+        key = ResultStore.key(self.instructions, 100, self.target)
+        self.assertIsNone(store.get(key))
+        store.put(key, {"00": 48, "11": 52}, 100, self.target)
+        self.assertIn(key, store)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.get(key), {"00": 48, "11": 52})
+
+    def test_results_persist_for_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.sqlite")
+            key = ResultStore.key(self.instructions, 100, self.target)
+            store = ResultStore(path)
+            store.put(key, {"00": 48, "11": 52}, 100, self.target)
+            store.close()
+
+            replay_store = ResultStore(path, replay=True)
+            self.assertTrue(replay_store.replay)
+            self.assertEqual(replay_store.get(key), {"00": 48, "11": 52})
+            replay_store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.serialization import (
+    serialize_tape,
+    deserialize_tape,
+    to_snowflurry,
+    write_circuits,
+    read_circuits,
+    FORMAT_VERSION,
+)
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.tape = QuantumScript(
+            [qml.Hadamard("a"), qml.CNOT(["a", 1]), qml.RX(0.5, 1), qml.U3(0.1, 0.2, 0.3, wires="a")],
+            [
+                qml.expval(qml.Hamiltonian([0.5, -1.0], [qml.PauliZ("a"), qml.PauliX("a") @ qml.PauliY(1)])),
+                qml.probs(wires=[1, "a"]),
+                qml.counts(qml.PauliZ(1)),
+                qml.sample(),
+            ],
+            shots=100,
+        )
+
+    def test_round_trip(self):
+        record = serialize_tape(self.tape)
+        self.assertEqual(record["version"], FORMAT_VERSION)
+        self.assertEqual(record["gates"], ["Hadamard", "CNOT", "RX", "U3"])
+        self.assertEqual(record["gate_wires"], [[0], [0, 1], [1], [0]])
+        self.assertEqual(record["readouts"], [0, 1])
+
+        tape = deserialize_tape(pickle.loads(pickle.dumps(record)))
+        self.assertEqual(tape.shots, self.tape.shots)
+        for op, expected in zip(tape.operations, self.tape.operations):
+            self.assertTrue(qml.equal(op, expected))
+        self.assertEqual(len(tape.measurements), 4)
+        self.assertTrue(
+            np.allclose(qml.matrix(tape.measurements[0].obs, wire_order=["a", 1]),
+                        qml.matrix(self.tape.measurements[0].obs, wire_order=["a", 1]))
+        )
+        self.assertEqual(tape.measurements[1].wires.tolist(), [1, "a"])
+
+    def test_reduced_state_measurements(self):
+        tape = QuantumScript(
+            [qml.Hadamard(0), qml.CNOT([0, 1])],
+            [qml.density_matrix(wires=[1]), qml.vn_entropy(wires=[0], log_base=2), qml.purity(wires=[0, 1])],
+        )
+        measurements = deserialize_tape(serialize_tape(tape)).measurements
+        for mp, expected in zip(measurements, tape.measurements):
+            self.assertIs(type(mp), type(expected))
+            self.assertEqual(mp.wires, expected.wires)
+        self.assertEqual(measurements[1].log_base, 2)
+
+    def test_unsupported_measurement(self):
+        tape = QuantumScript([], [qml.expval(qml.PauliX(0) @ qml.Hermitian(np.eye(2), 1))])
+        with self.assertRaises(ValueError):
+            serialize_tape(tape)
+
+    def test_to_snowflurry(self):
+        from pennylane_snowflurry import pennylane_converter
+
+        record = serialize_tape(self.tape)
+        with mock.patch.object(pennylane_converter, "Snowflurry") as snowflurry:
+            to_snowflurry(record)
+        snowflurry.QuantumCircuit.assert_called_once_with(qubit_count=2)
+        pushes = [call.args[0] for call in snowflurry.seval.call_args_list]
+        self.assertEqual(
+            pushes,
+            [
+                "push!(serialized_circuit,hadamard(1))",
+                "push!(serialized_circuit,control_x(1,2))",
+                "push!(serialized_circuit,rotation_x(2,0.5))",
+                "push!(serialized_circuit,universal(1,0.1,0.2,0.3))",
+                "push!(serialized_circuit, readout(1, 1))",
+                "push!(serialized_circuit, readout(2, 2))",
+            ],
+        )
+
+    def test_stream_batches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "batch.jsonl.gz")
+            tapes = (
+                QuantumScript([qml.Hadamard(0), qml.RX(0.1 * i, 1)], [qml.counts()], shots=10)
+                for i in range(3)
+            )
+            self.assertEqual(write_circuits(path, tapes), 3)
+            records = list(read_circuits(path))
+            self.assertEqual(len(records), 3)
+            self.assertEqual([record["params"][1] for record in records], [[0.0], [0.1], [0.2]])
+
+    def test_unsupported_version(self):
+        record = serialize_tape(self.tape)
+        record["version"] = FORMAT_VERSION + 1
+        with self.assertRaises(ValueError):
+            deserialize_tape(record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+from pennylane_snowflurry.snowflurry_device import stopping_condition
+
+
+class FakeDebugger:
+    def __init__(self):
+        self.snapshots = {}
+        self.active = True
+
+
+class TestSnapshots(unittest.TestCase):
+
+    def test_snapshot_is_supported(self):
+        self.assertTrue(stopping_condition(qml.Snapshot("tag")))
+
+    def test_snapshot_points(self):
+        tape = QuantumScript(
+            [qml.Snapshot(), qml.Hadamard(0), qml.Snapshot("h"), qml.CNOT([0, 1])], [qml.state()]
+        )
+        converter = PennylaneConverter(tape, wires=2)
+        converter.convert_circuit(tape)
+        self.assertEqual([cut for cut, _ in converter.snapshot_points], [0, 1])
+        self.assertEqual(converter.julia_instructions, ["hadamard(1)", "control_x(1,2)"])
+
+    def test_record_snapshots(self):
+        tape = QuantumScript(
+            [
+                qml.Hadamard(0),
+                qml.Snapshot("h"),
+                qml.Snapshot(measurement=qml.expval(qml.PauliX(0))),
+            ],
+            [qml.state()],
+        )
+        converter = PennylaneConverter(tape, debugger=FakeDebugger(), wires=1)
+        converter.convert_circuit(tape)
+        plus = np.array([1, 1], dtype=complex) / np.sqrt(2)
+        # the snapshots are taken in Julia in test_juliaHelpers
+        converter._state = plus
+        converter.snapshot_states = [plus, plus]
+        converter.record_snapshots()
+        self.assertTrue(np.allclose(converter.debugger.snapshots["h"], plus))
+        self.assertAlmostEqual(converter.debugger.snapshots[1], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
 import unittest
+from unittest import mock
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
 from pennylane_snowflurry.snowflurry_device import SnowflurryQubitDevice
 from juliacall import newmodule
 
@@ -27,5 +31,92 @@ class TestSnowflurryQubitDeviceInitialization(unittest.TestCase):
         Snowflurry.seval("push!(c,hadamard(1))")
 
 
+class TestSnowflurryQubitDeviceDeduplication(unittest.TestCase):
+    def test_identical_tapes_are_executed_once(self):
+        first = QuantumScript([qml.RX(0.5, 0)], [qml.expval(qml.PauliZ(0))])
+        copy = QuantumScript([qml.RX(0.5, 0)], [qml.expval(qml.PauliZ(0))])
+        shifted = QuantumScript([qml.RX(2.0, 0)], [qml.expval(qml.PauliZ(0))])
+
+        unique, positions = SnowflurryQubitDevice._deduplicate([first, shifted, copy])
+
+        self.assertEqual(unique, [first, shifted])
+        self.assertEqual(positions, [0, 1, 0])
+
+    def test_tapes_with_shots_are_all_executed(self):
+        first = QuantumScript([qml.RX(0.5, 0)], [qml.counts()], shots=10)
+        copy = QuantumScript([qml.RX(0.5, 0)], [qml.counts()], shots=10)
+
+        unique, positions = SnowflurryQubitDevice._deduplicate([first, copy])
+
+        self.assertEqual(unique, [first, copy])
+        self.assertEqual(positions, [0, 1])
+
+    def test_execute_reports_deduplicated_tapes(self):
+        device = SnowflurryQubitDevice(wires=1)
+        tapes = [
+            QuantumScript([qml.RX(0.5, 0)], [qml.expval(qml.PauliZ(0))]),
+            QuantumScript([qml.RX(2.0, 0)], [qml.expval(qml.PauliZ(0))]),
+            QuantumScript([qml.RX(0.5, 0)], [qml.expval(qml.PauliZ(0))]),
+            QuantumScript([qml.RX(0.5, 0)], [qml.counts()], shots=10),
+            QuantumScript([qml.RX(0.5, 0)], [qml.counts()], shots=10),
+        ]
+        calls = []
+
+        def execute_circuit(circuit, *args, **kwargs):
+            calls.append(circuit)
+            return len(calls)
+
+        # the Julia circuits of the family of RX tapes are not built
+        with qml.Tracker(device) as tracker, \
+                mock.patch.object(device, "_build_families", return_value=[None] * 4), \
+                mock.patch.object(device, "_execute_circuit", side_effect=execute_circuit):
+            results = device.execute(tapes)
+
+        self.assertEqual(results, (1, 2, 1, 3, 4))
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(tracker.totals["executions"], 5)
+        self.assertEqual(tracker.totals["deduplicated_executions"], 1)
+
+
+
+class TestSnowflurryQubitDeviceDistribution(unittest.TestCase):
+    def test_unserializable_tapes_run_in_process(self):
+        device = SnowflurryQubitDevice(wires=2, max_workers=2)
+        hermitian = qml.PauliX(0) @ qml.Hermitian(np.eye(2), 1)
+        tapes = [
+            QuantumScript([qml.RX(0.5, 0)], [qml.expval(qml.PauliZ(0))]),
+            QuantumScript([qml.RX(0.5, 0)], [qml.expval(hermitian)]),
+            QuantumScript([qml.RX(1.5, 0)], [qml.density_matrix(wires=[0])]),
+        ]
+        with mock.patch.object(device._executor, "map", return_value=("remote", "remote")) as remote, \
+                mock.patch.object(device, "_execute_circuit", return_value="local") as local:
+            results = device.execute(tapes)
+        self.assertEqual(results, ("remote", "local", "remote"))
+        self.assertEqual(len(remote.call_args.args[0]), 2)
+        local.assert_called_once()
+
+    def test_seeded_devices_send_the_same_seeds(self):
+        # not a Clifford circuit, which the stabilizer simulator would run in this process
+        tapes = [QuantumScript([qml.RX(0.5, 0)], [qml.sample()], shots=10)] * 2
+        seeds = []
+        for _ in range(2):
+            device = SnowflurryQubitDevice(wires=2, max_workers=2, seed=7)
+            with mock.patch.object(device._executor, "map", return_value=(0, 1)) as remote:
+                device.execute(tapes)
+            seeds.append([seed.generate_state(1)[0] for seed in remote.call_args.kwargs["seeds"]])
+        self.assertEqual(seeds[0], seeds[1])
+        self.assertEqual(len(set(seeds[0])), 2)
+
+    def test_trajectories_run_in_the_workers(self):
+        device = SnowflurryQubitDevice(wires=2, max_workers=2, trajectories=2000, seed=0)
+        ops = [qml.Hadamard(0), qml.CNOT([0, 1]), qml.DepolarizingChannel(0.2, wires=0)]
+        tape = QuantumScript(ops, [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])])
+        results = device.execute(tape)
+        self.assertIsNotNone(device._executor._pool)
+        expected = qml.execute([tape], qml.device("default.mixed", wires=2))[0]
+        for result, reference in zip(results, expected):
+            np.testing.assert_allclose(result, reference, atol=0.05)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.stabilizer import Tableau, is_clifford, simulate_tableau, supports
+
+SINGLE_QUBIT_GATES = ["Hadamard", "PauliX", "PauliY", "PauliZ", "PhaseShift", "RX", "RY", "RZ"]
+TWO_QUBIT_GATES = ["CNOT", "CZ", "CY", "SWAP", "ISWAP"]
+PAULIS = {"I": qml.Identity, "X": qml.PauliX, "Y": qml.PauliY, "Z": qml.PauliZ}
+
+
+def random_clifford_tape(rng, num_wires, depth):
+    ops = []
+    for _ in range(depth):
+        if num_wires > 1 and rng.random() < 0.4:
+            wires = [int(w) for w in rng.choice(num_wires, 2, replace=False)]
+            ops.append(getattr(qml, rng.choice(TWO_QUBIT_GATES))(wires=wires))
+            continue
+        name, wire = rng.choice(SINGLE_QUBIT_GATES), int(rng.integers(num_wires))
+        if name in ("PhaseShift", "RX", "RY", "RZ"):
+            ops.append(getattr(qml, name)(int(rng.integers(-4, 5)) * np.pi / 2, wires=wire))
+        else:
+            ops.append(getattr(qml, name)(wires=wire))
+    return ops
+
+
+class TestStabilizer(unittest.TestCase):
+
+    def test_is_clifford(self):
+        self.assertTrue(is_clifford(qml.CNOT([0, 1])))
+        self.assertTrue(is_clifford(qml.RZ(-np.pi / 2, 0)))
+        self.assertFalse(is_clifford(qml.RZ(0.3, 0)))
+        self.assertFalse(is_clifford(qml.T(0)))
+        self.assertFalse(supports(QuantumScript([qml.Hadamard(0)], [qml.state()])))
+
+    def test_expvals_match_state_vector(self):
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            num_wires = int(rng.integers(1, 5))
+            ops = random_clifford_tape(rng, num_wires, int(rng.integers(0, 15)))
+            word = "".join(rng.choice(list("IXYZ"), num_wires))
+            obs = qml.prod(*[PAULIS[pauli](wire) for wire, pauli in enumerate(word)])
+            tape = QuantumScript(ops, [qml.expval(obs)])
+            expected = qml.execute([tape], qml.device("default.qubit", wires=num_wires))[0]
+            wire_map = {wire: wire + 1 for wire in range(num_wires)}
+            self.assertAlmostEqual(simulate_tableau(tape, wire_map, num_wires), expected)
+
+    def test_counts_of_ghz_state(self):
+        num_wires = 80
+        ops = [qml.Hadamard(0)] + [qml.CNOT([i, i + 1]) for i in range(num_wires - 1)]
+        tape = QuantumScript(ops, [qml.counts(), qml.sample(wires=range(num_wires))], shots=200)
+        wire_map = {wire: wire + 1 for wire in range(num_wires)}
+        counts, samples = simulate_tableau(
+            tape, wire_map, num_wires, shot_chunk_size=64, rng=np.random.default_rng(1)
+        )
+        self.assertEqual(set(counts), {"0" * num_wires, "1" * num_wires})
+        self.assertEqual(sum(counts.values()), 200)
+        # samples have the decimal format of narrower registers
+        self.assertEqual(samples.shape, (200,))
+        self.assertEqual(set(samples), {0, int("1" * num_wires)})
+
+    def test_all_outcomes_of_wide_registers(self):
+        num_wires = 70
+        ops = [qml.Hadamard(0), qml.PauliX(num_wires - 1)]
+        tape = QuantumScript(
+            ops, [qml.counts(qml.PauliZ(num_wires - 1), all_outcomes=True)], shots=10
+        )
+        wire_map = {wire: wire + 1 for wire in range(num_wires)}
+        counts = simulate_tableau(tape, wire_map, num_wires)
+        self.assertEqual(counts, {"0" * num_wires: 0, "0" * (num_wires - 1) + "1": 10})
+        tape = QuantumScript(ops, [qml.counts(all_outcomes=True)], shots=10)
+        with self.assertRaises(ValueError):
+            simulate_tableau(tape, wire_map, num_wires)
+
+    def test_decimal_samples_of_wide_registers(self):
+        num_wires = 40
+        tape = QuantumScript([qml.PauliX(i) for i in range(num_wires)], [qml.sample()], shots=3)
+        wire_map = {wire: wire + 1 for wire in range(num_wires)}
+        samples = simulate_tableau(tape, wire_map, num_wires)
+        self.assertEqual(list(samples), [int("1" * num_wires)] * 3)
+
+    def test_expvals_with_shots(self):
+        ops = [qml.Hadamard(0), qml.CNOT([0, 1]), qml.RX(np.pi / 2, 2)]
+        measurements = [
+            qml.expval(qml.PauliX(0) @ qml.PauliX(1)),
+            qml.expval(qml.PauliY(2)),
+            qml.expval(qml.PauliZ(0) + 0.5),
+        ]
+        tape = QuantumScript(ops, measurements, shots=1000)
+        wire_map = {wire: wire + 1 for wire in range(3)}
+        xx, y, z = simulate_tableau(tape, wire_map, 3, rng=np.random.default_rng(3))
+        # eigenstates are measured exactly, the others with shot noise
+        self.assertEqual(xx, 1.0)
+        self.assertEqual(y, -1.0)
+        self.assertNotEqual(z, 0.5)
+        self.assertAlmostEqual(z, 0.5, delta=0.15)
+
+    def test_support_of_product_state(self):
+        tableau = Tableau(3)
+        tableau.apply("Hadamard", [0])
+        tableau.apply("PauliX", [2])
+        s0, directions = tableau.support()
+        self.assertEqual(s0.tolist(), [0, 0, 1])
+        self.assertEqual(directions.tolist(), [[1, 0, 0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.pennylane_converter import PennylaneConverter
+from pennylane_snowflurry.measurements import State
+from pennylane_snowflurry.executors import MemmapFile, _attach_memmaps, _detach_memmaps
+
+
+class TestStateFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tape = QuantumScript([qml.Hadamard(0)], [qml.state()])
+        self.converter = PennylaneConverter(
+            self.tape, wires=3, state_directory=self.directory.name
+        )
+        self.converter.convert_circuit(self.tape)
+        # only the file written from the cached state matters here
+        self.state = np.arange(8, dtype=complex) / np.sqrt(140)
+        self.converter._state = self.state
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_state_in_chunks(self):
+        path = os.path.join(self.directory.name, "state.npy")
+        output = self.converter.write_state(path, chunk_size=3)
+        self.assertIsInstance(output, np.memmap)
+        self.assertTrue(np.array_equal(np.load(path), self.state))
+
+    def test_state_measurement_returns_memmap(self):
+        result = State().measure(self.converter, qml.state(), 1)
+        self.assertIsInstance(result, np.memmap)
+        self.assertEqual(os.path.dirname(result.filename), os.path.realpath(self.directory.name))
+        self.assertTrue(np.array_equal(result, self.state))
+
+    def test_earlier_results_are_not_rewritten(self):
+        first = State().measure(self.converter, qml.state(), 1)
+        self.converter._state = self.state[::-1].copy()
+        second = State().measure(self.converter, qml.state(), 1)
+        self.assertNotEqual(first.filename, second.filename)
+        self.assertTrue(np.array_equal(first, self.state))
+        self.assertTrue(np.array_equal(second, self.state[::-1]))
+
+    def test_worker_results_keep_files(self):
+        result = State().measure(self.converter, qml.state(), 1)
+        detached = _detach_memmaps((result, 0.5))
+        self.assertEqual(detached, (MemmapFile(result.filename), 0.5))
+        attached, value = _attach_memmaps(detached)
+        self.assertIsInstance(attached, np.memmap)
+        self.assertTrue(np.array_equal(attached, self.state))
+        self.assertEqual(value, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
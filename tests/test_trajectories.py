@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pennylane as qml
+from pennylane.tape import QuantumScript
+from pennylane_snowflurry.trajectories import is_noisy, run_trajectory, simulate_trajectories
+
+
+class TestTrajectories(unittest.TestCase):
+    """Compare the averages of trajectories with 'default.mixed'."""
+
+    def setUp(self):
+        self.ops = [
+            qml.Hadamard(0),
+            qml.CNOT([0, 1]),
+            qml.DepolarizingChannel(0.2, wires=0),
+            qml.AmplitudeDamping(0.3, wires=1),
+            qml.BitFlip(0.1, wires=0),
+        ]
+        self.dev_pennylane = qml.device("default.mixed", wires=2)
+        self.wire_map = {0: 1, 1: 2}
+
+    def reference(self, mp):
+        return qml.execute([QuantumScript(self.ops, [mp])], self.dev_pennylane)[0]
+
+    def simulate(self, measurements, trajectories=2000, shots=None, readout_error=None):
+        tape = QuantumScript(self.ops, measurements, shots=shots)
+        return simulate_trajectories(
+            tape, self.wire_map, 2, trajectories, readout_error, rng=np.random.default_rng(0)
+        )
+
+    def test_is_noisy(self):
+        self.assertTrue(is_noisy(QuantumScript(self.ops)))
+        self.assertFalse(is_noisy(QuantumScript(self.ops[:2])))
+
+    def test_averages(self):
+        measurements = [
+            qml.expval(qml.PauliZ(1)),
+            qml.var(qml.PauliZ(0)),
+            qml.probs(wires=[1, 0]),
+            qml.density_matrix(wires=[0]),
+        ]
+        estimate = self.simulate(measurements)
+        self.assertEqual(estimate.trajectories, 2000)
+        self.assertLess(estimate.standard_error, 0.03)
+        tolerance = 4 * estimate.standard_error
+        for result, mp in zip(estimate.results, measurements):
+            np.testing.assert_allclose(result, self.reference(mp), atol=tolerance)
+
+    def test_noiseless_circuit(self):
+        tape = QuantumScript(self.ops[:2], [qml.probs()])
+        estimate = simulate_trajectories(tape, self.wire_map, 2, 100)
+        self.assertEqual(estimate.trajectories, 1)
+        self.assertEqual(estimate.standard_error, 0.0)
+        np.testing.assert_allclose(estimate.results, [0.5, 0, 0, 0.5])
+
+    def test_readout_error(self):
+        self.ops = [qml.PauliX(1)]
+        counts, probs = self.simulate(
+            [qml.counts(), qml.probs()], shots=4000, readout_error=(0.1, 0.2)
+        ).results
+        # the 0 of wire 0 is read as 1 with probability 0.1, the 1 of wire 1 as 0 with probability 0.2
+        expected = [0.9 * 0.2, 0.9 * 0.8, 0.1 * 0.2, 0.1 * 0.8]
+        np.testing.assert_allclose(probs, expected)
+        self.assertEqual(sum(counts.values()), 4000)
+        frequencies = [counts.get(outcome, 0) / 4000 for outcome in ["00", "01", "10", "11"]]
+        np.testing.assert_allclose(frequencies, expected, atol=0.03)
+
+    def test_readout_error_of_observables(self):
+        measurements = [
+            qml.probs(wires=[0]),
+            qml.probs(wires=[1, 0]),
+            qml.expval(qml.PauliZ(0)),
+            qml.var(qml.PauliZ(0)),
+            qml.expval(qml.PauliZ(1) @ qml.PauliZ(0)),
+        ]
+        probs_0, probs_10, expval, variance, parity = self.simulate(
+            measurements, readout_error=(0.1, 0.2)
+        ).results
+        self.assertAlmostEqual(expval, probs_0[0] - probs_0[1])
+        self.assertAlmostEqual(variance, 1 - expval**2)
+        self.assertAlmostEqual(parity, np.dot(probs_10, [1, -1, -1, 1]))
+        with self.assertRaises(ValueError):
+            self.simulate([qml.expval(qml.PauliX(0))], readout_error=(0.1, 0.2))
+
+    def test_unnormalized_kraus_operators(self):
+        # rounding leaves the cumulative probability below the draw, and the last operator is never applied
+        kraus = [np.sqrt(0.5) * np.eye(2), np.sqrt(0.5 - 1e-9) * np.eye(2), np.zeros((2, 2))]
+        rng = mock.Mock(random=mock.Mock(return_value=1 - 1e-12))
+        state = run_trajectory(np.array([0, 1], dtype=complex), [(kraus, [0], True)], 1, rng)
+        np.testing.assert_allclose(state, [0, 1])
+
+    def test_state_is_refused(self):
+        with self.assertRaises(ValueError):
+            self.simulate([qml.state()])
+
+
+if __name__ == "__main__":
+    unittest.main()
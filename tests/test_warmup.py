@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import patch
+from pennylane_snowflurry.pennylane_converter import SNOWFLURRY_OPERATION_MAP
+from pennylane_snowflurry.warmup import JuliaWarmup, warmup_gates, warmup_source
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_gates_cover_operation_map(self):
+        self.assertEqual(len(warmup_gates(3)), len(SNOWFLURRY_OPERATION_MAP))
+        self.assertIn("toffoli(1,2,3)", warmup_gates(3))
+        # gates on three wires do not fit in two qubits
+        self.assertEqual(len(warmup_gates(2)), len(SNOWFLURRY_OPERATION_MAP) - 2)
+
+    def test_source(self):
+        source = warmup_source(2, "single")
+        self.assertIn("QuantumCircuit(qubit_count=2)", source)
+        self.assertIn("simulate_with_snapshots(c, Int64[1], ComplexF32)", source)
+        self.assertIn("readout(qubit, qubit)", source)
+
+    def test_qubit_count(self):
+        self.assertEqual(JuliaWarmup(30).qubit_count, 10)
+        self.assertEqual(JuliaWarmup(2).qubit_count, 2)
+
+    def test_elapsed(self):
+        with patch("pennylane_snowflurry.warmup.Snowflurry") as snowflurry:
+            snowflurry.fetch.return_value = 1.5
+            warmup = JuliaWarmup(2)
+            warmup.start()
+            self.assertFalse(warmup.done)
+            elapsed = warmup.wait()
+        # the task is spawned in Julia, not in a Python thread
+        self.assertTrue(snowflurry.seval.call_args.args[0].startswith("Threads.@spawn"))
+        snowflurry.fetch.assert_called_once_with(snowflurry.seval.return_value)
+        self.assertTrue(warmup.done)
+        self.assertEqual(elapsed, 1.5)
+
+    def test_failure_warns(self):
+        with patch("pennylane_snowflurry.warmup.Snowflurry") as snowflurry:
+            snowflurry.fetch.side_effect = RuntimeError("no Julia")
+            warmup = JuliaWarmup(2)
+            warmup.start()
+            with self.assertWarns(UserWarning):
+                warmup.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()